@@ -1,27 +1,33 @@
+import os
+import sys
 import pickle
 import streamlit as st
-import requests
 
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-def fetch_poster(movie_id):
-    url = "https://api.themoviedb.org/3/movie/{}?api_key=a9877c59cb8681f7faf7075a75b22103&language=en-US".format(movie_id)
-    data = requests.get(url)
-    data = data.json()
-    poster_path = data['poster_path']
-    full_path = "http://image.tmdb.org/t/p/w500/" + poster_path
+from posters import PosterResolver
+from topk import top_k_indices
 
-    return full_path
+
+PLACEHOLDER_POSTER = "https://via.placeholder.com/500x750/cccccc/666666?text=No+Poster"
+
+
+@st.cache_resource
+def get_poster_resolver():
+    return PosterResolver(cache_path='artificats/poster_cache.sqlite')
 
 
 def recommend(movie):
     index = movies[movies['title'] == movie].index[0]
-    distances = sorted(list(enumerate(similarity[index])), reverse=True, key=lambda x: x[1])
+    nearest = top_k_indices(similarity[index], 5, exclude=[index])
+    posters = get_poster_resolver().resolve(movies.iloc[nearest]['movie_id'])
     rec_movies_name = []
     rec_movies_poster = []
-    for i in distances[1:6]:
-        movie_id = movies.iloc[i[0]]['movie_id']
-        rec_movies_poster.append(fetch_poster(movie_id))
-        rec_movies_name.append(movies.iloc[i[0]].title)
+    for i in nearest:
+        movie_id = movies.iloc[i]['movie_id']
+        rec_movies_poster.append(posters.get(movie_id) or PLACEHOLDER_POSTER)
+        rec_movies_name.append(movies.iloc[i].title)
     return rec_movies_name, rec_movies_poster
 
 
@@ -1,6 +1,5 @@
 import streamlit as st
 import pickle
-import requests
 import pandas as pd
 import numpy as np
 from PIL import Image
@@ -10,6 +9,7 @@ import os
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+from posters import PosterResolver
 from recommender import HybridRecommender
 
 # Page configuration
@@ -331,43 +331,48 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+@st.cache_resource(show_spinner="Loading models...")
 def load_models():
-    """Load pre-trained models"""
-    try:
-        recommender = HybridRecommender(
-            movies_data='data/tmdb_5000_movies.csv',
-            credits_data='data/tmdb_5000_credits.csv'
-        )
-        
-        if recommender.load_models('artifacts'):
-            return recommender
-        else:
-            st.error("❌ Model files not found. Please run the training script first.")
-            st.info("Run: python train_model.py")
-            return None
-    except Exception as e:
-        st.error(f"❌ Error loading models: {str(e)}")
-        return None
+    """
+    Load and warm up the pre-trained models once per process
+    
+    st.cache_resource shares the single HybridRecommender (and its
+    memory-mapped arrays) across all sessions instead of copying it per hit.
+    Failures raise rather than return None, since st.cache_resource only
+    caches return values: the next rerun retries once the models exist.
+    """
+    recommender = HybridRecommender(
+        movies_data='data/tmdb_5000_movies.csv',
+        credits_data='data/tmdb_5000_credits.csv'
+    )
+    
+    if not recommender.load_models('artifacts'):
+        raise FileNotFoundError("Model files not found in artifacts")
+    recommender.warm_up()
+    return recommender
 
-def fetch_poster(movie_id):
-    """Fetch movie poster from TMDB API"""
+def resident_memory_mb():
+    """
+    Current resident memory of this process in MB, or None if unavailable
+    
+    Read from /proc; getrusage only reports peak RSS, which would be
+    mislabelled as current memory, so there is no fallback.
+    """
     try:
-        # Convert movie_id to string and handle any data type issues
-        movie_id_str = str(int(movie_id)) if movie_id is not None else "0"
-        url = f"https://api.themoviedb.org/3/movie/{movie_id_str}?api_key=a9877c59cb8681f7faf7075a75b22103&language=en-US"
-        data = requests.get(url)
-        data = data.json()
-        poster_path = data.get('poster_path')
-        
-        if poster_path:
-            full_path = f"http://image.tmdb.org/t/p/w500/{poster_path}"
-            return full_path
-        else:
-            return None
-    except:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
         return None
 
+@st.cache_resource
+def get_poster_resolver():
+    """Process-wide poster resolver with a pooled session and on-disk cache"""
+    return PosterResolver(cache_path='artifacts/poster_cache.sqlite')
+
+def fetch_posters(recommendations):
+    """Fetch posters for a whole result set concurrently, keyed by movie_id"""
+    return get_poster_resolver().resolve([rec['movie_id'] for rec in recommendations])
+
 def display_movie_card(movie_info, poster_url=None, score_info=None):
     """Display a movie card with information"""
     with st.container():
@@ -396,7 +401,11 @@ def display_movie_card(movie_info, poster_url=None, score_info=None):
             
             # Display score information
             if score_info:
-                if 'similarity_score' in score_info:
+                if 'combined_score' in score_info:
+                    st.markdown(f"**Hybrid Score:** {score_info['combined_score']:.3f} "
+                                f"(similarity {score_info['similarity_score']:.3f}, "
+                                f"predicted rating {score_info['predicted_rating']:.2f}/5.0)")
+                elif 'similarity_score' in score_info:
                     st.markdown(f"**Similarity Score:** {score_info['similarity_score']:.3f}")
                 elif 'predicted_rating' in score_info:
                     st.markdown(f"**Predicted Rating:** {score_info['predicted_rating']:.2f}/5.0")
@@ -411,8 +420,14 @@ def main():
     st.markdown('<h1 class="main-header">🎬 Hybrid Movie Recommender</h1>', unsafe_allow_html=True)
     
     # Load models
-    recommender = load_models()
-    if recommender is None:
+    try:
+        recommender = load_models()
+    except FileNotFoundError:
+        st.error("❌ Model files not found. Please run the training script first.")
+        st.info("Run: python train_model.py")
+        return
+    except Exception as e:
+        st.error(f"❌ Error loading models: {str(e)}")
         return
     
     # Sidebar
@@ -429,13 +444,8 @@ def main():
         
         # Movie selection
         movie_list = recommender.processed_df['title'].values.tolist()
-        # Find default index safely
-        default_index = 0
-        try:
-            if "Spider-Man" in movie_list:
-                default_index = movie_list.index("Spider-Man")
-        except:
-            default_index = 0
+        # Find default index via the title lookup index
+        default_index = recommender.title_index.get("Spider-Man", 0)
             
         selected_movie = st.selectbox(
             'Select a movie you like:',
@@ -454,10 +464,9 @@ def main():
                     st.markdown('<div class="recommendation-section">', unsafe_allow_html=True)
                     st.markdown(f"### 🎯 Movies similar to **{selected_movie}**")
                     
+                    posters = fetch_posters(recommendations)
                     for i, rec in enumerate(recommendations, 1):
-                        # Get movie_id from the processed_df using title
-                        movie_id = recommender.processed_df[recommender.processed_df['title'] == rec['title']]['movie_id'].iloc[0]
-                        poster_url = fetch_poster(movie_id)
+                        poster_url = posters.get(rec['movie_id'])
                         display_movie_card(rec, poster_url, {'similarity_score': rec['similarity_score']})
                         st.divider()
                     
@@ -487,10 +496,9 @@ def main():
                     st.markdown('<div class="recommendation-section">', unsafe_allow_html=True)
                     st.markdown(f"### 👤 Personalized recommendations for User {user_id}")
                     
+                    posters = fetch_posters(recommendations)
                     for i, rec in enumerate(recommendations, 1):
-                        # Get movie_id from the processed_df using title
-                        movie_id = recommender.processed_df[recommender.processed_df['title'] == rec['title']]['movie_id'].iloc[0]
-                        poster_url = fetch_poster(movie_id)
+                        poster_url = posters.get(rec['movie_id'])
                         display_movie_card(rec, poster_url, {'predicted_rating': rec['predicted_rating']})
                         st.divider()
                     
@@ -506,13 +514,8 @@ def main():
         
         with col1:
             movie_list = recommender.processed_df['title'].values.tolist()
-            # Find default index safely
-            default_index = 0
-            try:
-                if "Spider-Man" in movie_list:
-                    default_index = movie_list.index("Spider-Man")
-            except:
-                default_index = 0
+            # Find default index via the title lookup index
+            default_index = recommender.title_index.get("Spider-Man", 0)
                 
             selected_movie = st.selectbox(
                 'Select a movie:',
@@ -542,12 +545,14 @@ def main():
                     st.markdown('<div class="recommendation-section">', unsafe_allow_html=True)
                     st.markdown(f"### 🚀 Hybrid recommendations for **{selected_movie}** + User {user_id}")
                     
+                    posters = fetch_posters(recommendations)
                     for i, rec in enumerate(recommendations, 1):
-                        # Get movie_id from the processed_df using title
-                        movie_id = recommender.processed_df[recommender.processed_df['title'] == rec['title']]['movie_id'].iloc[0]
-                        poster_url = fetch_poster(movie_id)
+                        poster_url = posters.get(rec['movie_id'])
                         score_info = {}
-                        if 'similarity_score' in rec:
+                        if 'combined_score' in rec:
+                            score_info = {name: rec[name] for name in
+                                          ('combined_score', 'similarity_score', 'predicted_rating')}
+                        elif 'similarity_score' in rec:
                             score_info['similarity_score'] = rec['similarity_score']
                         elif 'predicted_rating' in rec:
                             score_info['predicted_rating'] = rec['predicted_rating']
@@ -585,6 +590,27 @@ def main():
             st.metric("SVD Components", recommender.svd_model.n_components)
             st.markdown('</div>', unsafe_allow_html=True)
         
+        # Runtime statistics of the shared, process-wide model
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            load_seconds = recommender.load_seconds
+            st.metric("Model Load Time", f"{load_seconds * 1000:.0f} ms" if load_seconds is not None else "n/a")
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            warm_up_seconds = recommender.warm_up_seconds
+            st.metric("Warm-up Time", f"{warm_up_seconds * 1000:.0f} ms" if warm_up_seconds is not None else "n/a")
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            rss_mb = resident_memory_mb()
+            st.metric("Resident Memory", f"{rss_mb:.0f} MB" if rss_mb is not None else "n/a")
+            st.markdown('</div>', unsafe_allow_html=True)
+        
         # Data sample
         st.markdown("### 📋 Sample Movie Data")
         sample_data = recommender.processed_df[['title', 'genres', 'vote_average', 'popularity']].head(10)
@@ -0,0 +1,100 @@
+"""
+Synthetic TMDB-like catalogs for the benchmark scripts
+
+The real TMDB CSVs are not shipped with the repository, so benchmarks build
+catalogs of any size with the same columns as the preprocessed data.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recommender import HybridRecommender
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Drama', 'Family',
+          'Fantasy', 'Horror', 'Romance', 'Science Fiction', 'Thriller']
+WORDS = ('hero journey city night secret world young old man woman story family friend '
+         'battle dark light power death life space alien love war robot heist magic '
+         'detective zombie spy pirate dragon vampire island king queen ship').split()
+
+
+def make_catalog(n_movies, seed=0, n_topics=None):
+    """
+    Build a preprocessed-looking movie DataFrame with n_movies rows
+
+    By default every movie draws its words, keywords and cast independently,
+    so similarities carry little structure. With n_topics, each movie
+    belongs to one topic and draws most of its overview, its keywords and
+    its cast from that topic's own vocabulary and actors, giving the
+    clustered neighborhoods of a real catalog (needed to measure
+    approximate nearest neighbor recall meaningfully); the topic of each
+    movie is kept in a 'topic' column.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    genres = np.array(GENRES)
+
+    genre_lists = [list(genres[rng.choice(len(genres), 3, replace=False)]) for _ in range(n_movies)]
+    if n_topics:
+        topics = rng.integers(0, n_topics, n_movies)
+        topic_words = np.array([f'{word}{topic}' for topic in range(n_topics) for word in WORDS[:20]])
+        topic_words = topic_words.reshape(n_topics, 20)
+        actors_per_topic = max(n_movies // n_topics // 2, 3)
+        overviews = [' '.join(np.concatenate([topic_words[t][rng.integers(0, 20, 18)],
+                                              words[rng.integers(0, len(words), 7)]]))
+                     for t in topics]
+        keywords = [list(topic_words[t][rng.integers(0, 20, 4)]) for t in topics]
+        cast = [[f'Actor {t * actors_per_topic + a}' for a in rng.integers(0, actors_per_topic, 3)]
+                for t in topics]
+    else:
+        overviews = [' '.join(words[rng.integers(0, len(words), 25)]) for _ in range(n_movies)]
+        keywords = [list(words[rng.integers(0, len(words), 4)]) for _ in range(n_movies)]
+        cast = [[f'Actor {a}' for a in rng.integers(0, max(n_movies // 4, 10), 3)] for _ in range(n_movies)]
+    crew = [[f'Director {d}'] for d in rng.integers(0, max(n_movies // 20, 5), n_movies)]
+
+    df = pd.DataFrame({
+        'movie_id': np.arange(n_movies) + 1000,
+        'title': [f'Movie {i}' for i in range(n_movies)],
+        'overview': overviews,
+        'genres': genre_lists,
+        'keywords': keywords,
+        'cast': cast,
+        'crew': crew,
+        'vote_average': rng.uniform(3, 9, n_movies).round(1),
+        'vote_count': rng.integers(1, 5000, n_movies),
+        'popularity': rng.uniform(0, 150, n_movies),
+        'release_date': '2001-01-01',
+    })
+    df['tags'] = [
+        ' '.join([o] + [g.lower().replace(' ', '') for g in gs] + k + [a.lower().replace(' ', '') for a in c])
+        for o, gs, k, c in zip(df['overview'], df['genres'], df['keywords'], df['cast'])
+    ]
+    if n_topics:
+        df['topic'] = topics
+    return df
+
+
+def make_recommender(n_movies, n_users=1000, seed=0, n_topics=None):
+    """Return a HybridRecommender whose data is a synthetic catalog, lookup index built"""
+    recommender = HybridRecommender(movies_data=None, credits_data=None)
+    recommender.processed_df = make_catalog(n_movies, seed, n_topics)
+    recommender._build_lookup_index()
+    recommender._create_user_movie_matrix(n_users=n_users, seed=seed)
+    return recommender
+
+
+def time_call(fn, repeat=50):
+    """Median wall-clock time of fn() in milliseconds"""
+    import time
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
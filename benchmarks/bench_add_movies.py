@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Adding movies to a trained catalog: add_movies vs a full content-model rebuild
+
+Trains a top-K content model on all but the last --new movies of a synthetic
+catalog, then times add_movies for the held-out movies against refitting
+the vectorizer and rebuilding the neighbor index for the whole catalog.
+
+Usage: python benchmarks/bench_add_movies.py [--movies 10000 20000] [--new 10] [--top-k 50]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from _synthetic import make_recommender
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[10000, 20000])
+    parser.add_argument('--new', type=int, default=10)
+    parser.add_argument('--top-k', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'movies':>8} {'new':>5} {'add_movies ms':>14} {'rebuild ms':>11} {'speedup':>8}")
+    for n_movies in args.movies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(n_movies)
+            catalog = recommender.processed_df
+            new_movies = catalog.iloc[-args.new:].drop(columns='tags')
+
+            recommender.processed_df = catalog.iloc[:-args.new].reset_index(drop=True)
+            recommender._create_user_movie_matrix()
+            recommender.build_content_based_model(top_k=args.top_k)
+
+            start = time.perf_counter()
+            recommender.add_movies(new_movies)
+            add_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            recommender.build_content_based_model(top_k=args.top_k)
+            rebuild_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{n_movies:>8} {args.new:>5} {add_ms:>14.0f} {rebuild_ms:>11.0f} "
+              f"{rebuild_ms / add_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Approximate nearest neighbor index vs an exact TF-IDF scan
+
+Builds the IVF index (random projection + spherical k-means) on a
+topic-structured synthetic catalog and reports, for several n_probe /
+rerank settings, recall@k of the exact top-k content neighbors and the
+per-query latency, next to the exact scan of all TF-IDF vectors. Build time
+and index size are compared with the dense N x N float32 matrix the index
+replaces.
+
+Usage: python benchmarks/bench_ann.py [--movies 20000 100000] [--probe 2 4 8] [--rerank 0 10]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from _synthetic import make_recommender, time_call
+from topk import top_k_indices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--topics', type=int, default=200, help="Topics of the synthetic catalog")
+    parser.add_argument('--components', type=int, default=128)
+    parser.add_argument('--probe', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--rerank', type=int, nargs='+', default=[0, 10])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    for n_movies in args.movies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(n_movies, n_topics=args.topics)
+            recommender.build_content_based_model(top_k=1)
+            start = time.perf_counter()
+            recommender.build_ann_index(n_components=args.components)
+            build_seconds = time.perf_counter() - start
+        index = recommender.ann_index
+        vectors = recommender._content_vectors()
+
+        def exact(position):
+            scores = (vectors[position] @ vectors.T).toarray()[0]
+            return top_k_indices(scores, args.k, exclude=[position])
+
+        queries = np.random.default_rng(0).choice(n_movies, args.queries, replace=False)
+        expected = [set(exact(position).tolist()) for position in queries]
+        exact_ms = time_call(lambda: [exact(position) for position in queries[:20]], 3) / 20
+
+        print(f"\n{n_movies} movies, {index.n_lists} lists of d={args.components}: built in {build_seconds:.2f}s, "
+              f"{index.nbytes / 1e6:.1f} MB vs {n_movies * n_movies * 4 / 1e6:.0f} MB dense float32")
+        print(f"{'n_probe':>8} {'rerank':>7} {f'recall@{args.k}':>10} {'ms/query':>9}")
+        print(f"{'exact':>8} {'-':>7} {1.0:>10.3f} {exact_ms:>9.2f}")
+        for n_probe in args.probe:
+            for rerank in args.rerank:
+                found = [recommender._ann_neighbors(position, args.k, n_probe, rerank)[0] for position in queries]
+                recall = np.mean([len(expected_set.intersection(result.tolist())) / args.k
+                                  for expected_set, result in zip(expected, found)])
+                ms = time_call(lambda: [recommender._ann_neighbors(position, args.k, n_probe, rerank)
+                                        for position in queries[:20]], 3) / 20
+                print(f"{n_probe:>8} {rerank:>7} {recall:>10.3f} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Per-request latency of collaborative recommendations
+
+Compares the original serving path (SVD transform + inverse_transform of the
+user's row, then a full argsort) with scoring against precomputed float32
+user and item factors plus an argpartition top-k.
+
+The "full call" column is get_collaborative_recommendations end to end,
+including building the result dicts.
+
+Usage: python benchmarks/bench_collaborative.py [--movies 4800 20000] [--users 5000]
+"""
+
+import argparse
+
+import numpy as np
+
+from _synthetic import make_recommender, time_call
+from topk import top_k_indices
+
+
+def legacy_scores(recommender, user_id, n_recommendations):
+    """The pre-factor serving path, kept here for comparison only"""
+    user_ratings, rated = recommender._user_ratings(user_id)
+    unrated = np.setdiff1d(np.arange(recommender.user_movie_matrix.shape[1]), rated)
+    projected = recommender.svd_model.transform(user_ratings)
+    reconstructed = recommender.svd_model.inverse_transform(projected).flatten()
+    top = np.argsort(reconstructed[unrated])[::-1][:n_recommendations]
+    return unrated[top]
+
+
+def factor_scores(recommender, user_id, n_recommendations):
+    """The current serving path without building result dicts"""
+    _, rated = recommender._user_ratings(user_id)
+    return top_k_indices(recommender._collaborative_scores(user_id), n_recommendations, exclude=rated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[4800, 20000])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'movies':>8} {'legacy ms':>10} {'factors ms':>11} {'speedup':>8} {'full call ms':>13}")
+    for n_movies in args.movies:
+        recommender = make_recommender(n_movies, n_users=args.users)
+        recommender.build_collaborative_model()
+        users = np.random.default_rng(0).integers(0, args.users, 50)
+
+        legacy = time_call(lambda: [legacy_scores(recommender, u, args.k) for u in users], 5) / len(users)
+        current = time_call(lambda: [factor_scores(recommender, u, args.k) for u in users], 5) / len(users)
+        full = time_call(lambda: [recommender.get_collaborative_recommendations(u, args.k)
+                                  for u in users], 5) / len(users)
+        print(f"{n_movies:>8} {legacy:>10.3f} {current:>11.3f} {legacy / current:>7.1f}x {full:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
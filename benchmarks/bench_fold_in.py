@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Folding a new user into the collaborative model vs refitting TruncatedSVD
+
+Builds the collaborative model on a synthetic catalog, then times
+add_ratings for brand-new users with --ratings ratings each, and for a
+batch of events spread over existing users, against refitting the SVD.
+
+Usage: python benchmarks/bench_fold_in.py [--users 10000 100000 1000000] [--movies 5000]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from _synthetic import make_recommender
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--movies', type=int, default=5000)
+    parser.add_argument('--ratings', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'users':>9} {'1st new user ms':>16} {'next new users ms':>18} "
+          f"{f'{args.batch} events ms':>16} {'SVD refit ms':>13}")
+    for n_users in args.users:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(args.movies, n_users=n_users)
+            recommender.build_collaborative_model()
+
+        rng = np.random.default_rng(0)
+        movie_ids = recommender.processed_df['movie_id'].to_numpy()
+
+        def new_user_events(user_id):
+            chosen = rng.choice(movie_ids, args.ratings, replace=False)
+            return list(zip([user_id] * args.ratings, chosen, rng.integers(1, 6, args.ratings)))
+
+        # The first new user allocates the spare-capacity buffers; later ones reuse them
+        first_ms = timed(lambda: recommender.add_ratings(new_user_events(n_users)))
+        next_ms = np.median([timed(lambda: recommender.add_ratings(new_user_events(n_users + i)))
+                             for i in range(1, 21)])
+
+        n_total = recommender.user_movie_matrix.shape[0]
+        batch = list(zip(rng.integers(0, n_total, args.batch), rng.choice(movie_ids, args.batch),
+                         rng.integers(1, 6, args.batch)))
+        batch_ms = timed(lambda: recommender.add_ratings(batch))
+        refit_ms = timed(recommender.build_collaborative_model)
+        print(f"{n_users:>9} {first_ms:>16.1f} {next_ms:>18.1f} {batch_ms:>16.1f} {refit_ms:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
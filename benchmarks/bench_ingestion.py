@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of in-memory vs streaming (chunked) CSV ingestion
+
+Writes raw TMDB-style movies / credits CSVs of the requested size to a
+temporary directory, then preprocesses them in a fresh process per mode and
+reports each process's peak resident memory. Only ingestion is measured
+(no TF-IDF or SVD).
+
+Usage: python benchmarks/bench_ingestion.py [--movies 20000 80000] [--chunksize 5000]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from _synthetic import WORDS
+from bench_parsing import make_raw_frame
+
+
+def write_csvs(directory, n_movies, chunk=5000):
+    """Write raw movies / credits CSVs chunk by chunk"""
+    movies_path = os.path.join(directory, 'movies.csv')
+    credits_path = os.path.join(directory, 'credits.csv')
+    words = np.array(WORDS)
+    for start in range(0, n_movies, chunk):
+        n_rows = min(chunk, n_movies - start)
+        rng = np.random.default_rng(start)
+        raw = make_raw_frame(n_rows, seed=start)
+        ids = np.arange(start, start + n_rows) + 1000
+        titles = [f'Movie {i}' for i in range(start, start + n_rows)]
+        movies = pd.DataFrame({
+            'id': ids,
+            'title': titles,
+            'overview': [' '.join(words[rng.integers(0, len(words), 60)]) for _ in range(n_rows)],
+            'genres': raw['genres'],
+            'keywords': raw['keywords'],
+            'vote_average': rng.uniform(3, 9, n_rows).round(1),
+            'vote_count': rng.integers(1, 5000, n_rows),
+            'popularity': rng.uniform(0, 150, n_rows),
+            'release_date': '2001-01-01',
+        })
+        credits = pd.DataFrame({'movie_id': ids, 'title': titles, 'cast': raw['cast'], 'crew': raw['crew']})
+        movies.to_csv(movies_path, mode='a', header=start == 0, index=False)
+        credits.to_csv(credits_path, mode='a', header=start == 0, index=False)
+    return movies_path, credits_path
+
+
+def run_mode(mode, directory, chunksize):
+    """Preprocess in this process and print rows, seconds and peak RSS in MB"""
+    from recommender import HybridRecommender
+    from ingestion import stream_preprocess
+
+    movies_path = os.path.join(directory, 'movies.csv')
+    credits_path = os.path.join(directory, 'credits.csv')
+    start = time.perf_counter()
+    if mode == 'streaming':
+        n_rows = len(stream_preprocess(movies_path, credits_path, os.path.join(directory, 'store'),
+                                       chunksize=chunksize))
+    else:
+        recommender = HybridRecommender(movies_path, credits_path)
+        recommender._load_in_memory()
+        n_rows = len(recommender.processed_df)
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"RESULT {n_rows} {seconds:.2f} {peak_mb:.0f}")
+
+
+def measure(mode, directory, chunksize):
+    output = subprocess.run(
+        [sys.executable, __file__, '--run', mode, '--dir', directory, '--chunksize', str(chunksize)],
+        check=True, capture_output=True, text=True).stdout
+    line = next(line for line in output.splitlines() if line.startswith('RESULT'))
+    n_rows, seconds, peak_mb = line.split()[1:]
+    return int(n_rows), float(seconds), float(peak_mb)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[20000, 80000])
+    parser.add_argument('--chunksize', type=int, default=5000)
+    parser.add_argument('--run', choices=['in-memory', 'streaming'], help=argparse.SUPPRESS)
+    parser.add_argument('--dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_mode(args.run, args.dir, args.chunksize)
+        return
+
+    print(f"{'movies':>8} {'CSV MB':>8} {'mode':>10} {'seconds':>8} {'peak RSS MB':>12}")
+    for n_movies in args.movies:
+        with tempfile.TemporaryDirectory() as directory:
+            write_csvs(directory, n_movies)
+            csv_mb = sum(os.path.getsize(os.path.join(directory, name))
+                         for name in ('movies.csv', 'credits.csv')) / 1e6
+            for mode in ('in-memory', 'streaming'):
+                _, seconds, peak_mb = measure(mode, directory, args.chunksize)
+                print(f"{n_movies:>8} {csv_mb:>8.0f} {mode:>10} {seconds:>8.2f} {peak_mb:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of load_models: loose pickles vs the memory-mapped bundle
+
+Writes the same trained model both as the legacy set of pickles and as an
+artifact bundle, then times load_models on each.
+
+Usage: python benchmarks/bench_load.py [--movies 4800]
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+from _synthetic import make_recommender
+from recommender import HybridRecommender
+
+
+def save_legacy_pickles(recommender, output_dir):
+    """Write the artifacts the way save_models did before bundles"""
+    for filename, obj in [('processed_movies.pkl', recommender.processed_df),
+                          ('similarity_matrix.pkl', recommender.similarity_matrix),
+                          ('tfidf_matrix.pkl', recommender.tfidf_matrix),
+                          ('svd_model.pkl', recommender.svd_model),
+                          ('user_movie_matrix.pkl', recommender.user_movie_matrix)]:
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            pickle.dump(obj, f)
+
+
+def time_load(input_dir, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        HybridRecommender(None, None).load_models(input_dir)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, default=4800)
+    args = parser.parse_args()
+
+    recommender = make_recommender(args.movies)
+    recommender.build_content_based_model()
+    recommender.build_collaborative_model()
+
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as bundle_dir:
+        save_legacy_pickles(recommender, legacy_dir)
+        recommender.save_models(bundle_dir)
+
+        legacy = time_load(legacy_dir)
+        bundle = time_load(bundle_dir)
+
+    print(f"\npickles: {legacy:.1f} ms   bundle (mmap): {bundle:.1f} ms   "
+          f"speedup: {legacy / bundle:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
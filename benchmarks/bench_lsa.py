@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+LSA item embeddings vs sparse TF-IDF rows for content similarity
+
+Reduces the TF-IDF matrix of a topic-structured synthetic catalog to LSA
+embeddings of several dimensions and reports fit time, size, per-query
+latency of a full-catalog similarity scan (a dense GEMV against the
+embeddings vs a sparse product against the TF-IDF rows), the fraction of
+the top-k neighbors sharing the query's topic, and recall@k of the exact
+TF-IDF top-k. Within a topic the TF-IDF ranking is decided by incidental
+word overlap that LSA deliberately smooths away, so topic precision, not
+TF-IDF recall, is what the embeddings should preserve. The ANN columns
+index the same embeddings with IVF and search n_probe lists.
+
+Usage: python benchmarks/bench_lsa.py [--movies 20000 100000] [--dims 32 64 128 256]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from _synthetic import make_recommender, time_call
+from ann import IVFIndex
+from embeddings import fit_lsa
+from similarity import prepare_vectors, to_dense
+from topk import top_k_indices
+
+
+def scan(vectors, position, k):
+    """Exact top-k neighbors of one movie by a full scan of the vectors"""
+    scores = to_dense(vectors @ vectors[position].T).ravel()
+    return top_k_indices(scores, k, exclude=[position])
+
+
+def recall(expected, found, k):
+    return np.mean([len(a.intersection(b.tolist())) / k for a, b in zip(expected, found)])
+
+
+def topic_precision(topics, queries, found, k):
+    return np.mean([np.sum(topics[neighbors] == topics[position]) / k
+                    for position, neighbors in zip(queries, found)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--topics', type=int, default=200, help="Topics of the synthetic catalog")
+    parser.add_argument('--dims', type=int, nargs='+', default=[32, 64, 128, 256])
+    parser.add_argument('--probe', type=int, default=4, help="Lists scanned by the ANN search")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    for n_movies in args.movies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(n_movies, n_topics=args.topics)
+            recommender.build_content_based_model(top_k=1)
+        tfidf = prepare_vectors(recommender.tfidf_matrix)
+        topics = recommender.processed_df['topic'].to_numpy()
+        queries = np.random.default_rng(0).choice(n_movies, args.queries, replace=False)
+        exact = [scan(tfidf, position, args.k) for position in queries]
+        expected = [set(neighbors.tolist()) for neighbors in exact]
+        tfidf_ms = time_call(lambda: [scan(tfidf, position, args.k) for position in queries[:20]], 3) / 20
+        tfidf_mb = (tfidf.data.nbytes + tfidf.indices.nbytes + tfidf.indptr.nbytes) / 1e6
+
+        print(f"\n{n_movies} movies, {tfidf.shape[1]} TF-IDF features ({tfidf_mb:.1f} MB)")
+        print(f"{'dims':>6} {'fit s':>6} {'MB':>7} {'topic p@k':>10} {f'recall@{args.k}':>10} {'ms/query':>9} "
+              f"{'ANN p@k':>8} {'ANN ms':>7}")
+        print(f"{'tfidf':>6} {'-':>6} {tfidf_mb:>7.1f} {topic_precision(topics, queries, exact, args.k):>10.3f} "
+              f"{1.0:>10.3f} {tfidf_ms:>9.2f} {'-':>8} {'-':>7}")
+        for dims in args.dims:
+            start = time.perf_counter()
+            embeddings, _ = fit_lsa(recommender.tfidf_matrix, dims)
+            fit_seconds = time.perf_counter() - start
+
+            found = [scan(embeddings, position, args.k) for position in queries]
+            ms = time_call(lambda: [scan(embeddings, position, args.k) for position in queries[:20]], 3) / 20
+
+            index = IVFIndex.build(embeddings, np.eye(embeddings.shape[1], dtype=np.float32))
+
+            def ann(position):
+                return index.search(embeddings[position], args.k, args.probe, exclude=[position])[0]
+
+            ann_found = [ann(position) for position in queries]
+            ann_ms = time_call(lambda: [ann(position) for position in queries[:20]], 3) / 20
+            print(f"{dims:>6} {fit_seconds:>6.2f} {embeddings.nbytes / 1e6:>7.1f} "
+                  f"{topic_precision(topics, queries, found, args.k):>10.3f} "
+                  f"{recall(expected, found, args.k):>10.3f} {ms:>9.2f} "
+                  f"{topic_precision(topics, queries, ann_found, args.k):>8.3f} {ann_ms:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
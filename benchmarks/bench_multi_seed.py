@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Multi-seed "because you liked" recommendations vs one call per seed
+
+Times get_multi_seed_recommendations for watch histories of several sizes,
+scoring from the top-K neighbor index and from the TF-IDF vectors, against
+the naive approach of one get_content_based_recommendations call per seed
+followed by a merge of the per-seed lists.
+
+Usage: python benchmarks/bench_multi_seed.py [--movies 5000 20000] [--history 1 10 50]
+"""
+
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+from _synthetic import make_recommender, time_call
+
+
+def per_seed_calls(recommender, titles, k):
+    """One content-based request per seed, summing the scores of repeated movies"""
+    totals = {}
+    for title in titles:
+        for rec in recommender.get_content_based_recommendations(title, k):
+            totals[rec['movie_id']] = totals.get(rec['movie_id'], 0) + rec['similarity_score']
+    return sorted(totals, key=totals.get, reverse=True)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--history', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--top-k', type=int, default=50, help="Neighbors kept per movie")
+    args = parser.parse_args()
+
+    print(f"{'movies':>8} {'seeds':>6} {'neighbors ms':>13} {'tfidf ms':>9} {'per-seed calls ms':>18}")
+    for n_movies in args.movies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(n_movies)
+            recommender.build_content_based_model(top_k=args.top_k)
+        neighbor_index = recommender.neighbor_index
+
+        rng = np.random.default_rng(0)
+        for n_seeds in args.history:
+            titles = recommender.processed_df['title'].to_numpy()[rng.choice(n_movies, n_seeds, replace=False)]
+            weights = rng.uniform(1, 5, n_seeds)
+
+            recommender.neighbor_index = neighbor_index
+            neighbors_ms = time_call(lambda: recommender.get_multi_seed_recommendations(titles, args.k, weights), 20)
+            loop_ms = time_call(lambda: per_seed_calls(recommender, titles, args.k), 5)
+            recommender.neighbor_index = None
+            tfidf_ms = time_call(lambda: recommender.get_multi_seed_recommendations(titles, args.k, weights), 20)
+            print(f"{n_movies:>8} {n_seeds:>6} {neighbors_ms:>13.2f} {tfidf_ms:>9.2f} {loop_ms:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Parse throughput of the TMDB JSON-like columns, in rows per second
+
+Compares the original per-cell ast.literal_eval parsers with the json-based
+parsers in parsing.py, serially and across a process pool. Cells are
+generated with realistic sizes (long crew lists dominate).
+
+Usage: python benchmarks/bench_parsing.py [--rows 5000] [--workers 4]
+"""
+
+import argparse
+import ast
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+import _synthetic  # noqa: F401  (adds src to the path)
+from parsing import parse_metadata_columns
+
+
+def legacy_names(text, limit=None):
+    try:
+        data = ast.literal_eval(text)
+        if isinstance(data, list):
+            data = data if limit is None else data[:limit]
+            return [item.get('name', '') for item in data if item.get('name')]
+        return []
+    except Exception:
+        return []
+
+
+def legacy_directors(text):
+    try:
+        data = ast.literal_eval(text)
+        if isinstance(data, list):
+            return [item.get('name', '') for item in data if item.get('job') == 'Director'][:2]
+        return []
+    except Exception:
+        return []
+
+
+def make_raw_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def people(n, with_job=False):
+        entries = []
+        for i in range(n):
+            entry = {'credit_id': f'52fe4{rng.integers(1 << 30):x}', 'gender': int(rng.integers(0, 3)),
+                     'id': int(rng.integers(1, 10 ** 6)), 'name': f'Person {rng.integers(10 ** 5)}'}
+            if with_job:
+                entry.update({'department': 'Directing', 'job': 'Director' if i == 0 else 'Editor'})
+            else:
+                entry.update({'cast_id': i, 'character': f'Character {i}', 'order': i})
+            entries.append(entry)
+        return json.dumps(entries)
+
+    return pd.DataFrame({
+        'genres': [json.dumps([{'id': int(i), 'name': f'Genre {i}'} for i in rng.integers(0, 20, 3)])
+                   for _ in range(n_rows)],
+        'keywords': [json.dumps([{'id': int(i), 'name': f'keyword {i}'} for i in rng.integers(0, 999, 8)])
+                     for _ in range(n_rows)],
+        'cast': [people(int(rng.integers(5, 40))) for _ in range(n_rows)],
+        'crew': [people(int(rng.integers(10, 80)), with_job=True) for _ in range(n_rows)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    df = make_raw_frame(args.rows)
+
+    start = time.perf_counter()
+    legacy = {
+        'genres': df['genres'].apply(legacy_names).tolist(),
+        'keywords': df['keywords'].apply(legacy_names).tolist(),
+        'cast': df['cast'].apply(lambda text: legacy_names(text, 3)).tolist(),
+        'crew': df['crew'].apply(legacy_directors).tolist(),
+    }
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = parse_metadata_columns(df)
+    fast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = parse_metadata_columns(df, n_workers=args.workers, chunk_size=max(args.rows // (4 * args.workers), 1))
+    pooled_seconds = time.perf_counter() - start
+
+    assert fast == legacy == pooled, "parsers disagree"
+
+    for label, seconds in [('ast.literal_eval (original)', legacy_seconds),
+                           ('json, serial', fast_seconds),
+                           (f'json, {args.workers} processes', pooled_seconds)]:
+        print(f"{label:<30} {args.rows / seconds:>12,.0f} rows/s   "
+              f"({legacy_seconds / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Accuracy and memory of float32 / float16 / int8 similarity storage vs float64
+
+Fits TF-IDF on a synthetic catalog and, for a sample of movies, compares the
+top-k neighbors under each storage precision with the float64 top-k, next to
+the size of the full N x N matrix. Also times a dense content batch query
+against a matrix stored at each precision, and compares the memory of the
+user-movie rating matrix stored as float32 and uint8.
+
+Usage: python benchmarks/bench_precision.py [--movies 5000 20000] [--k 10]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from _synthetic import make_recommender
+from quantization import SIMILARITY_PRECISIONS, format_precision_report, precision_report
+
+
+def query_ms(recommender, titles, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        recommender.get_content_based_recommendations_batch(titles, 10)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--batch-movies', type=int, default=5000,
+                        help="Largest catalog whose dense matrix is built for the query timings")
+    args = parser.parse_args()
+
+    for n_movies in args.movies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(n_movies)
+            recommender.build_content_based_model(top_k=1)
+
+        ratings = recommender.user_movie_matrix
+        print(f"\n{n_movies} movies, {ratings.nnz} ratings: values take {ratings.data.nbytes / 1e6:.1f} MB "
+              f"as float32, {ratings.data.astype(np.uint8).nbytes / 1e6:.1f} MB as uint8")
+        print(f"{args.queries} sampled queries")
+        report = precision_report(recommender.tfidf_matrix, k=args.k, n_queries=args.queries)
+        print(format_precision_report(report, k=args.k))
+
+        if n_movies > args.batch_movies:
+            continue
+        titles = recommender.processed_df['title'].iloc[:256].tolist()
+        print(f"{'precision':<10} {'256-title batch ms':>19}")
+        for precision in SIMILARITY_PRECISIONS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                recommender.build_content_based_model(precision=precision)
+            print(f"{precision:<10} {query_ms(recommender, titles):>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for top-k selection
+
+Compares a full sort of the score vector (np.argsort, and the pure-Python
+sorted(enumerate(...)) used by app.py) with argpartition-based
+topk.top_k_indices, with and without an exclusion mask.
+
+Usage: python benchmarks/bench_topk.py [--sizes 5000 50000 500000] [--k 10]
+"""
+
+import argparse
+
+import numpy as np
+
+from _synthetic import time_call
+from topk import top_k_indices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000, 500000])
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'N':>8} {'sorted() ms':>12} {'argsort ms':>11} {'top_k ms':>9} "
+          f"{'top_k+mask ms':>14} {'vs argsort':>11}")
+    for n in args.sizes:
+        scores = rng.random(n, dtype=np.float32)
+        exclude = rng.choice(n, min(50, n), replace=False)
+        repeat = 3 if n >= 500000 else 20
+
+        python_sort = time_call(lambda: sorted(list(enumerate(scores)), reverse=True,
+                                               key=lambda x: x[1])[:args.k], repeat)
+        full_sort = time_call(lambda: np.argsort(scores)[::-1][:args.k], repeat)
+        partial = time_call(lambda: top_k_indices(scores, args.k), repeat)
+        masked = time_call(lambda: top_k_indices(scores, args.k, exclude=exclude), repeat)
+        print(f"{n:>8} {python_sort:>12.3f} {full_sort:>11.3f} {partial:>9.3f} "
+              f"{masked:>14.3f} {full_sort / partial:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
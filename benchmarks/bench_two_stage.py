@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Latency and recall of two-stage (candidates + re-rank) vs full-catalog hybrid
+
+Builds a top-K neighbor index and the collaborative model on a synthetic
+catalog, then for a sample of (seed movie, user) requests compares
+get_two_stage_recommendations at several candidate budgets with
+get_hybrid_recommendations, which scores every movie. Recall@k is the
+fraction of the full-catalog top-k that the two-stage top-k recovers; the
+per-stage columns are mean milliseconds per request.
+
+Usage: python benchmarks/bench_two_stage.py [--movies 20000 100000] [--candidates 50 200 1000]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from _synthetic import make_recommender
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--movies', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--candidates', type=int, nargs='+', default=[50, 200, 1000],
+                        help="Candidates per content / collaborative generator (half that from popularity)")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--top-k', type=int, default=100, help="Neighbors kept per movie")
+    args = parser.parse_args()
+
+    for n_movies in args.movies:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = make_recommender(n_movies, n_users=args.users)
+            recommender.build_content_based_model(top_k=args.top_k)
+            recommender.build_collaborative_model()
+
+        rng = np.random.default_rng(0)
+        titles = recommender.processed_df['title'].to_numpy()[rng.choice(n_movies, args.requests)]
+        users = rng.integers(0, args.users, args.requests)
+        requests = list(zip(titles, users.tolist()))
+        # Build the lazily created candidate indexes before timing
+        recommender.get_two_stage_recommendations(*requests[0], n_recommendations=args.k)
+
+        start = time.perf_counter()
+        exact = [{rec['movie_id'] for rec in recommender.get_hybrid_recommendations(title, user, args.k)}
+                 for title, user in requests]
+        full_ms = (time.perf_counter() - start) * 1000 / len(requests)
+
+        print(f"\n{n_movies} movies: full-catalog hybrid {full_ms:.2f} ms/request")
+        print(f"{'candidates':>10} {'merged':>7} {f'recall@{args.k}':>10} {'ms/request':>11} "
+              f"{'content':>8} {'collab':>7} {'popular':>8} {'merge':>6} {'rerank':>7}")
+        for budget in args.candidates:
+            n_candidates = {'content': budget, 'collaborative': budget, 'popularity': budget // 2}
+            hits = 0
+            merged = 0
+            stage_ms = {}
+            start = time.perf_counter()
+            for (title, user), expected in zip(requests, exact):
+                recs, stats = recommender.get_two_stage_recommendations(
+                    title, user, args.k, n_candidates=n_candidates, return_stats=True)
+                hits += len(expected & {rec['movie_id'] for rec in recs})
+                for stage in stats:
+                    stage_ms[stage.name] = stage_ms.get(stage.name, 0) + stage.seconds * 1000
+                    if stage.name == 'merge':
+                        merged += stage.candidates
+            ms = (time.perf_counter() - start) * 1000 / len(requests)
+            recall = hits / sum(len(expected) for expected in exact)
+            per_stage = [stage_ms[name] / len(requests)
+                         for name in ('content', 'collaborative', 'popularity', 'merge', 'rerank')]
+            print(f"{budget:>10} {merged / len(requests):>7.0f} {recall:>10.3f} {ms:>11.2f} "
+                  + ' '.join(f"{value:>{width}.2f}" for value, width in zip(per_stage, (8, 7, 8, 6, 7))))
+
+
+if __name__ == "__main__":
+    main()
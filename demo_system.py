@@ -33,7 +33,7 @@ def demo_content_based(recommender):
     test_movies = ["Spider-Man", "The Dark Knight", "Inception", "Pulp Fiction"]
     
     for movie in test_movies:
-        if movie in recommender.processed_df['title'].values:
+        if movie in recommender.title_index:
             print(f"\n🎭 Finding movies similar to: {movie}")
             recommendations = recommender.get_content_based_recommendations(movie, 3)
             
@@ -80,7 +80,7 @@ def demo_hybrid(recommender):
     ]
     
     for movie, user_id in test_cases:
-        if movie in recommender.processed_df['title'].values:
+        if movie in recommender.title_index:
             print(f"\n🚀 Hybrid recommendations for '{movie}' + User {user_id}:")
             recommendations = recommender.get_hybrid_recommendations(
                 movie_title=movie,
@@ -93,7 +93,11 @@ def demo_hybrid(recommender):
                     print(f"  {i}. {rec['title']}")
                     print(f"     Genres: {', '.join(rec['genres'][:3])}")
                     
-                    if 'similarity_score' in rec:
+                    if 'combined_score' in rec:
+                        print(f"     Hybrid Score: {rec['combined_score']:.3f} "
+                              f"(Content {rec['similarity_score']:.3f}, "
+                              f"Predicted Rating {rec['predicted_rating']:.2f}/5.0)")
+                    elif 'similarity_score' in rec:
                         print(f"     Content Score: {rec['similarity_score']:.3f}")
                     elif 'predicted_rating' in rec:
                         print(f"     Predicted Rating: {rec['predicted_rating']:.2f}/5.0")
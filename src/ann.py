@@ -0,0 +1,191 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from similarity import to_dense
+from topk import top_k_indices
+
+
+def sparse_random_projection(n_features, n_components, seed=0):
+    """
+    Very sparse random projection matrix (n_features x n_components)
+
+    Entries are +-sqrt(s / n_components) with probability 1 / (2s) each and
+    0 otherwise, s = sqrt(n_features) (Li, Hastie and Church, 2006), so
+    projecting a sparse TF-IDF row costs a handful of multiply-adds per term
+    while preserving dot products in expectation.
+    """
+    rng = np.random.default_rng(seed)
+    density = 1 / np.sqrt(n_features)
+    nnz = rng.binomial(n_features * n_components, density)
+    cells = np.unique(rng.choice(n_features * n_components, nnz, replace=False))
+    values = rng.choice(np.array([-1, 1], dtype=np.float32), len(cells)) / np.sqrt(density * n_components)
+    rows, cols = np.divmod(cells, n_components)
+    return sparse.csr_matrix((values.astype(np.float32), (rows, cols)), shape=(n_features, n_components))
+
+
+def embed(vectors, projection):
+    """L2-normalized float32 rows of ``vectors @ projection`` (sparse or dense projection)"""
+    return normalize(to_dense(vectors @ projection).astype(np.float32, copy=False))
+
+
+def assign_clusters(vectors, centroids, block_size=4096):
+    """Index of the most similar centroid of each row, computed blockwise"""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block_size):
+        labels[start:start + block_size] = np.argmax(vectors[start:start + block_size] @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=10, seed=0):
+    """
+    k-means on unit vectors under cosine similarity
+
+    Each iteration assigns every row to its most similar centroid and moves
+    each centroid to the normalized sum of its rows; empty clusters are
+    reseeded with random rows.
+
+    Returns:
+        float32 array of n_clusters unit-norm centroids
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = assign_clusters(vectors, centroids)
+        membership = sparse.csr_matrix((np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+                                       shape=(n_clusters, len(vectors)))
+        sums = np.asarray(membership @ vectors)
+        empty = np.flatnonzero(np.bincount(labels, minlength=n_clusters) == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = normalize(sums).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbor index over item embeddings
+
+    Items are embedded as unit vectors (``embed(tfidf_rows, projection)``)
+    and grouped into ``n_lists`` clusters by spherical k-means. A query is
+    compared with the centroids, and only the items of the ``n_probe``
+    closest lists are scored, so a query touches about
+    ``n_probe / n_lists`` of the catalog. Vectors are stored grouped by list
+    (``list_vectors[list_offsets[j]:list_offsets[j + 1]]`` belong to list j,
+    and ``list_items`` maps them back to movie positions), so each probed
+    list is one contiguous block.
+
+    Args:
+        centroids: n_lists x d unit-norm centroids
+        list_offsets: n_lists + 1 offsets into list_items / list_vectors
+        list_items: Movie position of each stored vector
+        list_vectors: Item embeddings grouped by list
+        projection: n_features x d matrix mapping TF-IDF rows to embeddings
+    """
+
+    def __init__(self, centroids, list_offsets, list_items, list_vectors, projection):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.list_offsets = np.asarray(list_offsets, dtype=np.int64)
+        self.list_items = np.asarray(list_items, dtype=np.int64)
+        self.list_vectors = np.asarray(list_vectors, dtype=np.float32)
+        self.projection = projection
+        self.slots = np.empty(len(self.list_items), dtype=np.int64)
+        self.slots[self.list_items] = np.arange(len(self.list_items))
+
+    @classmethod
+    def build(cls, vectors, projection, n_lists=None, n_iter=10, sample_size=50000, seed=0):
+        """
+        Embed L2-normalized TF-IDF rows and cluster them into inverted lists
+
+        Args:
+            vectors: L2-normalized sparse TF-IDF rows (n_movies x n_features)
+            projection: n_features x d projection (see sparse_random_projection)
+            n_lists: Number of lists; defaults to sqrt(n_movies)
+            n_iter: k-means iterations
+            sample_size: Rows k-means is trained on (all rows are assigned)
+            seed: Random seed of the sample and the initial centroids
+        """
+        embeddings = embed(vectors, projection)
+        n_items = len(embeddings)
+        n_lists = n_lists or max(int(np.sqrt(n_items)), 1)
+
+        rng = np.random.default_rng(seed)
+        sample = embeddings if n_items <= sample_size else embeddings[rng.choice(n_items, sample_size, replace=False)]
+        centroids = spherical_kmeans(sample, n_lists, n_iter, seed)
+        return cls.from_embeddings(embeddings, centroids, projection)
+
+    @classmethod
+    def from_embeddings(cls, embeddings, centroids, projection):
+        """Index embeddings (one row per movie position) under fixed centroids"""
+        labels = assign_clusters(embeddings, centroids)
+        order = np.argsort(labels, kind='stable')
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=offsets[1:])
+        return cls(centroids, offsets, order, embeddings[order], projection)
+
+    @property
+    def n_items(self):
+        return len(self.list_items)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @property
+    def nbytes(self):
+        arrays = [self.centroids, self.list_offsets, self.list_items, self.list_vectors, self.slots]
+        projection = self.projection
+        parts = [projection.data, projection.indices, projection.indptr] if sparse.issparse(projection) else [projection]
+        return sum(array.nbytes for array in arrays + parts)
+
+    def item_vectors(self, items):
+        """Stored embeddings of the given movie positions"""
+        return self.list_vectors[self.slots[items]]
+
+    def search(self, query, k, n_probe=8, exclude=None):
+        """
+        Approximate top-k items for one embedded query
+
+        Args:
+            query: Unit-norm query embedding
+            k: Number of items to return
+            n_probe: Number of closest lists scanned
+            exclude: Movie positions never returned (e.g. the query movie)
+
+        Returns:
+            Tuple of (movie positions, embedding cosine scores), best first
+        """
+        lists = top_k_indices(self.centroids @ query, n_probe)
+        slots = np.concatenate([np.arange(self.list_offsets[j], self.list_offsets[j + 1]) for j in lists])
+        scores = self.list_vectors[slots] @ query
+        items = self.list_items[slots]
+
+        excluded = None if exclude is None else np.isin(items, exclude)
+        best = top_k_indices(scores, k, exclude=excluded)
+        return items[best], scores[best]
+
+    def extended(self, new_vectors):
+        """
+        Index with rows for movies appended after the current last position
+
+        The new movies are embedded with the same projection and filed under
+        their closest existing centroid; the centroids are not retrained.
+
+        Args:
+            new_vectors: L2-normalized TF-IDF rows of the new movies
+        """
+        embeddings = np.empty((self.n_items + new_vectors.shape[0], self.list_vectors.shape[1]), dtype=np.float32)
+        embeddings[self.list_items] = self.list_vectors
+        embeddings[self.n_items:] = embed(new_vectors, self.projection)
+        return IVFIndex.from_embeddings(embeddings, self.centroids, self.projection)
+
+    def to_dict(self):
+        """Plain-array representation used for persistence"""
+        return {'centroids': self.centroids, 'list_offsets': self.list_offsets,
+                'list_items': self.list_items, 'list_vectors': self.list_vectors,
+                'projection': self.projection}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['centroids'], data['list_offsets'], data['list_items'],
+                   data['list_vectors'], data['projection'])
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+
+import numpy as np
+from scipy import sparse
+
+BUNDLE_FORMAT = 'hybrid-recommender-bundle'
+BUNDLE_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+POINTER_NAME = 'CURRENT'
+VERSIONS_DIR = 'versions'
+
+# Superseded versions kept after a save, for readers that resolved the pointer just before it moved
+KEEP_PREVIOUS = 2
+
+# Layout of a bundle directory:
+#   CURRENT                  name of the live version, swapped atomically by each save
+#   versions/<version>/      one complete bundle: manifest.json, *.npy, *.pkl
+
+
+def pointer_path(directory):
+    """Path of the file naming a bundle directory's live version"""
+    return os.path.join(directory, POINTER_NAME)
+
+
+def current_version_dir(directory):
+    """Directory of the live version of a bundle, or None if there is none"""
+    try:
+        with open(pointer_path(directory)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, VERSIONS_DIR, version)
+
+
+def is_bundle(directory):
+    """Return True if directory holds an artifact bundle with a complete live version"""
+    version_dir = current_version_dir(directory)
+    return version_dir is not None and os.path.exists(os.path.join(version_dir, MANIFEST_NAME))
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_array(directory, name, array):
+    """Write one array as <name>.npy into a new version directory and return its manifest entry"""
+    filename = f'{name}.npy'
+    path = os.path.join(directory, filename)
+    if not isinstance(array, np.memmap):
+        array = np.asarray(array)
+
+    # The version directory is new and unreferenced until the pointer moves,
+    # so files can be written in place
+    with open(path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+
+    return {
+        'file': filename,
+        'dtype': str(array.dtype),
+        'shape': list(array.shape),
+        'sha256': file_sha256(path),
+    }
+
+
+def save_bundle(output_dir, arrays, objects, metadata=None):
+    """
+    Write an artifact bundle: one .npy per array, pickles for the rest
+
+    Numeric arrays are stored raw so they can later be memory-mapped; sparse
+    matrices are split into their CSR component arrays. Small non-numeric
+    objects are pickled. A manifest.json records the bundle version, shapes,
+    dtypes and SHA-256 checksums.
+
+    Every save writes a complete new version under ``versions/`` and only
+    then renames the CURRENT pointer onto it, so a reader resolving the
+    pointer sees either the old bundle or the new one, never a mix. All but
+    the KEEP_PREVIOUS most recent superseded versions are then deleted
+    (processes that memory-mapped them keep their open files).
+
+    Args:
+        output_dir: Bundle directory to write into
+        arrays: Mapping of name to ndarray or scipy.sparse matrix; None is skipped
+        objects: Mapping of name to picklable object; None is skipped
+        metadata: Optional JSON-serialisable dict stored in the manifest
+    """
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    version_dir = os.path.join(output_dir, VERSIONS_DIR, version)
+    os.makedirs(version_dir)
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'bundle_version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'arrays': {},
+        'sparse': {},
+        'objects': {},
+        'metadata': metadata or {},
+    }
+
+    for name, array in arrays.items():
+        if array is None:
+            continue
+        if sparse.issparse(array):
+            array = array.tocsr()
+            manifest['sparse'][name] = {'format': 'csr', 'shape': list(array.shape)}
+            for part in ('data', 'indices', 'indptr'):
+                manifest['arrays'][f'{name}.{part}'] = _save_array(
+                    version_dir, f'{name}.{part}', getattr(array, part))
+        else:
+            manifest['arrays'][name] = _save_array(version_dir, name, array)
+
+    for name, obj in objects.items():
+        if obj is None:
+            continue
+        filename = f'{name}.pkl'
+        path = os.path.join(version_dir, filename)
+        with open(path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        manifest['objects'][name] = {'file': filename, 'sha256': file_sha256(path)}
+
+    with open(os.path.join(version_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # The single atomic step that publishes the new version
+    pointer = pointer_path(output_dir)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer + '.tmp', pointer)
+
+    _prune_versions(output_dir, version)
+    return manifest
+
+
+def _prune_versions(output_dir, current):
+    """Delete superseded versions beyond the KEEP_PREVIOUS most recent ones"""
+    versions_dir = os.path.join(output_dir, VERSIONS_DIR)
+    previous = sorted((name for name in os.listdir(versions_dir) if name != current),
+                      key=lambda name: os.path.getmtime(os.path.join(versions_dir, name)), reverse=True)
+    for name in previous[KEEP_PREVIOUS:]:
+        shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+
+
+def load_bundle(input_dir, mmap_mode='r', verify=False):
+    """
+    Open an artifact bundle written by save_bundle
+
+    Arrays are memory-mapped (``mmap_mode='r'`` by default), so loading costs
+    no reads up front and several processes share the same pages through the
+    OS page cache. The live version is resolved once through the CURRENT
+    pointer and every file is read from it, and each array's shape and dtype
+    are checked against the manifest (only the .npy headers are read).
+
+    Args:
+        input_dir: Bundle directory
+        mmap_mode: Passed to np.load; None reads arrays fully into memory
+        verify: Also check every file against its manifest checksum (reads all data)
+
+    Returns:
+        Tuple of (arrays, objects, manifest); sparse matrices are reassembled
+        from their memory-mapped components.
+
+    Raises:
+        ValueError: If the bundle is from a newer version, an array does not
+            match its manifest entry, or a checksum fails
+    """
+    try:
+        return _load_version(current_version_dir(input_dir), mmap_mode, verify)
+    except FileNotFoundError:
+        # The version was pruned between resolving the pointer and opening its
+        # files (a reader racing more than KEEP_PREVIOUS saves); resolve it again
+        return _load_version(current_version_dir(input_dir), mmap_mode, verify)
+
+
+def _load_version(version_dir, mmap_mode, verify):
+    if version_dir is None:
+        raise FileNotFoundError("Artifact bundle has no live version")
+    with open(os.path.join(version_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{version_dir} is not a {BUNDLE_FORMAT}")
+    if manifest.get('version', 0) > BUNDLE_VERSION:
+        raise ValueError(f"Artifact bundle version {manifest['version']} is newer than "
+                         f"supported version {BUNDLE_VERSION}")
+
+    if verify:
+        entries = list(manifest['arrays'].values()) + list(manifest['objects'].values())
+        for entry in entries:
+            if file_sha256(os.path.join(version_dir, entry['file'])) != entry['sha256']:
+                raise ValueError(f"Checksum mismatch for {entry['file']}")
+
+    arrays = {}
+    for name, entry in manifest['arrays'].items():
+        array = np.load(os.path.join(version_dir, entry['file']), mmap_mode=mmap_mode)
+        if list(array.shape) != entry['shape'] or str(array.dtype) != entry['dtype']:
+            raise ValueError(f"{entry['file']} is {array.dtype} {list(array.shape)} but the manifest "
+                             f"records {entry['dtype']} {entry['shape']}")
+        arrays[name] = array
+
+    for name, entry in manifest['sparse'].items():
+        arrays[name] = sparse.csr_matrix(
+            (arrays.pop(f'{name}.data'), arrays.pop(f'{name}.indices'), arrays.pop(f'{name}.indptr')),
+            shape=tuple(entry['shape']), copy=False)
+
+    objects = {}
+    for name, entry in manifest['objects'].items():
+        with open(os.path.join(version_dir, entry['file']), 'rb') as f:
+            objects[name] = pickle.load(f)
+
+    return arrays, objects, manifest
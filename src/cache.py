@@ -0,0 +1,112 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from artifacts import file_sha256
+from columnar import ColumnarStore, ColumnarWriter, infer_dtypes, is_store
+
+# Bump when parsing or tagging changes, so older cache entries stop matching
+PREPROCESS_VERSION = 1
+CACHE_INFO_NAME = 'cache.json'
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_sha256(path, size, mtime_ns):
+    return file_sha256(path)
+
+
+def file_fingerprint(path):
+    """SHA-256 of a file, memoised per process while its size and mtime are unchanged"""
+    stat = os.stat(path)
+    return _cached_sha256(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def fingerprint(input_paths, params):
+    """
+    SHA-256 over the contents of the input files and a dict of parameters
+
+    Args:
+        input_paths: Files whose contents the result depends on
+        params: JSON-serialisable parameters the result depends on
+
+    Returns:
+        Hex digest identifying this exact combination of inputs
+    """
+    digest = hashlib.sha256()
+    for path in input_paths:
+        digest.update(file_fingerprint(path).encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class PreprocessingCache:
+    """
+    Directory of preprocessed frames keyed by input fingerprint
+
+    Each entry is a columnar store named after its key, plus a cache.json
+    recording how long the preprocessing it replaces took. Entries are
+    written to a temporary directory and renamed into place, and only the
+    ``max_entries`` most recently used are kept.
+    """
+
+    def __init__(self, directory, max_entries=4):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def key(self, input_paths, params):
+        """Fingerprint of the inputs plus params and PREPROCESS_VERSION"""
+        return fingerprint(input_paths, dict(params, preprocess_version=PREPROCESS_VERSION))
+
+    def entry_dir(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        """
+        Open a cached entry
+
+        Returns:
+            Tuple of (ColumnarStore, info dict), or None on a cache miss
+        """
+        entry = self.entry_dir(key)
+        info_path = os.path.join(entry, CACHE_INFO_NAME)
+        if not (is_store(entry) and os.path.exists(info_path)):
+            return None
+        with open(info_path) as f:
+            info = json.load(f)
+        os.utime(info_path)
+        return ColumnarStore(entry), info
+
+    def save(self, key, df, preprocess_seconds, params=None, chunk_rows=50000):
+        """Write df as the entry for key, then evict the least recently used entries"""
+        entry = self.entry_dir(key)
+        tmp = entry + '.tmp'
+        with ColumnarWriter(tmp, dtypes=infer_dtypes(df)) as writer:
+            for start in range(0, len(df), chunk_rows):
+                writer.append(df.iloc[start:start + chunk_rows])
+
+        info = {
+            'key': key,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'preprocess_seconds': preprocess_seconds,
+            'params': params or {},
+        }
+        with open(os.path.join(tmp, CACHE_INFO_NAME), 'w') as f:
+            json.dump(info, f, indent=2)
+
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+        self._evict()
+        return entry
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            info_path = os.path.join(self.directory, name, CACHE_INFO_NAME)
+            if os.path.exists(info_path):
+                entries.append((os.path.getmtime(info_path), name))
+        for _, name in sorted(entries, reverse=True)[self.max_entries:]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+import numpy as np
+
+from similarity import to_dense
+from topk import top_k_indices
+
+# Candidates drawn from each generator when none are given
+DEFAULT_CANDIDATES = {'content': 200, 'collaborative': 200, 'popularity': 100}
+
+RetrievalStage = namedtuple('RetrievalStage', ['name', 'seconds', 'candidates'])
+
+
+class FactorCandidateIndex:
+    """
+    Items with the strongest positive and negative loading on each latent factor
+
+    A user's predicted rating of an item is ``sum_j u_j * v_ij``, so items
+    that score well for the user load heavily on the factors where the
+    user's vector is large, in the direction of its sign. Keeping the top
+    ``depth`` items of each factor in both directions turns candidate
+    generation into a few list lookups instead of a pass over the catalog.
+
+    Args:
+        item_factors: n_movies x n_components item factor matrix
+        depth: Items kept per factor and direction
+    """
+
+    def __init__(self, item_factors, depth=500):
+        self.item_factors = item_factors
+        loadings = np.asarray(item_factors, dtype=np.float32).T
+        n_items = loadings.shape[1]
+        self.depth = min(depth, n_items)
+        self.positive = _top_columns(loadings, self.depth)
+        self.negative = _top_columns(-loadings, self.depth)
+
+    def candidates(self, user_vector, n, n_factors=8):
+        """
+        Up to about n items likely to score well for a user
+
+        The user's n_factors strongest factors each contribute a share of the
+        n candidates proportional to the user's weight on that factor.
+        """
+        strength = np.abs(np.asarray(user_vector, dtype=np.float32))
+        factors = np.argsort(-strength, kind='stable')[:n_factors]
+        factors = factors[strength[factors] > 0]
+        if len(factors) == 0 or n <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        shares = np.ceil(n * strength[factors] / strength[factors].sum()).astype(np.int64)
+        lists = [(self.positive if user_vector[factor] > 0 else self.negative)[factor, :min(share, self.depth)]
+                 for factor, share in zip(factors, shares)]
+        return np.unique(np.concatenate(lists))
+
+
+def _top_columns(matrix, depth):
+    """Column indices of the depth largest entries of each row, largest first"""
+    n_cols = matrix.shape[1]
+    if depth < n_cols:
+        columns = np.argpartition(-matrix, depth - 1, axis=1)[:, :depth]
+    else:
+        columns = np.broadcast_to(np.arange(n_cols), matrix.shape).copy()
+    order = np.argsort(-np.take_along_axis(matrix, columns, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(columns, order, axis=1).astype(np.int64)
+
+
+def content_candidates(position, n, neighbor_index=None, similarity_matrix=None, vectors=None,
+                       ann_index=None, n_probe=8):
+    """
+    The n movies most similar to the movie at position, without the movie itself
+
+    Reads the neighbor index when there is one (a single row lookup);
+    otherwise takes the top n of the dense similarity row, then the
+    approximate neighbors from an ANN index, and only as a last resort the
+    similarities of this one movie's content vector (L2-normalized TF-IDF
+    rows or LSA embeddings) to every movie.
+    """
+    if neighbor_index is not None:
+        return np.asarray(neighbor_index.neighbors(position)[0][:n], dtype=np.int64)
+    if similarity_matrix is None and ann_index is not None:
+        return ann_index.search(ann_index.item_vectors(position), n, n_probe, exclude=[position])[0]
+    if similarity_matrix is not None:
+        row = np.asarray(similarity_matrix[position], dtype=np.float32)
+    else:
+        row = to_dense(vectors[position] @ vectors.T).ravel()
+    return top_k_indices(row, n, exclude=[position]).astype(np.int64)
+
+
+def content_scores(position, candidates, neighbor_index=None, similarity_matrix=None,
+                   vectors=None):
+    """
+    Content similarity of the movie at position to each candidate
+
+    With a neighbor index, candidates outside the movie's stored neighbors
+    score 0, as in the full-catalog paths.
+    """
+    if neighbor_index is not None:
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        indices, neighbor_scores = neighbor_index.neighbors(position)
+        if len(indices):
+            order = np.argsort(indices, kind='stable')
+            slots = np.minimum(np.searchsorted(indices[order], candidates), len(indices) - 1)
+            found = indices[order][slots] == candidates
+            scores[found] = neighbor_scores[order][slots[found]]
+        return scores
+    if similarity_matrix is not None:
+        return np.asarray(similarity_matrix[position], dtype=np.float32)[candidates]
+    return to_dense(vectors[candidates] @ vectors[position].T).ravel()
+
+
+def popularity_order(popularity):
+    """Movie positions from most to least popular"""
+    return np.argsort(-np.asarray(popularity, dtype=np.float64), kind='stable').astype(np.int64)
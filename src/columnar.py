@@ -0,0 +1,256 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+STORE_FORMAT = 'columnar-store'
+STORE_VERSION = 1
+SCHEMA_NAME = 'schema.json'
+
+# Column kinds and the files that back them
+#   numeric: <name>.values           raw array of the column dtype
+#   string:  <name>.data             UTF-8 bytes of every value
+#            <name>.offsets          int64 byte offsets, n_rows + 1
+#            <name>.valid            uint8, 0 where the value was missing
+#   list:    <name>.data             UTF-8 bytes of every list item
+#            <name>.item_offsets     int64 byte offsets, n_items + 1
+#            <name>.row_offsets      int64 item offsets, n_rows + 1
+
+
+def is_store(directory):
+    """Return True if directory contains a finished columnar store"""
+    return os.path.exists(os.path.join(directory, SCHEMA_NAME))
+
+
+def _column_kind(series):
+    if series.dtype.kind in 'biuf':
+        return 'numeric'
+    first = series.dropna()
+    if len(first) and isinstance(first.iloc[0], (list, tuple)):
+        return 'list'
+    return 'string'
+
+
+def infer_dtypes(df):
+    """
+    ColumnarWriter dtypes for every column of an in-memory DataFrame
+
+    Kinds are inferred from all rows at once, so a column that is missing
+    in the first rows still gets the kind of its later values.
+    """
+    return {name: str(df[name].dtype) if kind == 'numeric' else kind
+            for name, kind in ((name, _column_kind(df[name])) for name in df.columns)}
+
+
+def _encode(values):
+    """UTF-8 encode strings into (bytes blob, int64 end offsets)"""
+    encoded = [value.encode('utf-8') for value in values]
+    ends = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+    return b''.join(encoded), ends
+
+
+def _decode(data, offsets):
+    """Inverse of _encode for offsets that start at the first value"""
+    data = bytes(data)
+    offsets = np.asarray(offsets).tolist()
+    return [data[start:stop].decode('utf-8') for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+class ColumnarWriter:
+    """
+    Append DataFrame chunks to an on-disk columnar store
+
+    Every column is a set of flat binary files that grow by one append per
+    chunk, so writing never holds more than the current chunk in memory.
+    The schema (column kinds, dtypes and the row count) is written on
+    close(); a directory without schema.json is an unfinished store.
+
+    Each column's kind and dtype come from ``dtypes``; only columns missing
+    from it are inferred from the first chunk, which one chunk cannot always
+    tell (an int64 column whose later chunk has a NaN arrives as float64, and
+    a string column that is missing throughout the first chunk looks
+    numeric), so pass the source schema for every column. A chunk that does
+    not fit its column (a lossy numeric cast, or lists in a string column)
+    raises ValueError rather than being truncated.
+
+    Args:
+        directory: Store directory, replaced if it exists
+        dtypes: Optional mapping of column name to a numeric storage dtype,
+            or to 'string' or 'list'
+    """
+
+    def __init__(self, directory, dtypes=None):
+        self.directory = directory
+        self.dtypes = {name: str(dtype) if str(dtype) in ('string', 'list') else str(np.dtype(dtype))
+                       for name, dtype in (dtypes or {}).items()}
+        self.columns = None
+        self.n_rows = 0
+        self._totals = {}
+
+        # Start from an empty directory so stale files from an older store never leak in
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _append(self, name, data):
+        with open(self._path(name), 'ab') as f:
+            f.write(data if isinstance(data, bytes) else np.ascontiguousarray(data).tobytes())
+
+    def _init_columns(self, chunk):
+        self.columns = {}
+        for name in chunk.columns:
+            dtype = self.dtypes.get(name)
+            if dtype is None:
+                kind = _column_kind(chunk[name])
+                dtype = str(chunk[name].dtype) if kind == 'numeric' else kind
+            kind = dtype if dtype in ('string', 'list') else 'numeric'
+            entry = {'kind': kind}
+            if kind == 'numeric':
+                entry['dtype'] = dtype
+            else:
+                offsets = ['offsets'] if kind == 'string' else ['item_offsets', 'row_offsets']
+                for part in offsets:
+                    self._append(f'{name}.{part}', np.zeros(1, dtype=np.int64))
+                    self._totals[f'{name}.{part}'] = 0
+            self.columns[name] = entry
+
+    def append(self, chunk):
+        """Append the rows of a DataFrame whose columns match the first chunk"""
+        if len(chunk) == 0:
+            return
+        if self.columns is None:
+            self._init_columns(chunk)
+        elif list(chunk.columns) != list(self.columns):
+            raise ValueError(f"Chunk columns {list(chunk.columns)} do not match "
+                             f"store columns {list(self.columns)}")
+
+        for name, entry in self.columns.items():
+            values = chunk[name]
+            if entry['kind'] == 'numeric':
+                self._append(f'{name}.values', self._numeric_values(name, values, entry['dtype']))
+            elif entry['kind'] == 'string':
+                if any(isinstance(value, (list, tuple)) for value in values):
+                    raise ValueError(f"Column {name!r} is stored as strings but this chunk holds lists; "
+                                     f"pass dtypes={{{name!r}: 'list'}} to ColumnarWriter")
+                valid = values.notna().to_numpy()
+                data, ends = _encode(values.where(valid, '').astype(str))
+                self._append(f'{name}.data', data)
+                self._append(f'{name}.offsets', ends + self._totals[f'{name}.offsets'])
+                self._append(f'{name}.valid', valid.astype(np.uint8))
+                self._totals[f'{name}.offsets'] += len(data)
+            else:
+                lists = [value if isinstance(value, (list, tuple)) else [] for value in values]
+                counts = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+                data, ends = _encode([str(item) for items in lists for item in items])
+                self._append(f'{name}.data', data)
+                self._append(f'{name}.item_offsets', ends + self._totals[f'{name}.item_offsets'])
+                self._append(f'{name}.row_offsets', np.cumsum(counts) + self._totals[f'{name}.row_offsets'])
+                self._totals[f'{name}.item_offsets'] += len(data)
+                self._totals[f'{name}.row_offsets'] += int(counts.sum())
+
+        self.n_rows += len(chunk)
+
+    def _numeric_values(self, name, values, dtype):
+        """Values of a numeric column cast to its stored dtype, refusing lossy casts"""
+        if values.dtype.kind not in 'biuf' or not np.can_cast(values.dtype, dtype, casting='safe'):
+            raise ValueError(f"Column {name!r} is stored as {dtype} but this chunk has dtype "
+                             f"{values.dtype}, which cannot be cast without loss; pass "
+                             f"dtypes={{{name!r}: ...}} to ColumnarWriter to widen it")
+        return values.to_numpy(dtype=dtype)
+
+    def close(self):
+        """Write schema.json, which marks the store as complete"""
+        schema = {
+            'format': STORE_FORMAT,
+            'version': STORE_VERSION,
+            'n_rows': self.n_rows,
+            'columns': self.columns or {},
+        }
+        path = self._path(SCHEMA_NAME)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(schema, f, indent=2)
+        os.replace(path + '.tmp', path)
+        return schema
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+class ColumnarStore:
+    """
+    Read a store written by ColumnarWriter
+
+    Column files are memory-mapped, so reading a row range or a subset of
+    columns only touches the pages it needs.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, SCHEMA_NAME)) as f:
+            schema = json.load(f)
+        if schema.get('format') != STORE_FORMAT:
+            raise ValueError(f"{directory} is not a {STORE_FORMAT}")
+        if schema.get('version', 0) > STORE_VERSION:
+            raise ValueError(f"Columnar store version {schema['version']} is newer than "
+                             f"supported version {STORE_VERSION}")
+        self.n_rows = schema['n_rows']
+        self.columns = schema['columns']
+
+    def __len__(self):
+        return self.n_rows
+
+    def _map(self, name, dtype=np.int64):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def _read_column(self, name, start, stop):
+        entry = self.columns[name]
+        if entry['kind'] == 'numeric':
+            return np.array(self._map(f'{name}.values', entry['dtype'])[start:stop])
+
+        data = self._map(f'{name}.data', np.uint8)
+        if entry['kind'] == 'string':
+            offsets = self._map(f'{name}.offsets')[start:stop + 1]
+            values = _decode(data[offsets[0]:offsets[-1]], offsets - offsets[0])
+            valid = self._map(f'{name}.valid', np.uint8)[start:stop]
+            return [value if ok else None for value, ok in zip(values, valid.tolist())]
+
+        row_offsets = self._map(f'{name}.row_offsets')[start:stop + 1]
+        item_offsets = self._map(f'{name}.item_offsets')[row_offsets[0]:row_offsets[-1] + 1]
+        items = _decode(data[item_offsets[0]:item_offsets[-1]], item_offsets - item_offsets[0])
+        bounds = (row_offsets - row_offsets[0]).tolist()
+        return [items[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    def read(self, columns=None, start=0, stop=None):
+        """
+        Read rows [start, stop) of the given columns into a DataFrame
+
+        Args:
+            columns: Column names to read (default: all, in stored order)
+            start: First row
+            stop: End row (exclusive); None reads to the end
+
+        Returns:
+            DataFrame with a RangeIndex starting at 0
+        """
+        columns = list(self.columns) if columns is None else list(columns)
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        start = min(start, stop)
+        return pd.DataFrame({name: self._read_column(name, start, stop) for name in columns},
+                            columns=columns)
+
+    def iter_chunks(self, chunk_size, columns=None):
+        """Yield consecutive DataFrames of at most chunk_size rows"""
+        for start in range(0, self.n_rows, chunk_size):
+            yield self.read(columns, start, start + chunk_size)
@@ -0,0 +1,39 @@
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from similarity import prepare_vectors, to_dense
+
+
+def fit_lsa(matrix, n_components, n_iter=5, seed=0):
+    """
+    Latent semantic analysis of a TF-IDF matrix
+
+    A truncated SVD of the L2-normalized TF-IDF rows maps each movie to
+    ``n_components`` dense dimensions that capture co-occurring terms, so
+    movies sharing related words end up close even without exact term
+    overlap, and a similarity is a short dense dot product instead of a
+    sparse one over thousands of features.
+
+    Args:
+        matrix: Sparse TF-IDF matrix (n_movies x n_features)
+        n_components: Embedding dimension
+        n_iter: Power iterations of the randomized SVD solver
+        seed: Random seed of the solver
+
+    Returns:
+        Tuple of (embeddings, components): L2-normalized float32 item
+        embeddings (n_movies x n_components) and the float32 component
+        matrix (n_components x n_features) that embeds new TF-IDF rows
+    """
+    vectors = prepare_vectors(matrix)
+    n_components = max(min(n_components, min(vectors.shape) - 1), 1)
+    svd = TruncatedSVD(n_components=n_components, n_iter=n_iter, random_state=seed)
+    embeddings = svd.fit_transform(vectors)
+    return normalize(embeddings).astype(np.float32), svd.components_.astype(np.float32)
+
+
+def lsa_transform(matrix, components):
+    """L2-normalized float32 embeddings of TF-IDF rows under fitted LSA components"""
+    embedded = to_dense(prepare_vectors(matrix) @ components.T)
+    return normalize(embedded).astype(np.float32, copy=False)
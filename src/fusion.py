@@ -0,0 +1,67 @@
+import numpy as np
+
+NORMALIZATIONS = ('minmax', 'zscore')
+DEFAULT_WEIGHTS = (0.5, 0.5)
+
+
+def normalize_scores(block, method='minmax'):
+    """
+    Row-wise normalization of a 2-D score block, ignoring -inf entries
+
+    Content similarities and predicted ratings live on different scales, so
+    each row is brought onto a common one before blending: 'minmax' maps a
+    row's finite scores to 0-1, 'zscore' to zero mean and unit variance.
+    Excluded entries (-inf) stay -inf, and a constant row maps to 0.
+
+    Args:
+        block: 2-D array of scores, one row per query
+        method: One of NORMALIZATIONS
+
+    Returns:
+        float32 array of the same shape
+    """
+    block = np.asarray(block, dtype=np.float32)
+    finite = np.isfinite(block)
+    values = np.where(finite, block, 0).astype(np.float32)
+    count = np.maximum(finite.sum(axis=1, keepdims=True), 1)
+
+    if method == 'minmax':
+        low = np.where(finite, block, np.inf).min(axis=1, keepdims=True)
+        high = np.where(finite, block, -np.inf).max(axis=1, keepdims=True)
+        low = np.where(np.isfinite(low), low, 0)
+        span = np.where(high > low, high - low, 1)
+        normalized = (values - low) / span
+    elif method == 'zscore':
+        mean = values.sum(axis=1, keepdims=True) / count
+        centered = np.where(finite, values - mean, 0)
+        std = np.sqrt((centered ** 2).sum(axis=1, keepdims=True) / count)
+        normalized = centered / np.where(std > 0, std, 1)
+    else:
+        raise ValueError(f"Unknown normalization {method!r}; expected one of {NORMALIZATIONS}")
+
+    return np.where(finite, normalized, -np.inf).astype(np.float32)
+
+
+def blend_scores(content_scores, collaborative_scores, weights=DEFAULT_WEIGHTS, normalization='minmax'):
+    """
+    Weighted sum of normalized content and collaborative score blocks
+
+    Args:
+        content_scores: 2-D content similarities (-inf for excluded movies)
+        collaborative_scores: 2-D predicted ratings of the same shape (-inf
+            for excluded movies)
+        weights: (content_weight, collaborative_weight)
+        normalization: One of NORMALIZATIONS, applied to each block first
+
+    Returns:
+        float32 blended scores, -inf wherever either input is -inf
+    """
+    content_weight, collaborative_weight = weights
+    content = normalize_scores(content_scores, normalization)
+    collaborative = normalize_scores(collaborative_scores, normalization)
+    excluded = np.isneginf(content) | np.isneginf(collaborative)
+
+    blended = content_weight * np.where(excluded, 0, content)
+    blended += collaborative_weight * np.where(excluded, 0, collaborative)
+    blended[excluded] = -np.inf
+    return blended
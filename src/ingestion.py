@@ -0,0 +1,126 @@
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from columnar import ColumnarStore, ColumnarWriter
+from parsing import parse_metadata_columns, parser_pool
+from preprocessing import build_tags
+
+MOVIE_COLUMNS = ['id', 'title', 'overview', 'genres', 'keywords',
+                 'vote_average', 'vote_count', 'popularity', 'release_date']
+PROCESSED_COLUMNS = ['movie_id', 'title', 'overview', 'genres', 'keywords', 'cast', 'crew',
+                     'vote_average', 'vote_count', 'popularity', 'release_date', 'tags']
+
+# Storage of every processed column, fixed from the CSV schema rather than
+# inferred per chunk: any column may be missing throughout one chunk
+COLUMN_DTYPES = {'movie_id': 'int64', 'title': 'string', 'overview': 'string', 'genres': 'list',
+                 'keywords': 'list', 'cast': 'list', 'crew': 'list', 'vote_average': 'float64',
+                 'vote_count': 'float64', 'popularity': 'float64', 'release_date': 'string',
+                 'tags': 'string'}
+
+
+class CreditsIndex:
+    """
+    Compact movie_id -> (top cast, directors) index built from a credits CSV
+
+    The raw cast and crew JSON is by far the bulk of the credits file, but
+    only the top 3 actors and the directors are kept, so the parsed index is
+    a small fraction of the file and fits in memory even when the CSV does not.
+    """
+
+    def __init__(self):
+        self.positions = {}
+        self.cast = []
+        self.crew = []
+
+    @classmethod
+    def from_csv(cls, path, chunksize, n_workers=1, executor=None):
+        """
+        Stream a credits CSV (movie_id, cast, crew) into an index
+
+        Every chunk is parsed on executor, or on one pool of n_workers
+        processes started for the whole file.
+        """
+        index = cls()
+        with contextlib.ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(parser_pool(n_workers))
+            for chunk in pd.read_csv(path, usecols=['movie_id', 'cast', 'crew'], chunksize=chunksize):
+                parsed = parse_metadata_columns(chunk, columns=('cast', 'crew'), executor=executor)
+                for movie_id, cast, crew in zip(chunk['movie_id'].tolist(), parsed['cast'], parsed['crew']):
+                    # Keep the first row for a movie_id, like the lookup index does for titles
+                    if movie_id not in index.positions:
+                        index.positions[movie_id] = len(index.cast)
+                        index.cast.append(cast)
+                        index.crew.append(crew)
+        return index
+
+    def __len__(self):
+        return len(self.positions)
+
+    def lookup(self, movie_ids):
+        """Index positions of movie_ids, -1 where a movie has no credits"""
+        return np.fromiter((self.positions.get(movie_id, -1) for movie_id in movie_ids),
+                           dtype=np.int64, count=len(movie_ids))
+
+
+def preprocess_chunk(movies, credits, n_workers=1, executor=None):
+    """
+    Join one chunk of the movies CSV with the credits index and tag it
+
+    Args:
+        movies: Raw chunk of the movies CSV
+        credits: CreditsIndex of the credits CSV
+        n_workers: Number of processes used to parse the JSON-like columns
+        executor: Optional running pool to parse on instead (see parser_pool)
+
+    Returns:
+        DataFrame with PROCESSED_COLUMNS, holding only movies that have credits
+    """
+    movies = movies.dropna(subset=['overview', 'genres', 'keywords'])
+    positions = credits.lookup(movies['id'].tolist())
+    found = positions >= 0
+    movies, positions = movies[found], positions[found]
+
+    chunk = movies.rename(columns={'id': 'movie_id'}).reset_index(drop=True)
+    parsed = parse_metadata_columns(chunk, columns=('genres', 'keywords'), n_workers=n_workers,
+                                    executor=executor)
+    for column, values in parsed.items():
+        chunk[column] = values
+    chunk['cast'] = [credits.cast[position] for position in positions.tolist()]
+    chunk['crew'] = [credits.crew[position] for position in positions.tolist()]
+    chunk['tags'] = build_tags(chunk)
+    return chunk[PROCESSED_COLUMNS]
+
+
+def stream_preprocess(movies_path, credits_path, store_dir, chunksize=10000, n_workers=1):
+    """
+    Preprocess the TMDB CSVs chunk by chunk into a columnar store
+
+    The credits file is reduced to a CreditsIndex first, then the movies file
+    is read ``chunksize`` rows at a time; each chunk is joined on movie_id,
+    parsed, tagged and appended to the store before the next one is read, so
+    peak memory depends on the chunk size rather than on the catalog size.
+
+    Args:
+        movies_path: Path to the movies CSV
+        credits_path: Path to the credits CSV
+        store_dir: Directory of the columnar store to (re)write
+        chunksize: Rows of the movies / credits CSVs read at once
+        n_workers: Number of processes used to parse the JSON-like columns;
+            one pool serves both files
+
+    Returns:
+        ColumnarStore opened on store_dir
+    """
+    with parser_pool(n_workers) as executor:
+        credits = CreditsIndex.from_csv(credits_path, chunksize, executor=executor)
+        print(f"Indexed credits for {len(credits)} movies")
+
+        with ColumnarWriter(store_dir, dtypes=COLUMN_DTYPES) as writer:
+            for movies in pd.read_csv(movies_path, usecols=MOVIE_COLUMNS, chunksize=chunksize):
+                writer.append(preprocess_chunk(movies, credits, executor=executor))
+                print(f"  {writer.n_rows} movies preprocessed")
+
+    return ColumnarStore(store_dir)
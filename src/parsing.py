@@ -0,0 +1,118 @@
+import ast
+import contextlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _load_list(text):
+    """
+    Decode a TMDB JSON-like cell into a list, or None if it is not one
+
+    The TMDB CSVs store these columns as JSON, so json.loads (implemented in
+    C) handles nearly every cell; Python-literal strings fall back to
+    ast.literal_eval. A malformed cell (including one nested too deeply or
+    too large to evaluate) yields None rather than an exception.
+    """
+    if not isinstance(text, str):
+        return None
+    try:
+        data = json.loads(text)
+    except (ValueError, RecursionError):
+        try:
+            data = ast.literal_eval(text)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return None
+    return data if isinstance(data, list) else None
+
+
+def parse_names(text, limit=None):
+    """Extract the 'name' fields of a JSON-like list, optionally from its first `limit` items"""
+    data = _load_list(text)
+    if not data:
+        return []
+    if limit is not None:
+        data = data[:limit]
+    return [item['name'] for item in data if isinstance(item, dict) and item.get('name')]
+
+
+def parse_directors(text, limit=2):
+    """Extract up to `limit` names of crew members whose job is 'Director'"""
+    data = _load_list(text)
+    if not data:
+        return []
+    directors = [item.get('name', '') for item in data
+                 if isinstance(item, dict) and item.get('job') == 'Director']
+    return directors[:limit]
+
+
+def _parse_cast(text):
+    # Top 3 billed actors
+    return parse_names(text, limit=3)
+
+
+COLUMN_PARSERS = {
+    'genres': parse_names,
+    'keywords': parse_names,
+    'cast': _parse_cast,
+    'crew': parse_directors,
+}
+
+
+def _parse_chunk(chunk):
+    """Parse one chunk: {column: [raw cells]} -> {column: [parsed lists]}"""
+    return {column: [COLUMN_PARSERS[column](text) for text in cells]
+            for column, cells in chunk.items()}
+
+
+def parser_pool(n_workers):
+    """
+    Process pool to share across parse_metadata_columns calls
+
+    Used as a context manager; yields None when n_workers <= 1 so callers
+    parse serially without a pool.
+    """
+    if n_workers > 1:
+        return ProcessPoolExecutor(max_workers=n_workers)
+    return contextlib.nullcontext()
+
+
+def parse_metadata_columns(df, columns=tuple(COLUMN_PARSERS), n_workers=1, chunk_size=2000,
+                           executor=None):
+    """
+    Parse the genres / keywords / cast / crew columns of a TMDB frame
+
+    Rows are split into chunks which are parsed serially or, with
+    n_workers > 1 or an executor, across a process pool. Callers parsing a
+    stream of frames should pass one executor (see parser_pool) so the
+    workers are started once rather than on every call.
+
+    Args:
+        df: DataFrame holding the raw JSON-like columns
+        columns: Columns to parse (must be keys of COLUMN_PARSERS)
+        n_workers: Number of worker processes of a pool started for this call
+        chunk_size: Rows per chunk
+        executor: Optional running pool to parse on; n_workers is then unused
+
+    Returns:
+        Dict of column name to list of parsed lists, in row order
+    """
+    columns = [column for column in columns if column in df]
+    cells = {column: df[column].tolist() for column in columns}
+    chunks = [
+        {column: cells[column][start:start + chunk_size] for column in columns}
+        for start in range(0, len(df), chunk_size)
+    ]
+
+    if executor is not None and len(chunks) > 1:
+        results = list(executor.map(_parse_chunk, chunks))
+    elif n_workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(_parse_chunk, chunks))
+    else:
+        results = [_parse_chunk(chunk) for chunk in chunks]
+
+    parsed = {column: [] for column in columns}
+    for result in results:
+        for column in columns:
+            parsed[column].extend(result[column])
+    return parsed
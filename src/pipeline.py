@@ -0,0 +1,250 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from artifacts import is_bundle, load_bundle, pointer_path, save_bundle
+from cache import fingerprint
+
+StageResult = namedtuple('StageResult', ['name', 'key', 'status', 'seconds', 'note'])
+
+# Pipeline being run by forked workers; set just before the pool forks
+_FORKED_PIPELINE = None
+
+
+class Stage:
+    """
+    One step of a training pipeline
+
+    A stage declares what its result depends on (parameters, upstream stages
+    and input files) and which attributes of the pipeline target it produces.
+    Its key is a hash of all of those, so a stage only has to re-run when
+    something it depends on changed.
+
+    Args:
+        name: Stage name, also its cache subdirectory
+        run: Callable doing the work; may return a short note for the summary
+        outputs: Attribute names of the target that the stage sets
+        params: JSON-serialisable parameters that change the outputs
+        depends_on: Names of upstream stages
+        input_files: Files whose contents the outputs depend on
+        cache: Persist outputs and reuse them when the key matches
+    """
+
+    def __init__(self, name, run, outputs=(), params=None, depends_on=(), input_files=(), cache=True):
+        self.name = name
+        self.run = run
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.depends_on = list(depends_on)
+        self.input_files = list(input_files)
+        self.cache = cache
+
+
+class Pipeline:
+    """
+    Run stages in order, reusing cached stage outputs whose key is unchanged
+
+    Cached outputs are stored as artifact bundles under
+    ``cache_dir/<stage>/<key>``: arrays memory-mapped, everything else pickled.
+    Only the ``max_entries`` most recently used keys are kept per stage, so
+    switching back and forth between a few parameter sets stays cached.
+    """
+
+    def __init__(self, target, cache_dir=None, max_entries=3):
+        self.target = target
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.stages = []
+        self.wall_seconds = None
+
+    def add(self, stage):
+        self.stages.append(stage)
+        return stage
+
+    def stage_key(self, stage, keys):
+        """Key of a stage given the keys of the stages already resolved"""
+        params = {
+            'stage': stage.name,
+            'params': stage.params,
+            'upstream': {name: keys[name] for name in stage.depends_on},
+        }
+        return fingerprint(stage.input_files, params)
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.cache_dir, stage.name, key)
+
+    def _restore_outputs(self, stage, entry, mmap_mode='r'):
+        """Set the target's output attributes from a stage bundle"""
+        arrays, objects, _ = load_bundle(entry, mmap_mode=mmap_mode)
+        for name in stage.outputs:
+            setattr(self.target, name, arrays[name] if name in arrays else objects.get(name))
+
+    def _load_outputs(self, stage, key):
+        entry = self._entry_dir(stage, key)
+        if not is_bundle(entry):
+            return False
+        self._restore_outputs(stage, entry)
+        os.utime(pointer_path(entry))
+        return True
+
+    def _write_outputs(self, stage, entry, seconds):
+        """Write a stage's outputs as an artifact bundle, atomically replacing entry"""
+        values = {name: getattr(self.target, name) for name in stage.outputs}
+        arrays = {name: value for name, value in values.items()
+                  if isinstance(value, np.ndarray) or sparse.issparse(value)}
+        objects = {name: value for name, value in values.items() if name not in arrays}
+
+        tmp = entry + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        save_bundle(tmp, arrays, objects, {'stage': stage.name, 'seconds': seconds})
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+
+    def _uses_cache(self, stage):
+        return self.cache_dir is not None and stage.cache
+
+    def _evict(self, stage):
+        stage_dir = os.path.join(self.cache_dir, stage.name)
+        entries = [(os.path.getmtime(pointer_path(os.path.join(stage_dir, name))), name)
+                   for name in os.listdir(stage_dir) if is_bundle(os.path.join(stage_dir, name))]
+        for _, name in sorted(entries, reverse=True)[self.max_entries:]:
+            shutil.rmtree(os.path.join(stage_dir, name), ignore_errors=True)
+
+    def _waves(self):
+        """Group stages into waves whose members only depend on earlier waves"""
+        levels = {}
+        for stage in self.stages:
+            levels[stage.name] = 1 + max((levels[name] for name in stage.depends_on), default=-1)
+        return [[stage for stage in self.stages if levels[stage.name] == level]
+                for level in range(max(levels.values(), default=-1) + 1)]
+
+    def _run_stage(self, stage, key):
+        start = time.perf_counter()
+        note = stage.run()
+        seconds = time.perf_counter() - start
+        if self._uses_cache(stage):
+            self._write_outputs(stage, self._entry_dir(stage, key), seconds)
+            self._evict(stage)
+        return StageResult(stage.name, key, 'ran', seconds, note)
+
+    def _run_parallel(self, stages, keys):
+        """
+        Run independent stages at the same time in forked worker processes
+
+        Workers inherit the target's state from the fork, so nothing is
+        pickled on the way in. Each worker writes its stage's outputs to its
+        own bundle (the stage's cache entry, or a temporary directory when the
+        stage is not cached) and the parent loads them back.
+        """
+        global _FORKED_PIPELINE
+        _FORKED_PIPELINE = self
+        scratch = tempfile.mkdtemp(prefix='pipeline-')
+        entries = {
+            stage.name: (self._entry_dir(stage, keys[stage.name]) if self._uses_cache(stage)
+                         else os.path.join(scratch, stage.name))
+            for stage in stages
+        }
+        for entry in entries.values():
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+
+        start = time.perf_counter()
+        try:
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=len(stages), mp_context=context) as executor:
+                futures = [executor.submit(_run_forked_stage, self.stages.index(stage), entries[stage.name])
+                           for stage in stages]
+                outcomes = [future.result() for future in futures]
+            wall = time.perf_counter() - start
+
+            results = {}
+            for stage, (seconds, note) in zip(stages, outcomes):
+                # Scratch bundles are deleted below, so read those into memory
+                self._restore_outputs(stage, entries[stage.name],
+                                      mmap_mode='r' if self._uses_cache(stage) else None)
+                if self._uses_cache(stage):
+                    self._evict(stage)
+                results[stage.name] = StageResult(stage.name, keys[stage.name], 'ran', seconds, note)
+        finally:
+            _FORKED_PIPELINE = None
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        # Each stage's own wall time, measured in its worker, summed. Stages competing
+        # for cores stretch each other, so this overstates a truly sequential run
+        stage_seconds = sum(seconds for seconds, _ in outcomes)
+        print(f"Ran {', '.join(stage.name for stage in stages)} in parallel: {wall:.2f}s wall "
+              f"vs {stage_seconds:.2f}s summed stage wall time ({stage_seconds / wall:.1f}x)")
+        return results
+
+    def run(self, force=(), parallel=False):
+        """
+        Run or reuse every stage in dependency order
+
+        Args:
+            force: Names of stages to re-run even if their outputs are cached
+            parallel: Run stages that do not depend on each other in separate
+                processes (needs the 'fork' start method); such stages must
+                declare every attribute they set as an output
+
+        Returns:
+            List of StageResult(name, key, status, seconds, note) in stage
+            order, where status is 'reused' or 'ran'. The wall-clock time of
+            the whole run is kept in ``wall_seconds``.
+        """
+        parallel = parallel and 'fork' in multiprocessing.get_all_start_methods()
+        keys = {}
+        results = {}
+        start = time.perf_counter()
+
+        for wave in self._waves():
+            pending = []
+            for stage in wave:
+                key = keys[stage.name] = self.stage_key(stage, keys)
+                load_start = time.perf_counter()
+                if self._uses_cache(stage) and stage.name not in force and self._load_outputs(stage, key):
+                    results[stage.name] = StageResult(stage.name, key, 'reused',
+                                                      time.perf_counter() - load_start, None)
+                else:
+                    pending.append(stage)
+
+            if parallel and len(pending) > 1:
+                results.update(self._run_parallel(pending, keys))
+            else:
+                for stage in pending:
+                    results[stage.name] = self._run_stage(stage, keys[stage.name])
+
+        self.wall_seconds = time.perf_counter() - start
+        return [results[stage.name] for stage in self.stages]
+
+
+def _run_forked_stage(index, entry):
+    """Worker side of Pipeline._run_parallel: run one stage and write its outputs"""
+    pipeline = _FORKED_PIPELINE
+    stage = pipeline.stages[index]
+    start = time.perf_counter()
+    note = stage.run()
+    seconds = time.perf_counter() - start
+    pipeline._write_outputs(stage, entry, seconds)
+    return seconds, note
+
+
+def format_summary(results, wall_seconds=None):
+    """Table of stage, status, wall-clock time and notes for a pipeline run"""
+    lines = [f"{'Stage':<16} {'Status':<8} {'Time':>9}  Key"]
+    for result in results:
+        note = f"  ({result.note})" if result.note else ''
+        lines.append(f"{result.name:<16} {result.status:<8} {result.seconds:>8.2f}s  "
+                     f"{result.key[:12]}{note}")
+    reused = sum(result.status == 'reused' for result in results)
+    total = sum(result.seconds for result in results)
+    line = f"Reused {reused} of {len(results)} stages, total {total:.2f}s"
+    if wall_seconds is not None:
+        line += f" of stage time in {wall_seconds:.2f}s wall-clock"
+    lines.append(line)
+    return '\n'.join(lines)
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TMDB_API_KEY = os.environ.get('TMDB_API_KEY', 'a9877c59cb8681f7faf7075a75b22103')
+TMDB_API_BASE_URL = os.environ.get('TMDB_API_BASE_URL', 'https://api.themoviedb.org/3')
+TMDB_IMAGE_BASE_URL = 'http://image.tmdb.org/t/p/w500'
+
+
+class PosterCache:
+    """
+    Persistent movie_id -> poster_path cache in a small SQLite file
+
+    Entries older than ``ttl`` seconds are treated as missing, and once the
+    cache holds more than ``max_entries`` rows the least recently used ones
+    are evicted. Movies without a poster are cached too (as NULL) so they are
+    not refetched on every request.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=20000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posters ("
+            "movie_id INTEGER PRIMARY KEY, poster_path TEXT, "
+            "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS posters_accessed ON posters (accessed_at)")
+        self._conn.commit()
+
+    def get_many(self, movie_ids):
+        """Return {movie_id: poster_path or None} for fresh cached entries"""
+        movie_ids = list(movie_ids)
+        if not movie_ids:
+            return {}
+
+        now = time.time()
+        placeholders = ','.join('?' * len(movie_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT movie_id, poster_path FROM posters "
+                f"WHERE movie_id IN ({placeholders}) AND fetched_at >= ?",
+                movie_ids + [now - self.ttl],
+            ).fetchall()
+            if rows:
+                self._conn.executemany("UPDATE posters SET accessed_at = ? WHERE movie_id = ?",
+                                       [(now, movie_id) for movie_id, _ in rows])
+                self._conn.commit()
+        return dict(rows)
+
+    def put_many(self, items):
+        """Store {movie_id: poster_path or None} and evict least recently used rows"""
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO posters (movie_id, poster_path, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(movie_id, poster_path, now, now) for movie_id, poster_path in items.items()],
+            )
+            self._conn.execute(
+                "DELETE FROM posters WHERE movie_id IN ("
+                "SELECT movie_id FROM posters ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posters").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PosterResolver:
+    """
+    Resolve TMDB poster URLs for a whole result set at once
+
+    Cache misses are fetched concurrently over one pooled requests.Session,
+    and the results are written back to the on-disk PosterCache. Point
+    ``api_base_url`` (or the TMDB_API_BASE_URL environment variable) at a
+    local stand-in server to run without network access.
+    """
+
+    def __init__(self, cache_path='artifacts/poster_cache.sqlite', api_key=TMDB_API_KEY,
+                 api_base_url=TMDB_API_BASE_URL, image_base_url=TMDB_IMAGE_BASE_URL,
+                 ttl=7 * 24 * 3600, max_entries=20000, max_workers=8, timeout=5):
+        self.api_key = api_key
+        self.api_base_url = api_base_url.rstrip('/')
+        self.image_base_url = image_base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = PosterCache(cache_path, ttl, max_entries) if cache_path else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def poster_url(self, poster_path):
+        """Full image URL for a TMDB poster_path, or None"""
+        if not poster_path:
+            return None
+        return f"{self.image_base_url}/{poster_path.lstrip('/')}"
+
+    def _fetch_poster_path(self, movie_id):
+        """Fetch one movie's poster_path; raises on network or HTTP errors"""
+        response = self.session.get(
+            f"{self.api_base_url}/movie/{movie_id}",
+            params={'api_key': self.api_key, 'language': 'en-US'},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json().get('poster_path')
+
+    def _fetch_or_none(self, movie_id):
+        try:
+            return movie_id, self._fetch_poster_path(movie_id), True
+        except (requests.RequestException, ValueError):
+            return movie_id, None, False
+
+    def resolve(self, movie_ids):
+        """
+        Return {movie_id: poster URL or None} for all movie_ids
+
+        Failed fetches map to None and are not cached, so they are retried on
+        the next call.
+        """
+        movie_ids = list(dict.fromkeys(int(movie_id) for movie_id in movie_ids))
+        poster_paths = self.cache.get_many(movie_ids) if self.cache is not None else {}
+
+        missing = [movie_id for movie_id in movie_ids if movie_id not in poster_paths]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                results = list(executor.map(self._fetch_or_none, missing))
+
+            fetched = {movie_id: path for movie_id, path, ok in results if ok}
+            if self.cache is not None:
+                self.cache.put_many(fetched)
+            poster_paths.update(fetched)
+
+        return {movie_id: self.poster_url(poster_paths.get(movie_id)) for movie_id in movie_ids}
+
+    def resolve_one(self, movie_id):
+        """Poster URL for a single movie, or None"""
+        return self.resolve([movie_id]).get(int(movie_id))
@@ -0,0 +1,85 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+TAG_LIST_COLUMNS = ('genres', 'keywords', 'cast', 'crew')
+
+# Marks the end of each movie's tokens inside the single joined string
+_ROW_SEPARATOR = '\x00'
+
+
+def _flatten(lists):
+    """Flatten a sequence of lists into (row of each item, object array of items)"""
+    counts = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    items = np.fromiter(chain.from_iterable(lists), dtype=object, count=int(counts.sum()))
+    return np.repeat(np.arange(len(lists)), counts), items
+
+
+def _normalise_unique(tokens, normalise):
+    """Apply normalise once per distinct token and broadcast back to all tokens"""
+    codes, uniques = pd.factorize(tokens)
+    normalised = np.array([normalise(token) for token in uniques], dtype=object)
+    return normalised[codes] if len(codes) else tokens
+
+
+def _tag_token(text):
+    return text.lower().replace(' ', '')
+
+
+def build_tags(df, overview_words=20, list_columns=TAG_LIST_COLUMNS):
+    """
+    Build the text tags of every movie with column-wide operations
+
+    A movie's tags are the first ``overview_words`` lowercased words of its
+    overview followed by its genres, keywords, cast and crew, each lowercased
+    with spaces removed (so "Science Fiction" becomes "sciencefiction").
+
+    Each column is flattened into one token array. Genres, keywords and names
+    repeat heavily across a catalog, so tokens are factorized and normalised
+    once per distinct value. Tokens are then ordered by movie with a stable
+    argsort and joined with a single ``str.join`` using a row separator, so no
+    per-movie Series or Python function call is created.
+
+    Args:
+        df: Frame with an 'overview' column and the parsed list columns
+        overview_words: Number of overview words to keep
+        list_columns: List-valued columns appended after the overview
+
+    Returns:
+        Series of tag strings aligned with df's index
+    """
+    n_movies = len(df)
+    row_parts = []
+    token_parts = []
+
+    # First overview_words words of each overview (split stops early)
+    overviews = df['overview'].to_numpy(dtype=object)
+    present = np.flatnonzero(pd.notna(overviews))
+    word_lists = [str(text).split(None, overview_words)[:overview_words] for text in overviews[present]]
+    rows, words = _flatten(word_lists)
+    row_parts.append(present[rows])
+    token_parts.append(_normalise_unique(words, str.lower))
+
+    for column in list_columns:
+        rows, items = _flatten(df[column].to_numpy(dtype=object))
+        row_parts.append(rows)
+        token_parts.append(_normalise_unique(items, _tag_token))
+
+    rows = np.concatenate(row_parts)
+    tokens = np.concatenate(token_parts)
+    nonempty = tokens != ''
+    rows, tokens = rows[nonempty], tokens[nonempty]
+
+    # Group tokens by movie, keeping overview, genres, keywords, cast, crew order
+    order = np.argsort(rows, kind='stable')
+    rows, tokens = rows[order], tokens[order]
+
+    # Token j of movie r lands after r separators; movie i's separator follows its tokens
+    ends = np.cumsum(np.bincount(rows, minlength=n_movies))
+    joined = np.empty(len(tokens) + n_movies, dtype=object)
+    joined[np.arange(len(tokens)) + rows] = tokens
+    joined[ends + np.arange(n_movies)] = _ROW_SEPARATOR
+
+    tags = ' '.join(joined).split(_ROW_SEPARATOR)[:n_movies]
+    return pd.Series([tag.strip() for tag in tags], index=df.index)
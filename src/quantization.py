@@ -0,0 +1,215 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+from similarity import prepare_vectors, to_dense
+from topk import top_k_rows
+
+SIMILARITY_PRECISIONS = ('float64', 'float32', 'float16', 'int8')
+RATING_DTYPES = ('float32', 'uint8')
+
+
+class QuantizedMatrix:
+    """
+    Dense matrix stored as int8 with one float32 scale per row
+
+    Row ``i`` is recovered as ``values[i] * scales[i]``, where the scale maps
+    the row's largest absolute value to 127. That is a quarter of float32
+    memory and an eighth of float64, and since each row is quantized on its
+    own the ranking within a row is preserved up to ties between values that
+    round to the same step.
+
+    Similarity matrices are quantized with ``exclude_diagonal``: a movie's
+    similarity to itself (1.0) would otherwise set every row's scale while
+    its real neighbors sit far below it, wasting most of the 255 steps. The
+    diagonal then saturates at the row's largest other value, which no
+    recommendation path reads since a movie is never its own neighbor.
+    """
+
+    def __init__(self, values, scales):
+        self.values = values
+        self.scales = np.asarray(scales, dtype=np.float32)
+
+    @classmethod
+    def from_dense(cls, matrix, exclude_diagonal=False, block_size=1024):
+        """Quantize a dense (possibly memory-mapped) matrix block by block"""
+        n_rows = matrix.shape[0]
+        values = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(n_rows, dtype=np.float32)
+        for start in range(0, n_rows, block_size):
+            block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+            columns = np.arange(start, start + len(block)) if exclude_diagonal else None
+            values[start:start + block_size], scales[start:start + block_size] = quantize_rows(block, columns)
+        return cls(values, scales)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.scales.nbytes
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, rows):
+        """Dequantized float32 row(s), e.g. matrix[i] or matrix[[i, j]]"""
+        scales = self.scales[rows]
+        values = self.values[rows].astype(np.float32)
+        if np.ndim(scales) == 0:
+            return values * scales
+        return values * scales[:, None]
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self[:]
+        return dense if dtype is None else dense.astype(dtype)
+
+    def to_dict(self):
+        """Plain-array representation used for persistence"""
+        return {'values': self.values, 'scales': self.scales}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['values'], data['scales'])
+
+
+def quantize_rows(block, excluded_columns=None):
+    """
+    Symmetric per-row int8 quantization
+
+    Args:
+        block: Dense rows to quantize
+        excluded_columns: Optional column per row left out of that row's
+            scale (values there saturate at +-127)
+
+    Returns:
+        Tuple of (int8 values, float32 scales)
+    """
+    block = np.asarray(block, dtype=np.float32)
+    magnitudes = np.abs(block)
+    if excluded_columns is not None:
+        magnitudes[np.arange(len(block)), excluded_columns] = 0
+    scales = magnitudes.max(axis=1, initial=0) / 127
+    scales = np.where(scales > 0, scales, 1).astype(np.float32)
+    values = np.clip(np.rint(block / scales[:, None]), -127, 127).astype(np.int8)
+    return values, scales
+
+
+def to_precision(matrix, precision, block_size=1024):
+    """
+    Store a dense square similarity matrix at the given precision
+
+    A memory-mapped .npy matrix (a streamed similarity matrix) is converted
+    block_size rows at a time into a new file that then replaces it, so the
+    N x N matrix is never loaded into memory.
+
+    Args:
+        matrix: Dense (or memory-mapped) similarity matrix
+        precision: One of SIMILARITY_PRECISIONS
+        block_size: Rows converted at once from a memory-mapped matrix
+
+    Returns:
+        ndarray (memory-mapped if the input was) of that dtype, or a
+        QuantizedMatrix for 'int8'
+    """
+    if precision not in SIMILARITY_PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {SIMILARITY_PRECISIONS}")
+    if precision == 'int8':
+        return QuantizedMatrix.from_dense(matrix, exclude_diagonal=True, block_size=block_size)
+    if matrix.dtype == np.dtype(precision):
+        return matrix
+    if not (isinstance(matrix, np.memmap) and matrix.filename):
+        return np.asarray(matrix).astype(precision)
+
+    path = matrix.filename
+    tmp = path + '.tmp'
+    out = np.lib.format.open_memmap(tmp, mode='w+', dtype=precision, shape=matrix.shape)
+    for start in range(0, matrix.shape[0], block_size):
+        out[start:start + block_size] = matrix[start:start + block_size]
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode='r')
+
+
+def to_rating_dtype(ratings, dtype):
+    """
+    Cast a user-movie rating matrix, checking that uint8 loses nothing
+
+    Ratings are small integers (1-6), so uint8 storage is exact; anything
+    that would not round-trip raises ValueError.
+    """
+    if dtype not in RATING_DTYPES:
+        raise ValueError(f"Unknown rating dtype {dtype!r}; expected one of {RATING_DTYPES}")
+    values = ratings.data if sparse.issparse(ratings) else np.asarray(ratings)
+    if dtype == 'uint8' and not np.array_equal(values, np.clip(np.rint(values), 0, 255)):
+        raise ValueError("Ratings are not integers in 0..255 and cannot be stored as uint8")
+    return ratings.astype(dtype)
+
+
+def precision_report(content_matrix, k=10, n_queries=500, precisions=SIMILARITY_PRECISIONS, seed=0):
+    """
+    Top-k agreement and memory of each similarity precision against float64
+
+    Similarities of a random sample of movies are computed in float64,
+    stored at each precision, and their top-k neighbors (excluding the movie
+    itself) compared with the float64 top-k. Rows are stored independently
+    at every precision, so a sample of rows behaves exactly like the full
+    matrix would.
+
+    Args:
+        content_matrix: Matrix similarity is measured on: sparse TF-IDF rows
+            or dense LSA embeddings (n_movies x n_features)
+        k: Neighbors compared per movie
+        n_queries: Number of sampled movies
+        precisions: Precisions to report
+        seed: Random seed of the sample
+
+    Returns:
+        List of dicts with precision, overlap (mean fraction of the float64
+        top-k found), exact (fraction of movies with an identical top-k
+        list), bytes (for the full N x N matrix) and ratio (vs float64)
+    """
+    vectors = prepare_vectors(content_matrix).astype(np.float64)
+    n_movies = vectors.shape[0]
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(n_movies, min(n_queries, n_movies), replace=False)
+    rows = np.arange(len(queries))
+
+    reference = to_dense(vectors[queries] @ vectors.T)
+    reference[rows, queries] = -np.inf
+    expected, _ = top_k_rows(reference, k)
+    reference[rows, queries] = 1.0
+
+    full_bytes = n_movies * n_movies * 8
+    report = []
+    for precision in precisions:
+        if precision == 'int8':
+            values, scales = quantize_rows(reference, queries)
+            stored = values.astype(np.float32) * scales[:, None]
+            nbytes = n_movies * n_movies + n_movies * 4
+        else:
+            stored = reference.astype(precision).astype(np.float64)
+            nbytes = n_movies * n_movies * np.dtype(precision).itemsize
+        stored[rows, queries] = -np.inf
+        found, _ = top_k_rows(stored, k)
+
+        overlap = np.mean([len(np.intersect1d(a, b)) / max(len(a), 1) for a, b in zip(expected, found)])
+        exact = np.mean([np.array_equal(a, b) for a, b in zip(expected, found)])
+        report.append({'precision': precision, 'overlap': float(overlap), 'exact': float(exact),
+                       'bytes': int(nbytes), 'ratio': nbytes / full_bytes})
+    return report
+
+
+def format_precision_report(report, k=10):
+    lines = [f"{'precision':<10} {f'top-{k} overlap':>15} {'same order':>11} {'N x N size':>12} {'vs float64':>11}"]
+    for row in report:
+        lines.append(f"{row['precision']:<10} {row['overlap']:>15.4f} {row['exact']:>11.4f} "
+                     f"{row['bytes'] / 1e6:>10.1f}MB {row['ratio']:>10.2f}x")
+    return '\n'.join(lines)
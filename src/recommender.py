@@ -2,11 +2,30 @@ import numpy as np
 import pandas as pd
 import pickle
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
+import time
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import TruncatedSVD
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 import warnings
+
+from ann import IVFIndex, sparse_random_projection
+from artifacts import is_bundle, load_bundle, save_bundle
+from cache import PreprocessingCache
+from candidates import (DEFAULT_CANDIDATES, FactorCandidateIndex, RetrievalStage,
+                        content_candidates, content_scores, popularity_order)
+from embeddings import fit_lsa, lsa_transform
+from fusion import DEFAULT_WEIGHTS, blend_scores
+from ingestion import stream_preprocess
+from parsing import COLUMN_PARSERS, parse_metadata_columns
+from preprocessing import build_tags
+from quantization import QuantizedMatrix, to_precision, to_rating_dtype
+from similarity import (NeighborIndex, build_similarity_matrix, build_topk_neighbors,
+                        extend_topk_neighbors, prepare_vectors, to_dense)
+from simulation import generate_synthetic_ratings
+from topk import top_k_indices, top_k_rows
 warnings.filterwarnings('ignore')
 
 class HybridRecommender:
@@ -24,13 +43,93 @@ class HybridRecommender:
         self.credits_df = None
         self.processed_df = None
         self.tfidf_matrix = None
+        self.tfidf_vectorizer = None
+        self.content_embeddings = None
+        self.lsa_components = None
+        self.content_params = {}
+        self.movies_added_since_build = 0
         self.similarity_matrix = None
+        self.neighbor_index = None
+        self.ann_index = None
         self.svd_model = None
         self.user_movie_matrix = None
+        self.user_factors = None
+        self.item_factors = None
+        self._user_factor_buffer = None
+        self._rating_buffers = None
+        self._factor_candidates = None
+        self._popularity_order = None
+        self._content_vectors_cache = None
+        self.title_index = {}
+        self.movie_id_index = {}
+        self.hybrid_weights = DEFAULT_WEIGHTS
+        self.hybrid_normalization = 'minmax'
+        self.preprocess_seconds = None
+        self.preprocess_cache_hit = None
+        self.load_seconds = None
+        self.warm_up_seconds = None
         self.scaler = StandardScaler()
         
-    def load_and_preprocess_data(self):
-        """Load and preprocess the movie and credits data"""
+    def load_and_preprocess_data(self, n_workers=1, chunksize=None, store_dir='artifacts/preprocessed',
+                                 cache_dir=None, n_users=1000, rating_dtype='float32'):
+        """
+        Load and preprocess the movie and credits data
+        
+        Args:
+            n_workers: Number of processes used to parse the JSON-like columns
+            chunksize: If set, stream both CSVs this many rows at a time, join
+                them on movie_id and write the preprocessed rows to a columnar
+                store in store_dir instead of merging the full files in memory
+            store_dir: Columnar store written by the streaming mode
+            cache_dir: If set, reuse the preprocessed data cached there for the
+                same input files and mode, and cache it on a miss
+            n_users: Number of simulated users in the user-movie matrix
+            rating_dtype: Storage dtype of the user-movie matrix, 'float32' or
+                'uint8' (exact for the 1-6 ratings, a quarter of the memory)
+        """
+        cache = PreprocessingCache(cache_dir) if cache_dir else None
+        if cache:
+            params = {'streaming': bool(chunksize)}
+            key = cache.key([self.movies_data, self.credits_data], params)
+            start = time.time()
+            cached = cache.load(key)
+        
+        if cache and cached:
+            store, info = cached
+            self.processed_df = store.read()
+            self.preprocess_seconds = time.time() - start
+            self.preprocess_cache_hit = True
+            print(f"Preprocessing cache hit ({key[:12]}): loaded in {self.preprocess_seconds:.2f}s, "
+                  f"saved {info['preprocess_seconds'] - self.preprocess_seconds:.2f}s")
+        else:
+            start = time.time()
+            if chunksize:
+                print(f"Streaming data in chunks of {chunksize} rows...")
+                self.movies_df = None
+                self.credits_df = None
+                store = stream_preprocess(self.movies_data, self.credits_data, store_dir,
+                                          chunksize=chunksize, n_workers=n_workers)
+                self.processed_df = store.read()
+            else:
+                self._load_in_memory(n_workers)
+            self.preprocess_seconds = time.time() - start
+            
+            self.preprocess_cache_hit = False if cache else None
+            if cache:
+                cache.save(key, self.processed_df, self.preprocess_seconds, params)
+                print(f"Preprocessing cache miss ({key[:12]}): preprocessed in "
+                      f"{self.preprocess_seconds:.2f}s, cached to {cache.entry_dir(key)}")
+        
+        # Build the title / movie_id lookup index
+        self._build_lookup_index()
+        
+        # Create user-movie interaction matrix (simulated)
+        self._create_user_movie_matrix(n_users=n_users, rating_dtype=rating_dtype)
+        
+        print(f"Processed {len(self.processed_df)} movies")
+        
+    def _load_in_memory(self, n_workers=1):
+        """Read both CSVs fully, merge them on title and build the tags"""
         print("Loading data...")
         self.movies_df = pd.read_csv(self.movies_data)
         self.credits_df = pd.read_csv(self.credits_data)
@@ -46,283 +145,1082 @@ class HybridRecommender:
         
         # Handle missing values
         self.processed_df.dropna(subset=['overview', 'genres', 'keywords'], inplace=True)
+        self.processed_df.reset_index(drop=True, inplace=True)
         
-        # Convert string representations to lists
-        self.processed_df['genres'] = self.processed_df['genres'].apply(self._parse_json_column)
-        self.processed_df['keywords'] = self.processed_df['keywords'].apply(self._parse_json_column)
-        self.processed_df['cast'] = self.processed_df['cast'].apply(self._parse_cast_column)
-        self.processed_df['crew'] = self.processed_df['crew'].apply(self._parse_crew_column)
+        # Convert string representations to lists (names, top 3 cast, directors)
+        parsed = parse_metadata_columns(self.processed_df, n_workers=n_workers)
+        for column, values in parsed.items():
+            self.processed_df[column] = values
         
         # Create enhanced tags
-        self.processed_df['tags'] = self.processed_df.apply(self._create_tags, axis=1)
+        self.processed_df['tags'] = build_tags(self.processed_df)
         
-        # Create user-movie interaction matrix (simulated)
-        self._create_user_movie_matrix()
+    def _build_lookup_index(self):
+        """
+        Build hash indexes from title and movie_id to row position
         
-        print(f"Processed {len(self.processed_df)} movies")
+        When several movies share a title, the title maps to the first one in
+        processed_df order (the same movie a title filter would have picked).
+        """
+        self.title_index = {}
+        for position, title in enumerate(self.processed_df['title'].tolist()):
+            self.title_index.setdefault(title, position)
         
-    def _parse_json_column(self, text):
-        """Parse JSON-like string columns"""
-        try:
-            import ast
-            data = ast.literal_eval(text)
-            if isinstance(data, list):
-                return [item.get('name', '') for item in data if item.get('name')]
-            return []
-        except:
-            return []
+        self.movie_id_index = {
+            movie_id: position
+            for position, movie_id in enumerate(self.processed_df['movie_id'].tolist())
+        }
     
-    def _parse_cast_column(self, text):
-        """Parse cast column and get top 3 actors"""
-        try:
-            import ast
-            data = ast.literal_eval(text)
-            if isinstance(data, list):
-                return [item.get('name', '') for item in data[:3] if item.get('name')]
-            return []
-        except:
-            return []
+    def get_movie_position(self, movie_title):
+        """Row position of a movie by title, or None if the title is unknown"""
+        return self.title_index.get(movie_title)
     
-    def _parse_crew_column(self, text):
-        """Parse crew column and get directors"""
-        try:
-            import ast
-            data = ast.literal_eval(text)
-            if isinstance(data, list):
-                directors = [item.get('name', '') for item in data if item.get('job') == 'Director']
-                return directors[:2]  # Get up to 2 directors
-            return []
-        except:
-            return []
+    def _create_user_movie_matrix(self, n_users=1000, ratings_per_user=(10, 50), seed=42,
+                                  dense=False, rating_dtype='float32'):
+        """
+        Create a simulated user-movie interaction matrix
+        
+        Args:
+            n_users: Number of simulated users
+            ratings_per_user: (low, high) range of ratings drawn per user
+            seed: Random seed for reproducibility
+            dense: Convert to a dense array instead of keeping scipy.sparse CSR
+            rating_dtype: Storage dtype of the ratings, 'float32' or 'uint8'
+        """
+        print("Creating user-movie interaction matrix...")
+        
+        # Synthetic user ratings based on movie popularity and vote average
+        ratings = generate_synthetic_ratings(
+            self.processed_df['popularity'].values,
+            self.processed_df['vote_average'].values,
+            n_users=n_users,
+            ratings_per_user=ratings_per_user,
+            seed=seed
+        )
+        
+        ratings = to_rating_dtype(ratings, rating_dtype)
+        self.user_movie_matrix = ratings.toarray() if dense else ratings
+        
+        print(f"Created user-movie matrix: {self.user_movie_matrix.shape}")
     
-    def _create_tags(self, row):
-        """Create comprehensive tags for each movie"""
-        tags = []
+    def build_content_based_model(self, top_k=None, block_size=256, n_workers=1,
+                                  use_processes=False, similarity_path=None,
+                                  max_features=5000, ngram_range=(1, 2), min_df=2,
+                                  vectorizer='tfidf', hash_features=2 ** 18, precision='float64',
+                                  ann=None, embedding_dim=None):
+        """
+        Build the content-based recommendation model
         
-        # Add overview words
-        if pd.notna(row['overview']):
-            tags.extend(str(row['overview']).lower().split()[:20])  # Limit to first 20 words
+        Args:
+            top_k: If set, keep only the top_k neighbors of each movie in a
+                sparse neighbor index instead of the dense N x N matrix
+            block_size: Rows scored at once by the blockwise builders
+            n_workers: Number of blocks scored concurrently
+            use_processes: Use a process pool instead of a thread pool
+            similarity_path: If set (and top_k is not), stream the full float32
+                matrix blockwise to this .npy file and memory-map it
+            max_features: TF-IDF vocabulary size
+            ngram_range: TF-IDF (min_n, max_n) word n-gram range
+            min_df: Minimum number of movies a TF-IDF term must appear in
+            vectorizer: 'tfidf' for a fitted vocabulary, or 'hashing' to hash
+                terms into hash_features columns (max_features and min_df are
+                then unused), so movies added later keep words the original
+                catalog never contained
+            hash_features: Number of columns of the hashing vectorizer
+            precision: Storage of the dense similarity matrix: 'float64',
+                'float32', 'float16' or 'int8' (a QuantizedMatrix with one
+                scale per row). Anything below float64 also builds the TF-IDF
+                matrix in float32. Neighbor-index scores are always float32.
+            ann: If set, a dict of build_ann_index options (may be empty) to
+                build an approximate nearest neighbor index; unless top_k or
+                similarity_path is also set, it replaces the dense matrix
+            embedding_dim: If set, reduce the TF-IDF matrix to LSA embeddings
+                of this dimension (see embeddings.fit_lsa) and measure content
+                similarity between embeddings: the neighbor index, similarity
+                matrix and ANN index are built from them, and without top_k,
+                similarity_path or ann no N x N matrix is built, each query
+                being one dense embedding_dim matrix-vector product
+        """
+        print("Building content-based model...")
+        
+        dtype = np.float64 if precision == 'float64' else np.float32
+        if vectorizer == 'tfidf':
+            # Use TF-IDF instead of CountVectorizer for better text representation
+            tfidf = TfidfVectorizer(max_features=max_features, stop_words='english', 
+                                   ngram_range=tuple(ngram_range), min_df=min_df, dtype=dtype)
+        elif vectorizer == 'hashing':
+            tfidf = make_pipeline(
+                HashingVectorizer(n_features=hash_features, stop_words='english',
+                                  ngram_range=tuple(ngram_range), alternate_sign=False, norm=None,
+                                  dtype=dtype),
+                TfidfTransformer()
+            )
+        else:
+            raise ValueError(f"Unknown vectorizer {vectorizer!r}; expected 'tfidf' or 'hashing'")
+        
+        self.tfidf_matrix = tfidf.fit_transform(self.processed_df['tags'])
+        
+        # Kept so add_movies can vectorize new movies and rebuild with the same settings
+        self.tfidf_vectorizer = tfidf
+        self.content_params = {
+            'top_k': top_k, 'block_size': block_size, 'n_workers': n_workers,
+            'use_processes': use_processes, 'similarity_path': similarity_path,
+            'max_features': max_features, 'ngram_range': tuple(ngram_range), 'min_df': min_df,
+            'vectorizer': vectorizer, 'hash_features': hash_features, 'precision': precision,
+            'ann': ann, 'embedding_dim': embedding_dim,
+        }
+        self.movies_added_since_build = 0
+        self.ann_index = None
         
-        # Add genres
-        tags.extend([genre.lower().replace(' ', '') for genre in row['genres']])
+        self.content_embeddings = self.lsa_components = None
+        if embedding_dim:
+            start = time.perf_counter()
+            self.content_embeddings, self.lsa_components = fit_lsa(self.tfidf_matrix, embedding_dim)
+            print(f"Reduced TF-IDF to {self.content_embeddings.shape[1]}-dimensional LSA embeddings "
+                  f"({self.content_embeddings.nbytes / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+        content_matrix = self._content_matrix()
         
-        # Add keywords
-        tags.extend([keyword.lower().replace(' ', '') for keyword in row['keywords']])
+        if top_k:
+            self.similarity_matrix = None
+            self.neighbor_index = build_topk_neighbors(content_matrix, top_k, block_size,
+                                                       n_workers, use_processes)
+            print(f"Built top-{top_k} neighbor index ({self.neighbor_index.nbytes / 1e6:.1f} MB)")
+        elif similarity_path:
+            self.neighbor_index = None
+            self.similarity_matrix = build_similarity_matrix(content_matrix, similarity_path,
+                                                             block_size, n_workers, use_processes)
+            print(f"Streamed similarity matrix to {similarity_path}")
+        elif ann is not None or embedding_dim:
+            self.neighbor_index = None
+            self.similarity_matrix = None
+        else:
+            self.neighbor_index = None
+            self.similarity_matrix = cosine_similarity(content_matrix)
         
-        # Add cast
-        tags.extend([actor.lower().replace(' ', '') for actor in row['cast']])
+        if ann is not None:
+            self.build_ann_index(**ann)
         
-        # Add crew (directors)
-        tags.extend([director.lower().replace(' ', '') for director in row['crew']])
+        if self.similarity_matrix is not None and precision != 'float64':
+            self.similarity_matrix = to_precision(self.similarity_matrix, precision)
+            print(f"Stored similarity matrix as {precision} "
+                  f"({self.similarity_matrix.nbytes / 1e6:.1f} MB)")
         
-        return ' '.join(tags)
+        print("Content-based model built successfully")
     
-    def _create_user_movie_matrix(self):
-        """Create a simulated user-movie interaction matrix"""
-        print("Creating user-movie interaction matrix...")
+    def build_ann_index(self, n_components=128, n_lists=None, n_iter=10, seed=0):
+        """
+        Build an approximate nearest neighbor index over the TF-IDF vectors
         
-        # Create synthetic user ratings based on movie popularity and vote average
-        np.random.seed(42)  # For reproducibility
+        Movies are embedded with a sparse random projection of their
+        normalized TF-IDF rows and grouped into inverted lists by spherical
+        k-means (see ann.IVFIndex), so a query scans a few lists instead of
+        the catalog and nothing of size N x N is ever built. When LSA
+        embeddings exist, they are indexed as they are.
         
-        n_users = 1000  # Simulate 1000 users
-        n_movies = len(self.processed_df)
+        Args:
+            n_components: Embedding dimension of the random projection
+                (unused with LSA embeddings)
+            n_lists: Number of inverted lists; defaults to sqrt(n_movies)
+            n_iter: k-means iterations
+            seed: Random seed of the projection and of k-means
+        """
+        start = time.perf_counter()
+        vectors = self._content_vectors()
+        if self.content_embeddings is not None:
+            projection = np.eye(vectors.shape[1], dtype=np.float32)
+        else:
+            projection = sparse_random_projection(vectors.shape[1], n_components, seed)
+        self.ann_index = IVFIndex.build(vectors, projection, n_lists, n_iter, seed=seed)
         
-        # Create base ratings based on movie popularity and vote average
-        base_ratings = []
-        for _, movie in self.processed_df.iterrows():
-            # Normalize popularity and vote average to 0-1 scale
-            popularity_norm = min(movie['popularity'] / 100, 1.0)
-            vote_avg_norm = movie['vote_average'] / 10.0
-            
-            # Combine them with weights
-            base_rating = 0.6 * popularity_norm + 0.4 * vote_avg_norm
-            
-            # Add some randomness
-            base_rating += np.random.normal(0, 0.1)
-            base_rating = np.clip(base_rating, 0, 1)
-            
-            base_ratings.append(base_rating)
+        # Recorded so a content rebuild (add_movies rebuild_after) recreates it; next
+        # to a dense matrix the option would drop that matrix on rebuild, so it is not
+        if self.similarity_matrix is None:
+            self.content_params['ann'] = {'n_components': n_components, 'n_lists': n_lists,
+                                          'n_iter': n_iter, 'seed': seed}
+        print(f"Built ANN index: {self.ann_index.n_lists} lists over {self.ann_index.n_items} movies "
+              f"({self.ann_index.nbytes / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+    
+    def get_ann_recommendations(self, movie_title, n_recommendations=5, n_probe=8, rerank=10):
+        """
+        Get content-based recommendations from the approximate nearest neighbor index
         
-        # Create user-movie matrix
-        self.user_movie_matrix = np.zeros((n_users, n_movies))
+        Args:
+            movie_title: Seed movie title
+            n_recommendations: Number of recommendations
+            n_probe: Inverted lists scanned; more lists raise recall and latency
+            rerank: Re-score the best rerank * n_recommendations candidates
+                with exact content similarity (TF-IDF, or the LSA embeddings
+                when built) and return those scores; 0 returns the index's
+                embedding similarities as they are
         
-        for user in range(n_users):
-            # Each user rates a random subset of movies
-            n_ratings = np.random.randint(10, 50)  # User rates 10-50 movies
-            rated_movies = np.random.choice(n_movies, n_ratings, replace=False)
-            
-            for movie_idx in rated_movies:
-                # Add user-specific variation to base rating
-                user_rating = base_ratings[movie_idx] + np.random.normal(0, 0.2)
-                user_rating = np.clip(user_rating, 0, 1)
-                
-                # Convert to 1-5 scale
-                self.user_movie_matrix[user, movie_idx] = int(user_rating * 5) + 1
+        Returns:
+            List of recommendation dicts with similarity_score, like
+            get_content_based_recommendations
+        """
+        movie_idx = self.title_index.get(movie_title)
+        if movie_idx is None or self.ann_index is None:
+            return []
         
-        print(f"Created user-movie matrix: {self.user_movie_matrix.shape}")
+        indices, scores = self._ann_neighbors(movie_idx, n_recommendations, n_probe, rerank)
+        return [self._recommendation(idx, similarity_score=score) for idx, score in zip(indices, scores)]
     
-    def build_content_based_model(self):
-        """Build the content-based recommendation model"""
-        print("Building content-based model...")
+    def _ann_neighbors(self, movie_idx, k, n_probe=8, rerank=10):
+        """(indices, scores) of the approximate top-k neighbors of a movie, best first"""
+        query = self.ann_index.item_vectors(movie_idx)
+        candidates, scores = self.ann_index.search(query, k * max(rerank, 1), n_probe, exclude=[movie_idx])
+        if rerank:
+            vectors = self._content_vectors()
+            scores = to_dense(vectors[candidates] @ vectors[movie_idx].T).ravel()
+        best = top_k_indices(scores, k)
+        return candidates[best], scores[best]
+    
+    def add_movies(self, movies, rebuild_after=None):
+        """
+        Add movies to the catalog without refitting the content model
         
-        # Use TF-IDF instead of CountVectorizer for better text representation
-        tfidf = TfidfVectorizer(max_features=5000, stop_words='english', 
-                               ngram_range=(1, 2), min_df=2)
+        New movies are tagged and vectorized with the fitted vectorizer (the
+        persisted vocabulary and IDF weights, or the hashing vectorizer), and
+        only their similarities are computed. With a top-K neighbor index the
+        new rows are appended and existing movies gain a new movie as
+        neighbor only if it beats their current k-th score; a dense
+        similarity matrix is grown by the new rows and columns. The lookup
+        index is patched in place. New movies have no ratings yet, so their
+        item factors are zero until the collaborative model is retrained.
         
-        self.tfidf_matrix = tfidf.fit_transform(self.processed_df['tags'])
-        self.similarity_matrix = cosine_similarity(self.tfidf_matrix)
+        Args:
+            movies: DataFrame (or list of dicts) with the processed_df columns
+                except tags; 'id' is accepted for 'movie_id', and genres /
+                keywords / cast / crew may be raw TMDB JSON strings
+            rebuild_after: If set, refit the content model from scratch once
+                this many movies have been added since the last full build
         
-        print("Content-based model built successfully")
+        Returns:
+            Number of movies added (movie_ids already in the catalog are skipped)
+        """
+        if self.tfidf_vectorizer is None:
+            raise ValueError("add_movies needs a fitted content model; build or load one first")
+        
+        new_movies = self._prepare_new_movies(movies)
+        if new_movies.empty:
+            return 0
+        
+        n_old = len(self.processed_df)
+        self.tfidf_matrix = sparse.vstack(
+            [self.tfidf_matrix, self.tfidf_vectorizer.transform(new_movies['tags'])], format='csr')
+        self.processed_df = pd.concat([self.processed_df, new_movies], ignore_index=True)
+        if self.lsa_components is not None:
+            self.content_embeddings = np.vstack([self.content_embeddings,
+                                                 lsa_transform(self.tfidf_matrix[n_old:], self.lsa_components)])
+        
+        for position, (title, movie_id) in enumerate(
+                zip(new_movies['title'].tolist(), new_movies['movie_id'].tolist()), start=n_old):
+            self.title_index.setdefault(title, position)
+            self.movie_id_index[movie_id] = position
+        
+        self.movies_added_since_build += len(new_movies)
+        if rebuild_after and self.movies_added_since_build >= rebuild_after:
+            print(f"Rebuilding content model after {self.movies_added_since_build} added movies...")
+            self.build_content_based_model(**self.content_params)
+        elif self.neighbor_index is not None:
+            k = self.content_params.get('top_k') or int(np.diff(self.neighbor_index.indptr).max(initial=0))
+            self.neighbor_index = extend_topk_neighbors(self.neighbor_index, self._content_matrix(), k,
+                                                        self.content_params.get('block_size', 256))
+        elif self.similarity_matrix is not None:
+            extended = self._extended_similarity_matrix(n_old)
+            if isinstance(self.similarity_matrix, QuantizedMatrix):
+                extended = QuantizedMatrix.from_dense(extended, exclude_diagonal=True)
+            self.similarity_matrix = extended
+        
+        if self.ann_index is not None and self.ann_index.n_items < len(self.processed_df):
+            self.ann_index = self.ann_index.extended(self._content_vectors()[n_old:])
+        
+        self._extend_item_side(len(new_movies))
+        self._clear_derived_caches()
+        
+        print(f"Added {len(new_movies)} movies ({len(self.processed_df)} in catalog)")
+        return len(new_movies)
     
-    def build_collaborative_model(self):
-        """Build the collaborative filtering model using SVD"""
+    def _prepare_new_movies(self, movies):
+        """Normalize new movies to the processed_df layout and tag them"""
+        new_movies = pd.DataFrame(movies).reset_index(drop=True)
+        if 'movie_id' not in new_movies and 'id' in new_movies:
+            new_movies = new_movies.rename(columns={'id': 'movie_id'})
+        
+        known = new_movies['movie_id'].isin(self.movie_id_index.keys())
+        new_movies = new_movies[~known].drop_duplicates('movie_id').reset_index(drop=True)
+        
+        # Raw JSON-like columns are parsed like the training data; missing ones are empty
+        raw_columns = [column for column in COLUMN_PARSERS if column in new_movies
+                       and new_movies[column].map(lambda value: isinstance(value, str)).any()]
+        for column, values in parse_metadata_columns(new_movies, columns=raw_columns).items():
+            new_movies[column] = values
+        new_movies = new_movies.reindex(columns=[column for column in self.processed_df.columns
+                                                 if column != 'tags'])
+        for column in COLUMN_PARSERS:
+            new_movies[column] = [value if isinstance(value, list) else []
+                                  for value in new_movies[column]]
+        
+        new_movies['tags'] = build_tags(new_movies)
+        return new_movies
+    
+    def _extended_similarity_matrix(self, n_old):
+        """Dense similarity matrix grown by the rows and columns of the movies after n_old"""
+        vectors = self._content_vectors()
+        new_rows = to_dense(vectors[n_old:] @ vectors.T)
+        n_movies = vectors.shape[0]
+        
+        similarity = np.empty((n_movies, n_movies), dtype=self.similarity_matrix.dtype)
+        similarity[:n_old, :n_old] = np.asarray(self.similarity_matrix)
+        similarity[n_old:] = new_rows
+        similarity[:n_old, n_old:] = new_rows[:, :n_old].T
+        return similarity
+    
+    def _extend_item_side(self, n_new):
+        """Give new movies empty rating columns and zero item factors"""
+        if self.user_movie_matrix is not None:
+            n_users, n_items = self.user_movie_matrix.shape
+            if sparse.issparse(self.user_movie_matrix):
+                ratings = self.user_movie_matrix.tocsr()
+                self.user_movie_matrix = sparse.csr_matrix(
+                    (ratings.data, ratings.indices, ratings.indptr), shape=(n_users, n_items + n_new))
+            else:
+                self.user_movie_matrix = np.pad(self.user_movie_matrix, ((0, 0), (0, n_new)))
+        
+        if self.item_factors is not None:
+            padding = np.zeros((n_new, self.item_factors.shape[1]), dtype=self.item_factors.dtype)
+            self.item_factors = np.vstack([self.item_factors, padding])
+    
+    def build_collaborative_model(self, n_components=50, random_state=42):
+        """
+        Build the collaborative filtering model using SVD
+        
+        Args:
+            n_components: Number of latent factors
+            random_state: Seed of the randomized SVD solver
+        """
         print("Building collaborative filtering model...")
         
-        # Apply SVD to the user-movie matrix
-        self.svd_model = TruncatedSVD(n_components=50, random_state=42)
+        # Apply SVD to the user-movie matrix (CSR is used as-is, never densified)
+        self.svd_model = TruncatedSVD(n_components=n_components, random_state=random_state)
         
         # Fit the model
         self.svd_model.fit(self.user_movie_matrix)
+        self._compute_latent_factors()
         
         print("Collaborative filtering model built successfully")
     
+    def _compute_latent_factors(self):
+        """
+        Precompute float32 user and item factors from the fitted SVD model
+        
+        A user's predicted ratings are ``user_factors[u] @ item_factors.T``, which
+        equals ``inverse_transform(transform(ratings[u]))`` without redoing the
+        projection on every request.
+        """
+        self.user_factors = np.ascontiguousarray(
+            self.svd_model.transform(self.user_movie_matrix), dtype=np.float32)
+        self.item_factors = np.ascontiguousarray(self.svd_model.components_.T, dtype=np.float32)
+    
     def get_content_based_recommendations(self, movie_title, n_recommendations=5):
         """Get content-based recommendations"""
         try:
-            movie_idx = self.processed_df[self.processed_df['title'] == movie_title].index[0]
-            movie_similarities = self.similarity_matrix[movie_idx]
-            
-            # Get top similar movies (excluding the movie itself)
-            similar_indices = np.argsort(movie_similarities)[::-1][1:n_recommendations+1]
+            movie_idx = self.title_index[movie_title]
             
-            recommendations = []
-            for idx in similar_indices:
-                movie_info = self.processed_df.iloc[idx]
-                recommendations.append({
-                    'title': movie_info['title'],
-                    'similarity_score': movie_similarities[idx],
-                    'genres': movie_info['genres'],
-                    'vote_average': movie_info['vote_average'],
-                    'overview': movie_info['overview'][:100] + '...' if len(str(movie_info['overview'])) > 100 else movie_info['overview']
-                })
+            if self.neighbor_index is not None:
+                # Neighbors are stored pre-sorted and never include the movie itself
+                neighbor_indices, neighbor_scores = self.neighbor_index.neighbors(movie_idx)
+                similar_indices = neighbor_indices[:n_recommendations]
+                similar_scores = neighbor_scores[:n_recommendations]
+            elif self.similarity_matrix is None and self.ann_index is not None:
+                similar_indices, similar_scores = self._ann_neighbors(movie_idx, n_recommendations)
+            else:
+                if self.similarity_matrix is not None:
+                    movie_similarities = self.similarity_matrix[movie_idx]
+                else:
+                    # One dense GEMV against the LSA embeddings (or a sparse TF-IDF product)
+                    vectors = self._content_vectors()
+                    movie_similarities = to_dense(vectors @ vectors[movie_idx].T).ravel()
+                
+                # Get top similar movies (excluding the movie itself)
+                similar_indices = top_k_indices(movie_similarities, n_recommendations,
+                                                exclude=[movie_idx])
+                similar_scores = movie_similarities[similar_indices]
             
-            return recommendations
+            return [self._recommendation(idx, similarity_score=score)
+                    for idx, score in zip(similar_indices, similar_scores)]
         except:
             return []
     
+    def get_multi_seed_recommendations(self, movie_titles, n_recommendations=5, weights=None):
+        """
+        Get "because you liked" recommendations from several seed movies
+        
+        Each movie is scored by its weighted similarity to all seeds at once:
+        with a neighbor index, the seeds' neighbor rows are summed in one
+        sparse product; otherwise the seeds' normalized content vectors
+        (TF-IDF rows, or LSA embeddings when built) are summed into one
+        profile vector and every movie is scored against it with a single
+        matrix-vector product. Either way the cost grows
+        with the number of seeds only through the seed rows, so a 50-title
+        watch history is one request rather than 50.
+        
+        Args:
+            movie_titles: Seed movie titles, e.g. a user's watch history;
+                unknown titles are ignored
+            n_recommendations: Number of recommendations
+            weights: Optional weight per title (e.g. the user's ratings or a
+                recency decay); equal weights by default. Repeated titles add up.
+        
+        Returns:
+            List of recommendation dicts with similarity_score (the weighted
+            mean similarity to the seeds) and because_you_liked (the title of
+            the seed contributing most to that movie). Seeds are never returned.
+        """
+        weights = np.ones(len(movie_titles)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(movie_titles):
+            raise ValueError("weights must have one entry per movie title")
+        
+        positions = self._title_positions(movie_titles)
+        known = positions >= 0
+        positions, weights = positions[known], weights[known]
+        if len(positions) == 0 or not weights.any():
+            return []
+        
+        # Merge repeated seeds, then scale weights to a weighted mean
+        seeds, inverse = np.unique(positions, return_inverse=True)
+        seed_weights = np.bincount(inverse, weights=weights, minlength=len(seeds))
+        seed_weights = (seed_weights / np.abs(seed_weights).sum()).astype(np.float32)
+        
+        if self.neighbor_index is not None:
+            seed_rows = self.neighbor_index.rows(seeds)
+            scores = np.asarray(seed_rows.T @ seed_weights).ravel()
+        else:
+            vectors = self._content_vectors()
+            seed_rows = vectors[seeds]
+            profile = np.asarray(seed_rows.T @ seed_weights).ravel()
+            scores = np.asarray(vectors @ profile).ravel()
+        
+        recommended = top_k_indices(scores, n_recommendations, exclude=seeds)
+        if len(recommended) == 0:
+            return []
+        
+        # Per-seed contributions of the recommended movies only (seeds x k)
+        if self.neighbor_index is not None:
+            contributions = seed_rows[:, recommended].toarray()
+        else:
+            contributions = to_dense(seed_rows @ vectors[recommended].T)
+        strongest = seeds[np.argmax(contributions * seed_weights[:, None], axis=0)]
+        titles = self.processed_df['title']
+        
+        recommendations = []
+        for idx, seed in zip(recommended, strongest):
+            recommendation = self._recommendation(idx, similarity_score=scores[idx])
+            recommendation['because_you_liked'] = titles.iat[seed]
+            recommendations.append(recommendation)
+        return recommendations
+    
+    def _content_matrix(self):
+        """What content similarity is measured on: the LSA embeddings if built, else TF-IDF"""
+        return self.tfidf_matrix if self.content_embeddings is None else self.content_embeddings
+    
+    def _content_vectors(self):
+        """L2-normalized float32 rows of _content_matrix, cached until that matrix is replaced"""
+        matrix = self._content_matrix()
+        cached = self._content_vectors_cache
+        if cached is None or cached[0] is not matrix:
+            cached = self._content_vectors_cache = (matrix, prepare_vectors(matrix))
+        return cached[1]
+    
     def get_collaborative_recommendations(self, user_id, n_recommendations=5):
         """Get collaborative filtering recommendations for a user"""
         try:
-            # Get user's movie ratings
-            user_ratings = self.user_movie_matrix[user_id]
-            
-            # Find movies the user hasn't rated (rating == 0)
-            unrated_movies = np.where(user_ratings == 0)[0]
-            
-            if len(unrated_movies) == 0:
+            # Negative ids would otherwise index users from the end
+            if not 0 <= user_id < len(self.user_factors):
                 return []
             
-            # Predict ratings for unrated movies
-            predicted_ratings = self.svd_model.transform(user_ratings.reshape(1, -1))
-            reconstructed_ratings = self.svd_model.inverse_transform(predicted_ratings).flatten()
-            
-            # Get predicted ratings for unrated movies
-            unrated_predictions = reconstructed_ratings[unrated_movies]
+            # Predict ratings for every movie
+            predicted_ratings = self._collaborative_scores(user_id)
             
-            # Get top recommendations
-            top_indices = np.argsort(unrated_predictions)[::-1][:n_recommendations]
-            recommended_movies = unrated_movies[top_indices]
+            # Take the top predictions among movies the user hasn't rated
+            _, rated_movies = self._user_ratings(user_id)
+            recommended_movies = top_k_indices(predicted_ratings, n_recommendations,
+                                               exclude=rated_movies)
             
-            recommendations = []
-            for idx in recommended_movies:
-                movie_info = self.processed_df.iloc[idx]
-                recommendations.append({
-                    'title': movie_info['title'],
-                    'predicted_rating': reconstructed_ratings[idx],
-                    'genres': movie_info['genres'],
-                    'vote_average': movie_info['vote_average'],
-                    'overview': movie_info['overview'][:100] + '...' if len(str(movie_info['overview'])) > 100 else movie_info['overview']
-                })
-            
-            return recommendations
+            return [self._recommendation(idx, predicted_rating=predicted_ratings[idx])
+                    for idx in recommended_movies]
         except:
             return []
     
-    def get_hybrid_recommendations(self, movie_title=None, user_id=None, n_recommendations=5):
-        """Get hybrid recommendations combining both approaches"""
-        content_recs = []
-        collaborative_recs = []
+    def _recommendation(self, idx, **scores):
+        """Recommendation dict of the movie at row idx, with the given float scores"""
+        # Per-column lookups; iloc[idx] would build a mixed-dtype row Series first
+        movie_info = {column: self.processed_df[column].iat[idx]
+                      for column in ('movie_id', 'title', 'genres', 'vote_average', 'overview')}
+        recommendation = {
+            'movie_id': movie_info['movie_id'],
+            'title': movie_info['title'],
+        }
+        recommendation.update({name: float(score) for name, score in scores.items()})
+        recommendation.update({
+            'genres': movie_info['genres'],
+            'vote_average': movie_info['vote_average'],
+            'overview': movie_info['overview'][:100] + '...' if len(str(movie_info['overview'])) > 100 else movie_info['overview']
+        })
+        return recommendation
+    
+    def _collaborative_scores(self, user_id):
+        """
+        Predicted ratings of every movie for a user
+        
+        One dot product of the user's latent vector against the item factors.
+        """
+        return self.item_factors @ self.user_factors[user_id]
+    
+    def _user_ratings(self, user_id):
+        """
+        Return (ratings row as a 1 x n_movies matrix, indices of rated movies)
+        
+        Works for both the CSR user-movie matrix and legacy dense arrays.
+        """
+        if sparse.issparse(self.user_movie_matrix):
+            row = self.user_movie_matrix[user_id]
+            return row, row.indices
+        
+        row = np.asarray(self.user_movie_matrix[user_id]).reshape(1, -1)
+        return row, np.flatnonzero(row[0])
+    
+    def add_ratings(self, events):
+        """
+        Ingest rating events and fold the affected users into the SVD model
         
-        # Get content-based recommendations if movie title is provided
-        if movie_title:
-            content_recs = self.get_content_based_recommendations(movie_title, n_recommendations)
+        Each event sets one (user, movie) rating, later events winning over
+        earlier ones and over existing ratings. The affected users' latent
+        vectors are then recomputed in closed form against the fixed item
+        factors, ``user_factors[u] = ratings[u] @ item_factors``, which is
+        exactly what TruncatedSVD.transform gives a user, so nothing is
+        refitted. A user_id beyond the last row adds new users (rows in
+        between start empty).
         
-        # Get collaborative recommendations if user_id is provided
+        Args:
+            events: DataFrame with user_id, movie_id and rating columns, or an
+                iterable of (user_id, movie_id, rating) tuples
+        
+        Returns:
+            Number of events applied
+        
+        Raises:
+            ValueError: If an event has a user_id that is not a non-negative
+                integer or a movie_id missing from the catalog; nothing is
+                applied then
+        """
+        if self.item_factors is None:
+            raise ValueError("add_ratings needs a collaborative model; build or load one first")
+        
+        events = pd.DataFrame(events)
+        if events.empty:
+            return 0
+        if not {'user_id', 'movie_id', 'rating'}.issubset(events.columns):
+            events.columns = ['user_id', 'movie_id', 'rating']
+        
+        def event_at(mask):
+            row = int(np.argmax(mask))
+            return tuple(events[column].tolist()[row] for column in ('user_id', 'movie_id', 'rating'))
+        
+        user_ids = pd.to_numeric(events['user_id'], errors='coerce')
+        bad_users = ~((user_ids >= 0) & (user_ids % 1 == 0)).to_numpy()
+        if bad_users.any():
+            raise ValueError(f"Invalid user_id in rating event {event_at(bad_users)}: "
+                             f"user ids must be non-negative integers")
+        
+        columns = events['movie_id'].map(self.movie_id_index)
+        unknown = columns.isna().to_numpy()
+        if unknown.any():
+            raise ValueError(f"Unknown movie_id in rating event {event_at(unknown)}")
+        
+        users = user_ids.to_numpy(dtype=np.int64)
+        columns = columns.to_numpy().astype(np.int64)
+        ratings = events['rating'].to_numpy(dtype=np.float32)
+        if self.user_movie_matrix.dtype == np.uint8:
+            # Refuse ratings a uint8 matrix would silently truncate
+            ratings = to_rating_dtype(ratings, 'uint8')
+        
+        # Keep the last event per (user, movie)
+        n_users, n_movies = self.user_movie_matrix.shape
+        cells = users * n_movies + columns
+        _, last = np.unique(cells[::-1], return_index=True)
+        last = len(cells) - 1 - last
+        users, columns, ratings = users[last], columns[last], ratings[last]
+        
+        new_n_users = max(n_users, int(users.max()) + 1)
+        if sparse.issparse(self.user_movie_matrix) and users.min() >= n_users:
+            # Only brand-new users: append their rows without touching the others
+            self.user_movie_matrix = self._append_user_rows(new_n_users, users, columns, ratings)
+            self._grow_users(new_n_users)
+        elif sparse.issparse(self.user_movie_matrix):
+            self._grow_users(new_n_users)
+            self.user_movie_matrix = _set_csr_cells(self.user_movie_matrix, users, columns, ratings)
+        else:
+            self._grow_users(new_n_users)
+            self.user_movie_matrix[users, columns] = ratings
+        
+        touched = np.unique(users)
+        self.user_factors[touched] = np.asarray(
+            self.user_movie_matrix[touched] @ self.item_factors, dtype=np.float32)
+        self._clear_derived_caches()
+        
+        print(f"Folded in {len(ratings)} ratings for {len(touched)} users "
+              f"({new_n_users - n_users} new)")
+        return len(events)
+    
+    def _append_user_rows(self, n_users, users, columns, ratings):
+        """
+        CSR user-movie matrix with rows for users past the current last row
+        
+        The CSR arrays live in buffers with spare capacity (25% more when they
+        fill up), so adding a user writes only that user's ratings instead of
+        copying the whole matrix.
+        """
+        matrix = self.user_movie_matrix.tocsr()
+        old_n_users, n_movies = matrix.shape
+        order = np.lexsort((columns, users))
+        keep = ratings[order] != 0
+        users, columns, ratings = users[order][keep], columns[order][keep], ratings[order][keep]
+        nnz = matrix.nnz
+        new_nnz = nnz + len(ratings)
+        
+        buffers = self._rating_buffers
+        if (buffers is None or matrix.data.base is not buffers[0]
+                or matrix.indices.base is not buffers[1] or matrix.indptr.base is not buffers[2]
+                or len(buffers[0]) < new_nnz or len(buffers[2]) < n_users + 1):
+            index_dtype = np.int64 if new_nnz > np.iinfo(np.int32).max else matrix.indices.dtype
+            data = np.empty(max(new_nnz, nnz + nnz // 4), dtype=matrix.data.dtype)
+            indices = np.empty(len(data), dtype=index_dtype)
+            indptr = np.empty(max(n_users, old_n_users + old_n_users // 4) + 1, dtype=index_dtype)
+            data[:nnz] = matrix.data
+            indices[:nnz] = matrix.indices
+            indptr[:old_n_users + 1] = matrix.indptr
+            buffers = self._rating_buffers = (data, indices, indptr)
+        
+        data, indices, indptr = buffers
+        data[nnz:new_nnz] = ratings
+        indices[nnz:new_nnz] = columns
+        counts = np.bincount(users - old_n_users, minlength=n_users - old_n_users)
+        indptr[old_n_users + 1:n_users + 1] = nnz + np.cumsum(counts)
+        return sparse.csr_matrix((data[:new_nnz], indices[:new_nnz], indptr[:n_users + 1]),
+                                 shape=(n_users, n_movies), copy=False)
+    
+    def _grow_users(self, n_users):
+        """Append empty rating rows and zero factors up to n_users users"""
+        old_n_users, n_movies = self.user_movie_matrix.shape
+        extra = n_users - old_n_users
+        
+        if extra > 0 and sparse.issparse(self.user_movie_matrix):
+            ratings = self.user_movie_matrix.tocsr()
+            indptr = np.concatenate([ratings.indptr, np.full(extra, ratings.indptr[-1])])
+            self.user_movie_matrix = sparse.csr_matrix(
+                (ratings.data, ratings.indices, indptr), shape=(n_users, n_movies))
+        elif extra > 0:
+            self.user_movie_matrix = np.pad(self.user_movie_matrix, ((0, extra), (0, 0)))
+        
+        # Factors live in a buffer with spare rows so adding users one at a time
+        # does not copy every factor; a read-only memory map is copied once here
+        buffer = self._user_factor_buffer
+        if (buffer is None or self.user_factors.base is not buffer
+                or len(buffer) < n_users):
+            capacity = max(n_users, len(self.user_factors) + len(self.user_factors) // 4)
+            buffer = np.zeros((capacity, self.user_factors.shape[1]), dtype=np.float32)
+            buffer[:len(self.user_factors)] = self.user_factors
+            self._user_factor_buffer = buffer
+        self.user_factors = buffer[:max(n_users, len(self.user_factors))]
+    
+    def get_hybrid_recommendations(self, movie_title=None, user_id=None, n_recommendations=5,
+                                   weights=None, normalization=None):
+        """
+        Get hybrid recommendations combining both approaches
+        
+        Both score vectors are computed over the whole catalog: the content
+        similarity to the seed movie and the user's predicted ratings. Each
+        is normalized, the two are blended with one weighted sum and a
+        single top-k is taken, so a movie that is fairly similar and fairly
+        well rated can beat one that is only strong on one side. The seed
+        movie and movies the user already rated are excluded. With only a
+        title or only a user (or if one of them is unknown), this falls back
+        to the content-based or collaborative method.
+        
+        Args:
+            movie_title: Seed movie title
+            user_id: User id (row of the user-movie matrix)
+            n_recommendations: Number of recommendations
+            weights: (content_weight, collaborative_weight); defaults to
+                hybrid_weights
+            normalization: 'minmax' or 'zscore' (see fusion.normalize_scores);
+                defaults to hybrid_normalization
+        
+        Returns:
+            List of recommendation dicts with similarity_score,
+            predicted_rating and the blended combined_score
+        """
+        position = self.title_index.get(movie_title) if movie_title else None
+        known_user = (user_id is not None and self.user_factors is not None
+                      and 0 <= user_id < len(self.user_factors))
+        
+        if position is None and not known_user:
+            return []
+        if position is None:
+            return self.get_collaborative_recommendations(user_id, n_recommendations)
+        if not known_user:
+            return self.get_content_based_recommendations(movie_title, n_recommendations)
+        
+        content_scores = self._content_score_block(np.array([position]))
+        predicted_ratings = self._collaborative_score_block(np.array([user_id]))
+        combined = blend_scores(content_scores, predicted_ratings,
+                                weights or self.hybrid_weights,
+                                normalization or self.hybrid_normalization)
+        
+        indices, scores = top_k_rows(combined, n_recommendations)
+        return [
+            self._recommendation(idx, similarity_score=content_scores[0, idx],
+                                 predicted_rating=predicted_ratings[0, idx], combined_score=score)
+            for idx, score in zip(indices[0], scores[0]) if np.isfinite(score)
+        ]
+    
+    def get_two_stage_recommendations(self, movie_title=None, user_id=None, n_recommendations=5,
+                                      n_candidates=None, weights=None, normalization=None,
+                                      return_stats=False):
+        """
+        Get hybrid recommendations by re-ranking a small candidate set
+        
+        Instead of scoring the whole catalog, cheap generators each propose
+        a few hundred movies: the seed's content neighbors (one row of the
+        neighbor index), items loading heavily on the user's strongest
+        latent factors (see candidates.FactorCandidateIndex) and the most
+        popular movies. Only their union is scored and blended like
+        get_hybrid_recommendations, so a request costs O(candidates) rather
+        than O(catalog) once a neighbor index is built. Scores are
+        normalized over the candidates, so the ranking can differ slightly
+        from the full-catalog blend; benchmarks/bench_two_stage.py measures
+        recall against it.
+        
+        Args:
+            movie_title: Seed movie title (optional)
+            user_id: User id (optional)
+            n_recommendations: Number of recommendations
+            n_candidates: Dict of generator name ('content', 'collaborative',
+                'popularity') to the number of candidates it proposes;
+                missing generators use DEFAULT_CANDIDATES, 0 disables one
+            weights: (content_weight, collaborative_weight); defaults to
+                hybrid_weights
+            normalization: 'minmax' or 'zscore'; defaults to hybrid_normalization
+            return_stats: Also return per-stage timings and candidate counts
+        
+        Returns:
+            List of recommendation dicts, or (recommendations, stats) with
+            return_stats, stats being a list of RetrievalStage(name, seconds,
+            candidates) for each generator, the merge and the re-rank
+        """
+        n_candidates = dict(DEFAULT_CANDIDATES, **(n_candidates or {}))
+        position = self.title_index.get(movie_title) if movie_title else None
+        if user_id is not None and not (self.user_factors is not None
+                                        and 0 <= user_id < len(self.user_factors)):
+            user_id = None
+        content_sources = {'neighbor_index': self.neighbor_index,
+                           'similarity_matrix': self.similarity_matrix, 'vectors': None}
+        if position is not None and self.neighbor_index is None and self.similarity_matrix is None:
+            content_sources['vectors'] = self._content_vectors()
+        
+        generators = {}
+        if position is not None:
+            generators['content'] = lambda n: content_candidates(position, n, ann_index=self.ann_index,
+                                                                 **content_sources)
         if user_id is not None:
-            collaborative_recs = self.get_collaborative_recommendations(user_id, n_recommendations)
+            generators['collaborative'] = lambda n: self._factor_candidate_index().candidates(
+                self.user_factors[user_id], n)
+        if generators:
+            generators['popularity'] = lambda n: self._popular_positions()[:n]
         
-        # Combine recommendations
-        if content_recs and collaborative_recs:
-            # Hybrid approach: combine and re-rank
-            all_recs = content_recs + collaborative_recs
-            
-            # Remove duplicates based on title
-            seen_titles = set()
-            unique_recs = []
-            for rec in all_recs:
-                if rec['title'] not in seen_titles:
-                    seen_titles.add(rec['title'])
-                    unique_recs.append(rec)
-            
-            # Sort by a combined score
-            for rec in unique_recs:
-                if 'similarity_score' in rec:
-                    rec['combined_score'] = rec['similarity_score']
-                elif 'predicted_rating' in rec:
-                    rec['combined_score'] = rec['predicted_rating'] / 5.0  # Normalize to 0-1
+        stats = []
+        proposed = []
+        for name, generate in generators.items():
+            start = time.perf_counter()
+            found = generate(n_candidates[name]) if n_candidates[name] > 0 else np.empty(0, dtype=np.int64)
+            stats.append(RetrievalStage(name, time.perf_counter() - start, len(found)))
+            proposed.append(found)
+        
+        start = time.perf_counter()
+        candidates = np.unique(np.concatenate(proposed)) if proposed else np.empty(0, dtype=np.int64)
+        excluded = np.zeros(len(candidates), dtype=bool)
+        if position is not None:
+            excluded |= candidates == position
+        if user_id is not None:
+            excluded |= np.isin(candidates, self._user_ratings(user_id)[1])
+        candidates = candidates[~excluded]
+        stats.append(RetrievalStage('merge', time.perf_counter() - start, len(candidates)))
+        
+        start = time.perf_counter()
+        scores = {}
+        if position is not None:
+            scores['similarity_score'] = content_scores(position, candidates, **content_sources)
+        if user_id is not None:
+            scores['predicted_rating'] = self.item_factors[candidates] @ self.user_factors[user_id]
+        if len(scores) == 2:
+            ranking = scores['combined_score'] = blend_scores(
+                scores['similarity_score'][None], scores['predicted_rating'][None],
+                weights or self.hybrid_weights, normalization or self.hybrid_normalization)[0]
+        else:
+            ranking = next(iter(scores.values()), np.empty(0))
+        
+        best = top_k_indices(ranking, n_recommendations)
+        recommendations = [
+            self._recommendation(candidates[i], **{name: values[i] for name, values in scores.items()})
+            for i in best
+        ]
+        stats.append(RetrievalStage('rerank', time.perf_counter() - start, len(recommendations)))
+        
+        return (recommendations, stats) if return_stats else recommendations
+    
+    def _clear_derived_caches(self):
+        """Drop the lookups derived from the catalog and factors; the next request rebuilds them"""
+        self._factor_candidates = None
+        self._popularity_order = None
+    
+    def _factor_candidate_index(self):
+        """FactorCandidateIndex of the current item factors, rebuilt when they change"""
+        if self._factor_candidates is None or self._factor_candidates.item_factors is not self.item_factors:
+            self._factor_candidates = FactorCandidateIndex(self.item_factors)
+        return self._factor_candidates
+    
+    def _popular_positions(self):
+        """Movie positions by descending popularity, rebuilt when the catalog changes"""
+        if self._popularity_order is None or len(self._popularity_order) != len(self.processed_df):
+            self._popularity_order = popularity_order(self.processed_df['popularity'].to_numpy())
+        return self._popularity_order
+    
+    def get_content_based_recommendations_batch(self, movie_titles, n_recommendations=5,
+                                                chunk_size=1024):
+        """
+        Get content-based recommendations for many seed movies at once
+        
+        Args:
+            movie_titles: Sequence of seed movie titles
+            n_recommendations: Number of recommendations per seed
+            chunk_size: Seeds scored per block, bounding memory to
+                chunk_size x n_movies float32 values
+        
+        Returns:
+            Tuple of (movie_ids, scores) arrays of shape
+            (len(movie_titles), n_recommendations), best first. Unknown titles
+            and unfilled slots have movie_id -1 and score -inf.
+        """
+        positions = self._title_positions(movie_titles)
+        return self._batch_top_k(positions, n_recommendations, chunk_size,
+                                 lambda rows: self._content_score_block(positions[rows]))
+    
+    def get_collaborative_recommendations_batch(self, user_ids, n_recommendations=5,
+                                                chunk_size=1024):
+        """
+        Get collaborative recommendations for many users at once
+        
+        Scores each chunk of users with one matrix multiply of their latent
+        factors against the item factors, masks rated movies and takes a
+        row-wise argpartition top-k.
+        
+        Args:
+            user_ids: Sequence of user ids (rows of the user-movie matrix)
+            n_recommendations: Number of recommendations per user
+            chunk_size: Users scored per block
+        
+        Returns:
+            Tuple of (movie_ids, scores) arrays of shape
+            (len(user_ids), n_recommendations), best first, scores being
+            predicted ratings. Unknown user ids (negative or beyond the
+            trained users) and unfilled slots have movie_id -1 and score -inf.
+        """
+        user_ids = self._user_rows(user_ids)
+        return self._batch_top_k(user_ids, n_recommendations, chunk_size,
+                                 lambda rows: self._collaborative_score_block(user_ids[rows]))
+    
+    def get_hybrid_recommendations_batch(self, movie_titles, user_ids, n_recommendations=5,
+                                         chunk_size=1024, weights=None, normalization=None):
+        """
+        Get hybrid recommendations for many (seed movie, user) pairs at once
+        
+        Scores are blended exactly like get_hybrid_recommendations, one
+        block of pairs at a time.
+        
+        Args:
+            movie_titles: Sequence of seed movie titles
+            user_ids: Sequence of user ids, same length as movie_titles
+            n_recommendations: Number of recommendations per pair
+            chunk_size: Pairs scored per block
+            weights: (content_weight, collaborative_weight); defaults to
+                hybrid_weights
+            normalization: 'minmax' or 'zscore'; defaults to hybrid_normalization
+        
+        Returns:
+            Tuple of (movie_ids, scores) arrays of shape
+            (len(movie_titles), n_recommendations), best first. Pairs with an
+            unknown title or user id are left unfilled (movie_id -1, score -inf).
+        """
+        positions = self._title_positions(movie_titles)
+        user_ids = self._user_rows(user_ids)
+        if len(positions) != len(user_ids):
+            raise ValueError("movie_titles and user_ids must have the same length")
+        positions = np.where(user_ids >= 0, positions, -1)
+        
+        def score_block(rows):
+            content_scores = self._content_score_block(positions[rows])
+            predicted_ratings = self._collaborative_score_block(user_ids[rows])
+            return blend_scores(content_scores, predicted_ratings, weights or self.hybrid_weights,
+                                normalization or self.hybrid_normalization)
+        
+        return self._batch_top_k(positions, n_recommendations, chunk_size, score_block)
+    
+    def _batch_top_k(self, keys, n_recommendations, chunk_size, score_block):
+        """Run score_block over chunks of keys and collect row-wise top-k movie ids"""
+        n_queries = len(keys)
+        k = min(n_recommendations, len(self.processed_df))
+        movie_ids = np.full((n_queries, k), -1, dtype=np.int64)
+        scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        catalog_ids = self.processed_df['movie_id'].to_numpy(dtype=np.int64)
+        
+        for start in range(0, n_queries, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, n_queries))
+            valid = rows[keys[rows] >= 0]
+            if len(valid) == 0:
+                continue
             
-            unique_recs.sort(key=lambda x: x.get('combined_score', 0), reverse=True)
-            return unique_recs[:n_recommendations]
+            block_indices, block_scores = top_k_rows(score_block(valid), k)
+            found = np.isfinite(block_scores)
+            movie_ids[valid] = np.where(found, catalog_ids[block_indices], -1)
+            scores[valid] = block_scores
+        
+        return movie_ids, scores
+    
+    def _user_rows(self, user_ids):
+        """User ids as int64 rows of the factor matrix, -1 when out of range"""
+        user_ids = np.asarray(user_ids, dtype=np.int64).reshape(-1)
+        n_users = 0 if self.user_factors is None else len(self.user_factors)
+        return np.where((user_ids >= 0) & (user_ids < n_users), user_ids, -1)
+    
+    def _title_positions(self, movie_titles):
+        """Row positions of the given titles (first match), -1 when unknown"""
+        return np.fromiter((self.title_index.get(title, -1) for title in movie_titles),
+                           dtype=np.int64, count=len(movie_titles))
+    
+    def _content_score_block(self, positions):
+        """
+        Dense float32 content similarities of the given movies to every movie
         
-        elif content_recs:
-            return content_recs
-        elif collaborative_recs:
-            return collaborative_recs
+        The seed movies themselves are set to -inf. With a neighbor index,
+        movies outside a seed's top-K neighbors score 0.
+        """
+        rows = np.arange(len(positions))
+        
+        if self.neighbor_index is not None:
+            block = self.neighbor_index.rows(positions).toarray()
+        elif self.similarity_matrix is not None:
+            block = np.asarray(self.similarity_matrix[positions], dtype=np.float32)
         else:
-            return []
+            vectors = self._content_vectors()
+            block = to_dense(vectors[positions] @ vectors.T)
+        
+        block[rows, positions] = -np.inf
+        return block
+    
+    def _collaborative_score_block(self, user_ids):
+        """Predicted ratings of every movie for the given users, -inf for rated movies"""
+        block = self.user_factors[user_ids] @ self.item_factors.T
+        
+        if sparse.issparse(self.user_movie_matrix):
+            ratings = self.user_movie_matrix[user_ids]
+            rated_rows = np.repeat(np.arange(len(user_ids)), np.diff(ratings.indptr))
+            block[rated_rows, ratings.indices] = -np.inf
+        else:
+            block[np.asarray(self.user_movie_matrix[user_ids]) != 0] = -np.inf
+        
+        return block
     
     def save_models(self, output_dir='artifacts'):
-        """Save all models and data for later use"""
-        os.makedirs(output_dir, exist_ok=True)
+        """
+        Save all models and data for later use
         
+        Writes an artifact bundle: numeric arrays as memory-mappable .npy files,
+        small objects as pickles, and a versioned manifest.json with checksums.
+        """
         print("Saving models...")
         
-        # Save processed data
-        with open(f'{output_dir}/processed_movies.pkl', 'wb') as f:
-            pickle.dump(self.processed_df, f)
+        arrays = self._artifact_arrays()
         
-        # Save similarity matrix
-        with open(f'{output_dir}/similarity_matrix.pkl', 'wb') as f:
-            pickle.dump(self.similarity_matrix, f)
+        objects = {
+            'processed_movies': self.processed_df,
+            'svd_model': self.svd_model,
+            'lookup_index': {'title_index': self.title_index, 'movie_id_index': self.movie_id_index},
+            'content_model': None if self.tfidf_vectorizer is None else {
+                'vectorizer': self.tfidf_vectorizer,
+                'params': self.content_params,
+                'movies_added_since_build': self.movies_added_since_build,
+            },
+        }
         
-        # Save TF-IDF matrix
-        with open(f'{output_dir}/tfidf_matrix.pkl', 'wb') as f:
-            pickle.dump(self.tfidf_matrix, f)
+        metadata = {'n_movies': len(self.processed_df)}
+        if self.user_movie_matrix is not None:
+            metadata['n_users'] = self.user_movie_matrix.shape[0]
         
-        # Save SVD model
-        with open(f'{output_dir}/svd_model.pkl', 'wb') as f:
-            pickle.dump(self.svd_model, f)
-        
-        # Save user-movie matrix
-        with open(f'{output_dir}/user_movie_matrix.pkl', 'wb') as f:
-            pickle.dump(self.user_movie_matrix, f)
+        save_bundle(output_dir, arrays, objects, metadata)
         
         print(f"Models saved to {output_dir}")
     
-    def load_models(self, input_dir='artifacts'):
-        """Load pre-trained models and data"""
+    def _artifact_arrays(self):
+        """Numeric arrays (dense or sparse) that make up the trained model, by name"""
+        arrays = {
+            'similarity_matrix': self.similarity_matrix,
+            'tfidf_matrix': self.tfidf_matrix,
+            'content_embeddings': self.content_embeddings,
+            'lsa_components': self.lsa_components,
+            'user_movie_matrix': self.user_movie_matrix,
+            'user_factors': self.user_factors,
+            'item_factors': self.item_factors,
+        }
+        if isinstance(self.similarity_matrix, QuantizedMatrix):
+            del arrays['similarity_matrix']
+            for name, array in self.similarity_matrix.to_dict().items():
+                arrays[f'similarity_matrix.{name}'] = array
+        if self.neighbor_index is not None:
+            for name, array in self.neighbor_index.to_dict().items():
+                arrays[f'neighbor_index.{name}'] = array
+        if self.ann_index is not None:
+            for name, array in self.ann_index.to_dict().items():
+                arrays[f'ann_index.{name}'] = array
+        return arrays
+    
+    def load_models(self, input_dir='artifacts', verify=False):
+        """
+        Load pre-trained models and data
+        
+        Artifact bundles are memory-mapped, so loading is near-instant and the
+        arrays are shared between processes through the OS page cache. The
+        loose pickles written by the original version are still supported.
+        
+        Args:
+            input_dir: Directory containing the artifacts
+            verify: Check bundle files against their manifest checksums
+        """
         print("Loading models...")
+        start = time.perf_counter()
+        self._clear_derived_caches()
+        
+        if is_bundle(input_dir):
+            try:
+                self._load_bundle(input_dir, verify)
+            except ValueError as e:
+                print(f"Could not load model bundle: {e}")
+                return False
+            
+            self.load_seconds = time.perf_counter() - start
+            print("Models loaded successfully")
+            return True
         
+        # The five loose pickles written before artifact bundles existed
         try:
             with open(f'{input_dir}/processed_movies.pkl', 'rb') as f:
                 self.processed_df = pickle.load(f)
@@ -338,9 +1236,148 @@ class HybridRecommender:
             
             with open(f'{input_dir}/user_movie_matrix.pkl', 'rb') as f:
                 self.user_movie_matrix = pickle.load(f)
+            if sparse.issparse(self.user_movie_matrix):
+                self.user_movie_matrix = self.user_movie_matrix.tocsr()
+            
+            # Derive what those artifacts never stored
+            self.processed_df.reset_index(drop=True, inplace=True)
+            self._build_lookup_index()
+            self._compute_latent_factors()
             
+            self.load_seconds = time.perf_counter() - start
             print("Models loaded successfully")
             return True
         except FileNotFoundError:
             print("Model files not found. Please train the model first.")
             return False
+    
+    def _load_bundle(self, input_dir, verify=False):
+        """Restore state from an artifact bundle written by save_models"""
+        arrays, objects, _ = load_bundle(input_dir, verify=verify)
+        
+        self.processed_df = objects['processed_movies']
+        self.svd_model = objects.get('svd_model')
+        self.title_index = objects['lookup_index']['title_index']
+        self.movie_id_index = objects['lookup_index']['movie_id_index']
+        
+        content_model = objects.get('content_model') or {}
+        self.tfidf_vectorizer = content_model.get('vectorizer')
+        self.content_params = content_model.get('params', {})
+        self.movies_added_since_build = content_model.get('movies_added_since_build', 0)
+        
+        self.similarity_matrix = arrays.get('similarity_matrix')
+        if 'similarity_matrix.values' in arrays:
+            self.similarity_matrix = QuantizedMatrix.from_dict({
+                name: arrays[f'similarity_matrix.{name}'] for name in ('values', 'scales')
+            })
+        self.neighbor_index = None
+        if 'neighbor_index.indptr' in arrays:
+            self.neighbor_index = NeighborIndex.from_dict({
+                name: arrays[f'neighbor_index.{name}'] for name in ('indptr', 'indices', 'scores')
+            })
+        self.ann_index = None
+        if 'ann_index.centroids' in arrays:
+            self.ann_index = IVFIndex.from_dict({
+                name: arrays[f'ann_index.{name}']
+                for name in ('centroids', 'list_offsets', 'list_items', 'list_vectors', 'projection')
+            })
+        
+        self.tfidf_matrix = arrays.get('tfidf_matrix')
+        self.content_embeddings = arrays.get('content_embeddings')
+        self.lsa_components = arrays.get('lsa_components')
+        self.user_movie_matrix = arrays.get('user_movie_matrix')
+        self.user_factors = arrays.get('user_factors')
+        self.item_factors = arrays.get('item_factors')
+    
+    def warm_up(self):
+        """
+        Prime a freshly loaded model so the first request is as fast as later ones
+        
+        Touches every page of the (memory-mapped) arrays so they are pulled into
+        the OS page cache shared by all workers, makes sure the lookup index
+        exists, and runs one request through the content and collaborative paths.
+        
+        Returns:
+            Warm-up time in seconds
+        """
+        start = time.perf_counter()
+        
+        for array in self._artifact_arrays().values():
+            if array is None:
+                continue
+            parts = [array.data, array.indices, array.indptr] if sparse.issparse(array) else [array]
+            for part in parts:
+                _touch_pages(part)
+        
+        if not self.title_index:
+            self._build_lookup_index()
+        
+        if len(self.processed_df):
+            self.get_content_based_recommendations(self.processed_df['title'].iloc[0], 1)
+        if self.user_factors is not None and len(self.user_factors):
+            self.get_collaborative_recommendations(0, 1)
+        
+        self.warm_up_seconds = time.perf_counter() - start
+        return self.warm_up_seconds
+
+
+def _set_csr_cells(matrix, rows, cols, values):
+    """
+    Return a copy of a CSR matrix with the given cells set (0 removes a cell)
+    
+    Only the rows named in rows are rebuilt; every untouched run of rows is
+    copied with one slice assignment, so the cost is a memory copy of the
+    matrix rather than a sparse addition over all of it.
+    """
+    matrix = matrix.tocsr()
+    indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+    touched = np.unique(rows)
+    
+    # Existing entries of the touched rows, then the new values (later wins)
+    lengths = indptr[touched + 1] - indptr[touched]
+    offsets = np.repeat(indptr[touched] - np.cumsum(lengths) + lengths, lengths)
+    positions = np.arange(lengths.sum()) + offsets
+    merged_rows = np.concatenate([np.repeat(touched, lengths), rows])
+    merged_cols = np.concatenate([indices[positions], cols]).astype(np.int64)
+    merged_values = np.concatenate([data[positions], values]).astype(data.dtype)
+    
+    order = np.lexsort((np.arange(len(merged_rows)), merged_cols, merged_rows))
+    merged_rows, merged_cols, merged_values = merged_rows[order], merged_cols[order], merged_values[order]
+    last = np.ones(len(merged_rows), dtype=bool)
+    last[:-1] = (merged_rows[1:] != merged_rows[:-1]) | (merged_cols[1:] != merged_cols[:-1])
+    last &= merged_values != 0
+    merged_rows, merged_cols, merged_values = merged_rows[last], merged_cols[last], merged_values[last]
+    
+    counts = np.diff(indptr)
+    counts[touched] = np.bincount(np.searchsorted(touched, merged_rows), minlength=len(touched))
+    new_indptr = np.zeros(len(indptr), dtype=np.int64)
+    np.cumsum(counts, out=new_indptr[1:])
+    
+    new_indices = np.empty(new_indptr[-1], dtype=indices.dtype)
+    new_data = np.empty(new_indptr[-1], dtype=data.dtype)
+    
+    # Untouched rows between consecutive touched rows are contiguous in both layouts
+    bounds = np.concatenate([[0], touched + 1]), np.concatenate([touched, [len(indptr) - 1]])
+    for first, stop in zip(*bounds):
+        if first < stop:
+            old_span = slice(indptr[first], indptr[stop])
+            new_span = slice(new_indptr[first], new_indptr[stop])
+            new_indices[new_span] = indices[old_span]
+            new_data[new_span] = data[old_span]
+    
+    new_lengths = counts[touched]
+    targets = np.arange(new_lengths.sum()) + np.repeat(
+        new_indptr[touched] - np.cumsum(new_lengths) + new_lengths, new_lengths)
+    new_indices[targets] = merged_cols
+    new_data[targets] = merged_values
+    
+    return sparse.csr_matrix((new_data, new_indices, new_indptr), shape=matrix.shape)
+
+
+def _touch_pages(array, page_size=4096):
+    """Read one element per memory page so a memory-mapped array is paged in"""
+    flat = np.ravel(array)
+    if flat.size == 0:
+        return 0
+    step = max(page_size // flat.itemsize, 1)
+    return flat[::step].sum()
@@ -0,0 +1,330 @@
+import os
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from topk import top_k_rows
+
+
+class NeighborIndex:
+    """
+    Top-K most similar movies per movie, stored as CSR-style arrays
+
+    Row ``i`` holds its neighbors in ``indices[indptr[i]:indptr[i + 1]]``
+    with matching float32 cosine scores, sorted from most to least similar.
+    The movie itself is never listed as its own neighbor.
+    """
+
+    def __init__(self, indptr, indices, scores):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+
+    @property
+    def n_items(self):
+        return len(self.indptr) - 1
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.scores.nbytes
+
+    def neighbors(self, idx):
+        """Return (indices, scores) of the neighbors of movie ``idx``"""
+        start, stop = self.indptr[idx], self.indptr[idx + 1]
+        return self.indices[start:stop], self.scores[start:stop]
+
+    def row_thresholds(self, k):
+        """
+        Score a new neighbor must beat to enter each row
+
+        That is the row's weakest score once it holds k neighbors, and 0
+        before (only positive similarities are ever kept).
+        """
+        counts = np.diff(self.indptr)
+        thresholds = np.zeros(self.n_items, dtype=np.float32)
+        full = counts >= k
+        thresholds[full] = self.scores[self.indptr[1:][full] - 1]
+        return thresholds
+
+    def extended(self, new_counts, new_indices, new_scores, update_rows, update_cols,
+                 update_scores, k):
+        """
+        Return a new index with appended rows and candidate neighbors merged in
+
+        Args:
+            new_counts: Neighbor count of each appended row
+            new_indices: Neighbors of the appended rows, concatenated, best first
+            new_scores: Matching scores
+            update_rows: Existing rows that receive a candidate neighbor
+            update_cols: The candidate neighbors
+            update_scores: Their scores
+            k: Maximum number of neighbors per row
+
+        Only the rows named in update_rows are re-sorted; all other rows are
+        copied unchanged.
+        """
+        n_old = self.n_items
+        update_rows = np.asarray(update_rows, dtype=np.int64)
+        entry_rows = np.repeat(np.arange(n_old), np.diff(self.indptr))
+        affected = np.zeros(n_old, dtype=bool)
+        affected[update_rows] = True
+        touched = affected[entry_rows]
+
+        # Merge the affected rows' neighbors with their candidates and keep the best k
+        rows = np.concatenate([entry_rows[touched], update_rows])
+        cols = np.concatenate([self.indices[touched], np.asarray(update_cols, dtype=np.int32)])
+        scores = np.concatenate([self.scores[touched], np.asarray(update_scores, dtype=np.float32)])
+        order = np.lexsort((-scores, rows))
+        rows, cols, scores = rows[order], cols[order], scores[order]
+        keep = np.arange(len(rows)) - np.searchsorted(rows, rows) < k
+        rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+        # Each row's entries come from exactly one group, so a stable sort by row keeps them best-first
+        new_counts = np.asarray(new_counts, dtype=np.int64)
+        all_rows = np.concatenate([entry_rows[~touched], rows,
+                                   n_old + np.repeat(np.arange(len(new_counts)), new_counts)])
+        all_cols = np.concatenate([self.indices[~touched], cols, np.asarray(new_indices, dtype=np.int32)])
+        all_scores = np.concatenate([self.scores[~touched], scores, np.asarray(new_scores, dtype=np.float32)])
+        order = np.argsort(all_rows, kind='stable')
+
+        indptr = np.zeros(n_old + len(new_counts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_rows, minlength=n_old + len(new_counts)), out=indptr[1:])
+        return NeighborIndex(indptr, all_cols[order], all_scores[order])
+
+    def to_dict(self):
+        """Plain-array representation used for persistence"""
+        return {'indptr': self.indptr, 'indices': self.indices, 'scores': self.scores}
+
+    def rows(self, idx):
+        """Sparse len(idx) x n_items matrix holding the neighbor scores of the given movies"""
+        starts = self.indptr[idx]
+        lengths = self.indptr[np.asarray(idx) + 1] - starts
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        positions = np.arange(indptr[-1]) + np.repeat(starts - indptr[:-1], lengths)
+        return sparse.csr_matrix((self.scores[positions], self.indices[positions].astype(np.int64), indptr),
+                                 shape=(len(lengths), self.n_items))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['indptr'], data['indices'], data['scores'])
+
+
+def iter_row_blocks(n_rows, block_size):
+    """Yield (start, stop) bounds covering ``n_rows`` in blocks of ``block_size``"""
+    for start in range(0, n_rows, block_size):
+        yield start, min(start + block_size, n_rows)
+
+
+def prepare_vectors(matrix):
+    """
+    L2-normalize rows as float32 so dot products are cosines
+
+    Sparse TF-IDF rows stay CSR; dense rows (e.g. LSA embeddings) stay dense.
+    """
+    if not sparse.issparse(matrix):
+        return normalize(np.asarray(matrix, dtype=np.float32), norm='l2', copy=True)
+    return normalize(matrix.tocsr().astype(np.float32), norm='l2', copy=True)
+
+
+def to_dense(product):
+    """ndarray of a product that is sparse for TF-IDF rows and dense for embeddings"""
+    return product.toarray() if sparse.issparse(product) else np.asarray(product)
+
+
+def similarity_block(vectors, start, stop):
+    """Dense float32 cosine similarities of rows ``start:stop`` against all rows"""
+    return to_dense(vectors[start:stop] @ vectors.T)
+
+
+# Vectors shared with pool workers; set once per worker by _init_worker
+_worker_vectors = None
+
+
+def _init_worker(vectors):
+    global _worker_vectors
+    _worker_vectors = vectors
+
+
+def _topk_block_task(task):
+    """Score one block of rows and keep the top-k positive neighbors of each"""
+    start, stop, k = task
+    block = similarity_block(_worker_vectors, start, stop)
+    rows = np.arange(stop - start)
+    block[rows, start + rows] = -np.inf
+
+    indices, scores = top_k_rows(block, k)
+    keep = scores > 0
+    return keep.sum(axis=1), indices[keep].astype(np.int32), scores[keep].astype(np.float32)
+
+
+def _dense_block_task(task):
+    """Score one block of rows and write it into the on-disk .npy matrix"""
+    start, stop, path = task
+    block = similarity_block(_worker_vectors, start, stop)
+    out = np.load(path, mmap_mode='r+')
+    out[start:stop] = block
+    out.flush()
+    del out
+    return stop - start
+
+
+def _map_blocks(task_fn, tasks, vectors, n_workers=1, use_processes=False):
+    """
+    Run task_fn over tasks in order, serially or in a thread/process pool
+
+    Sparse products and dense conversions run in C, so threads already give a
+    useful speedup; processes avoid the GIL entirely at the cost of copying
+    the vectors to every worker once.
+    """
+    if n_workers <= 1:
+        _init_worker(vectors)
+        try:
+            for task in tasks:
+                yield task_fn(task)
+        finally:
+            _init_worker(None)
+        return
+
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                       initargs=(vectors,))
+    else:
+        _init_worker(vectors)
+        executor = ThreadPoolExecutor(max_workers=n_workers)
+
+    try:
+        with executor:
+            yield from executor.map(task_fn, tasks)
+    finally:
+        if not use_processes:
+            _init_worker(None)
+
+
+def build_topk_neighbors(matrix, k, block_size=256, n_workers=1, use_processes=False):
+    """
+    Build a top-K neighbor index from a TF-IDF matrix without the N x N matrix
+
+    Similarities are computed one block of rows at a time, so peak memory is
+    about ``block_size * n_movies`` float32 values per worker regardless of
+    catalog size. Neighbors with a zero score are dropped.
+
+    Args:
+        matrix: Sparse TF-IDF matrix (n_movies x n_features)
+        k: Number of neighbors to keep per movie
+        block_size: Number of rows to score at once
+        n_workers: Number of blocks scored concurrently
+        use_processes: Use a process pool instead of a thread pool
+    """
+    vectors = prepare_vectors(matrix)
+    n_items = vectors.shape[0]
+    k = max(min(k, n_items - 1), 0)
+
+    tasks = [(start, stop, k) for start, stop in iter_row_blocks(n_items, block_size)]
+    counts = []
+    block_indices = []
+    block_scores = []
+
+    for block_counts, indices, scores in _map_blocks(_topk_block_task, tasks, vectors,
+                                                     n_workers, use_processes):
+        counts.append(block_counts)
+        block_indices.append(indices)
+        block_scores.append(scores)
+
+    indptr = np.zeros(n_items + 1, dtype=np.int64)
+    if counts:
+        np.cumsum(np.concatenate(counts), out=indptr[1:])
+
+    return NeighborIndex(
+        indptr,
+        np.concatenate(block_indices) if block_indices else np.empty(0, dtype=np.int32),
+        np.concatenate(block_scores) if block_scores else np.empty(0, dtype=np.float32),
+    )
+
+
+def build_similarity_matrix(matrix, path, block_size=256, n_workers=1, use_processes=False):
+    """
+    Compute the full cosine similarity matrix blockwise, streaming it to disk
+
+    Each block of rows is multiplied against the transposed TF-IDF matrix and
+    written straight into a float32 ``.npy`` file, so RAM only ever holds
+    ``n_workers`` blocks. The file is streamed to ``path + '.tmp'`` and
+    renamed over ``path`` once complete, so readers that memory-mapped the
+    previous matrix keep a valid, unchanged file. The result is returned
+    memory-mapped read-only.
+
+    Args:
+        matrix: Sparse TF-IDF matrix (n_movies x n_features)
+        path: Destination ``.npy`` file
+        block_size: Number of rows to score at once
+        n_workers: Number of blocks scored concurrently
+        use_processes: Use a process pool instead of a thread pool
+    """
+    vectors = prepare_vectors(matrix)
+    n_items = vectors.shape[0]
+
+    tmp = path + '.tmp'
+    out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(n_items, n_items))
+    del out
+
+    tasks = [(start, stop, tmp) for start, stop in iter_row_blocks(n_items, block_size)]
+    for _ in _map_blocks(_dense_block_task, tasks, vectors, n_workers, use_processes):
+        pass
+
+    with open(tmp, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode='r')
+
+
+def extend_topk_neighbors(index, matrix, k, block_size=256):
+    """
+    Add the rows of matrix beyond index.n_items to a top-K neighbor index
+
+    Only the new rows are scored (against every row, new ones included).
+    Their own top-k lists are appended, and an existing movie gains a new
+    movie as neighbor only when it beats that movie's current k-th score, so
+    the result equals a full rebuild on the same TF-IDF vectors.
+
+    Args:
+        index: NeighborIndex over the first index.n_items rows of matrix
+        matrix: Sparse TF-IDF matrix of the whole, extended catalog
+        k: Number of neighbors to keep per movie
+        block_size: Number of new rows to score at once
+
+    Returns:
+        New NeighborIndex over all rows of matrix
+    """
+    vectors = prepare_vectors(matrix)
+    n_old, n_items = index.n_items, vectors.shape[0]
+    k = max(min(k, n_items - 1), 0)
+    thresholds = index.row_thresholds(k)
+
+    new_counts, new_indices, new_scores = [], [], []
+    update_rows, update_cols, update_scores = [], [], []
+    for start, stop in iter_row_blocks(n_items - n_old, block_size):
+        start, stop = n_old + start, n_old + stop
+        block = similarity_block(vectors, start, stop)
+        rows = np.arange(stop - start)
+        block[rows, start + rows] = -np.inf
+
+        indices, scores = top_k_rows(block, k)
+        keep = scores > 0
+        new_counts.append(keep.sum(axis=1))
+        new_indices.append(indices[keep])
+        new_scores.append(scores[keep])
+
+        # Existing movies for which a new movie beats their weakest neighbor
+        new_rows, old_rows = np.nonzero(block[:, :n_old] > thresholds)
+        update_rows.append(old_rows)
+        update_cols.append(start + new_rows)
+        update_scores.append(block[new_rows, old_rows])
+
+    def concat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+    return index.extended(concat(new_counts, np.int64), concat(new_indices, np.int32),
+                          concat(new_scores, np.float32), concat(update_rows, np.int64),
+                          concat(update_cols, np.int32), concat(update_scores, np.float32), k)
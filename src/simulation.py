@@ -0,0 +1,61 @@
+import numpy as np
+from scipy import sparse
+
+
+def generate_synthetic_ratings(popularity, vote_average, n_users=1000, ratings_per_user=(10, 50),
+                               seed=42):
+    """
+    Generate a simulated user-movie rating matrix directly in sparse form
+
+    Every movie gets a base score from its popularity and vote average; each
+    user rates a random subset of movies with user-specific noise around that
+    base, on a 1-6 integer scale. Everything is drawn in bulk with NumPy, so a
+    million users take seconds and no dense users x movies array is allocated.
+
+    Rated movies are drawn with replacement and repeats dropped, so a user can
+    end up with slightly fewer ratings than drawn.
+
+    Args:
+        popularity: Array of TMDB popularity values, one per movie
+        vote_average: Array of TMDB vote averages (0-10), one per movie
+        n_users: Number of simulated users
+        ratings_per_user: (low, high) range for the number of ratings drawn per
+            user, high exclusive; controls the density of the matrix
+        seed: Random seed for reproducibility
+
+    Returns:
+        scipy.sparse.csr_matrix of shape (n_users, n_movies) with float32 ratings
+    """
+    rng = np.random.default_rng(seed)
+
+    popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float64))
+    vote_average = np.nan_to_num(np.asarray(vote_average, dtype=np.float64))
+    n_movies = len(popularity)
+
+    # Base ratings: weighted popularity and vote average plus some randomness
+    popularity_norm = np.minimum(popularity / 100, 1.0)
+    vote_avg_norm = vote_average / 10.0
+    base_ratings = 0.6 * popularity_norm + 0.4 * vote_avg_norm
+    base_ratings = np.clip(base_ratings + rng.normal(0, 0.1, n_movies), 0, 1)
+
+    # Each user rates a random subset of movies
+    low, high = ratings_per_user
+    counts = np.minimum(rng.integers(low, high, size=n_users), n_movies)
+    users = np.repeat(np.arange(n_users, dtype=np.int64), counts)
+    movies = rng.integers(0, n_movies, size=users.size)
+
+    # Sorted unique (user, movie) keys give CSR order and drop repeated draws
+    keys = np.sort(users * n_movies + movies)
+    keys = keys[np.diff(keys, prepend=-1) != 0]
+    users = keys // n_movies
+    movies = (keys % n_movies).astype(np.int32)
+
+    # User-specific variation around the base rating, converted to 1-6 scale
+    user_ratings = np.clip(base_ratings[movies] + rng.normal(0, 0.2, keys.size), 0, 1)
+    values = (user_ratings * 5).astype(np.int64) + 1
+
+    indptr = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(users, minlength=n_users), out=indptr[1:])
+
+    return sparse.csr_matrix((values.astype(np.float32), movies, indptr),
+                             shape=(n_users, n_movies))
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+def top_k_indices(scores, k, exclude=None):
+    """
+    Return the indices of the k largest scores, best first
+
+    Uses argpartition so only the k selected entries are sorted, instead of
+    sorting the whole score vector.
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of indices to return
+        exclude: Optional indices or boolean mask of entries that must never
+            be returned (e.g. the seed movie or already-rated movies). Fewer
+            than k indices are returned if too few entries remain.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[0]
+
+    excluded = None
+    if exclude is not None:
+        excluded = np.zeros(n, dtype=bool)
+        excluded[exclude] = True
+        scores = scores.astype(np.result_type(scores.dtype, np.float32), copy=True)
+        scores[excluded] = -np.inf
+
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+
+    selected = candidates[np.argsort(-scores[candidates], kind='stable')]
+    if excluded is not None:
+        selected = selected[~excluded[selected]]
+    return selected
+
+
+def top_k_rows(block, k):
+    """
+    Row-wise top-k of a 2-D score block
+
+    Args:
+        block: 2-D array of scores, one row per query
+        k: Number of entries to keep per row
+
+    Returns:
+        Tuple of (indices, scores) arrays of shape (n_rows, k), best first
+    """
+    block = np.asarray(block)
+    n_cols = block.shape[1]
+    k = min(k, n_cols)
+    if k <= 0:
+        empty = np.empty((block.shape[0], 0))
+        return empty.astype(np.intp), empty.astype(block.dtype)
+
+    if k < n_cols:
+        candidates = np.argpartition(block, n_cols - k, axis=1)[:, n_cols - k:]
+    else:
+        candidates = np.broadcast_to(np.arange(n_cols), block.shape).copy()
+
+    values = np.take_along_axis(block, candidates, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    return (np.take_along_axis(candidates, order, axis=1),
+            np.take_along_axis(values, order, axis=1))
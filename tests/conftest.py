@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules under src/ import each other flatly, as the app and scripts do
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from _synthetic import make_catalog, make_recommender
+from embeddings import lsa_transform
+from quantization import QuantizedMatrix
+from recommender import HybridRecommender
+from similarity import build_topk_neighbors, extend_topk_neighbors, prepare_vectors, to_dense
+
+N_MOVIES, N_NEW, K = 300, 12, 10
+
+CONFIGURATIONS = {
+    'dense': {},
+    'top_k': {'top_k': K},
+    'int8': {'precision': 'int8'},
+    'ann': {'ann': {'n_components': 32}},
+    'lsa': {'embedding_dim': 16},
+    'lsa_top_k': {'embedding_dim': 16, 'top_k': K},
+}
+
+
+def assert_same_neighbors(index, expected):
+    assert index.n_items == expected.n_items
+    rows = np.arange(index.n_items)
+    np.testing.assert_allclose(index.rows(rows).toarray(), expected.rows(rows).toarray(), atol=1e-6)
+
+
+def test_extend_topk_neighbors_matches_full_build():
+    catalog = make_catalog(N_MOVIES, n_topics=20)
+    matrix = TfidfVectorizer(stop_words='english').fit_transform(catalog['tags'])
+
+    index = build_topk_neighbors(matrix[:N_MOVIES - N_NEW], K, block_size=64)
+    for stop in (N_MOVIES - N_NEW // 2, N_MOVIES):
+        # Extending twice must still equal one build over every row
+        index = extend_topk_neighbors(index, matrix[:stop], K, block_size=5)
+        assert_same_neighbors(index, build_topk_neighbors(matrix[:stop], K, block_size=64))
+
+
+@pytest.fixture
+def split_catalog():
+    recommender = make_recommender(N_MOVIES, n_users=50, n_topics=20)
+    catalog = recommender.processed_df.drop(columns='topic')
+    new_movies = catalog.iloc[-N_NEW:].drop(columns='tags')
+    new_movies['title'] = [f'New {i}' for i in range(N_NEW)]
+    recommender.processed_df = catalog.iloc[:-N_NEW].reset_index(drop=True)
+    recommender._build_lookup_index()
+    recommender._create_user_movie_matrix(n_users=50)
+    recommender.build_collaborative_model(n_components=8)
+    return recommender, new_movies
+
+
+@pytest.mark.parametrize('name', CONFIGURATIONS)
+def test_add_movies_matches_rebuild_on_same_vectors(split_catalog, tmp_path, name):
+    recommender, new_movies = split_catalog
+    recommender.build_content_based_model(**CONFIGURATIONS[name])
+    assert recommender.add_movies(new_movies) == N_NEW
+    assert len(recommender.processed_df) == N_MOVIES
+    assert recommender.item_factors.shape[0] == recommender.user_movie_matrix.shape[1] == N_MOVIES
+
+    if recommender.content_embeddings is not None:
+        np.testing.assert_allclose(
+            recommender.content_embeddings,
+            lsa_transform(recommender.tfidf_matrix, recommender.lsa_components), atol=1e-5)
+
+    vectors = prepare_vectors(recommender._content_matrix())
+    if recommender.neighbor_index is not None:
+        assert_same_neighbors(recommender.neighbor_index,
+                              build_topk_neighbors(recommender._content_matrix(), K))
+    elif isinstance(recommender.similarity_matrix, QuantizedMatrix):
+        # Off the (saturated) diagonal, within one quantization step
+        expected = to_dense(vectors @ vectors.T)
+        np.fill_diagonal(expected, 0)
+        actual = np.asarray(recommender.similarity_matrix)
+        np.fill_diagonal(actual, 0)
+        np.testing.assert_allclose(actual, expected, atol=recommender.similarity_matrix.scales.max())
+    elif recommender.similarity_matrix is not None:
+        np.testing.assert_allclose(recommender.similarity_matrix, to_dense(vectors @ vectors.T), atol=1e-6)
+    if recommender.ann_index is not None:
+        assert recommender.ann_index.n_items == N_MOVIES
+
+    titles = ['New 0', 'New 5', recommender.processed_df['title'][0]]
+    before = [recommender.get_content_based_recommendations(title, 5) for title in titles]
+    assert all(len(recommendations) == 5 for recommendations in before)
+
+    recommender.save_models(str(tmp_path))
+    loaded = HybridRecommender(movies_data=None, credits_data=None)
+    loaded.load_models(str(tmp_path), verify=True)
+    assert len(loaded.processed_df) == N_MOVIES
+    assert [loaded.get_content_based_recommendations(title, 5) for title in titles] == before
+
+
+def test_popularity_order_follows_the_catalog(split_catalog, tmp_path):
+    recommender, new_movies = split_catalog
+    recommender.build_content_based_model(top_k=K)
+    recommender._popular_positions()
+
+    new_movies['popularity'] = 1e6 + np.arange(N_NEW)
+    recommender.add_movies(new_movies)
+    assert recommender._popular_positions()[0] == N_MOVIES - 1
+
+    # A catalog of the same size with other popularities
+    recommender.save_models(str(tmp_path))
+    recommender.processed_df['popularity'] = -np.arange(N_MOVIES)
+    recommender.save_models(str(tmp_path / 'other'))
+    recommender.load_models(str(tmp_path))
+    recommender._popular_positions()
+    recommender.load_models(str(tmp_path / 'other'))
+    assert recommender._popular_positions()[0] == 0
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from _synthetic import make_recommender
+from recommender import _set_csr_cells
+
+
+@pytest.fixture
+def recommender():
+    recommender = make_recommender(200, n_users=60)
+    recommender.build_collaborative_model(n_components=8)
+    return recommender
+
+
+def dense_reference(matrix, events):
+    """Dense copy of a rating matrix with the events applied in order"""
+    n_users = max(matrix.shape[0], max(user for user, _, _ in events) + 1)
+    dense = np.zeros((n_users, matrix.shape[1]), dtype=np.float64)
+    dense[:matrix.shape[0]] = matrix.toarray()
+    for user, movie_id, rating in events:
+        dense[user, movie_id] = rating
+    return dense
+
+
+def test_set_csr_cells_matches_dense_reference():
+    rng = np.random.default_rng(0)
+    matrix = sparse.random(30, 20, density=0.2, format='csr', random_state=1, dtype=np.float32)
+    rows = rng.integers(0, 30, 50)
+    cols = rng.integers(0, 20, 50)
+    values = rng.integers(0, 6, 50).astype(np.float32)
+
+    expected = dense_reference(matrix, list(zip(rows, cols, values)))
+
+    result = _set_csr_cells(matrix, rows, cols, values)
+    np.testing.assert_array_equal(result.toarray(), expected)
+    # A 0 removes the cell instead of storing an explicit zero
+    assert not np.any(result.data == 0)
+    assert result.has_sorted_indices
+
+
+def test_add_ratings_matches_dense_reference(recommender):
+    ids = recommender.processed_df['movie_id'].to_numpy()
+    before = recommender.user_movie_matrix.copy()
+    existing_user, existing_col = before.nonzero()[0][0], before.nonzero()[1][0]
+    events = [
+        (3, ids[5], 4),
+        (3, ids[5], 2),                        # last event wins
+        (existing_user, ids[existing_col], 0), # 0 deletes an existing cell
+        (7, ids[10], 5),
+        (65, ids[1], 3),                       # new user past the last row
+    ]
+    recommender.add_ratings(events)
+
+    expected = dense_reference(before, [(user, recommender.movie_id_index[movie_id], rating)
+                                        for user, movie_id, rating in events])
+    result = recommender.user_movie_matrix
+    assert result.shape == expected.shape
+    np.testing.assert_array_equal(result.toarray(), expected)
+    assert not np.any(result.data == 0)
+
+
+def test_new_users_reuse_rating_buffers(recommender):
+    ids = recommender.processed_df['movie_id'].to_numpy()
+    before = recommender.user_movie_matrix.copy()
+    events = []
+    for user in range(60, 70):
+        batch = [(user, ids[user], 5), (user, ids[user + 1], 0), (user, ids[user], 3)]
+        recommender.add_ratings(batch)
+        events.extend(batch)
+        if user == 61:
+            data = recommender._rating_buffers[0]
+        if user > 61:
+            # Appends write into the same buffers while they have spare room
+            assert recommender.user_movie_matrix.data.base is data
+
+    expected = dense_reference(before, [(user, recommender.movie_id_index[movie_id], rating)
+                                        for user, movie_id, rating in events])
+    np.testing.assert_array_equal(recommender.user_movie_matrix.toarray(), expected)
+    assert not np.any(recommender.user_movie_matrix.data == 0)
+
+
+def test_folded_factors_match_svd_transform(recommender):
+    ids = recommender.processed_df['movie_id'].to_numpy()
+    recommender.add_ratings([(2, ids[0], 5), (2, ids[1], 0), (40, ids[3], 1), (61, ids[2], 4)])
+    recommender.add_ratings([(62, ids[4], 2), (61, ids[5], 3)])
+
+    expected = recommender.svd_model.transform(recommender.user_movie_matrix)
+    assert recommender.user_factors.shape == expected.shape
+    np.testing.assert_allclose(recommender.user_factors, expected, rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.parametrize('user_id', [-1, -60, 60, 10 ** 9])
+def test_collaborative_recommendations_for_unknown_users_are_empty(recommender, user_id):
+    assert recommender.get_collaborative_recommendations(user_id, 5) == []
+    assert len(recommender.get_collaborative_recommendations(59, 5)) == 5
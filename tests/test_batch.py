@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from _synthetic import make_recommender
+
+
+@pytest.mark.parametrize('params', [{}, {'top_k': 10}], ids=['dense', 'top_k'])
+def test_batch_content_recommendations_match_single_queries(params):
+    recommender = make_recommender(300, n_users=20, n_topics=20)
+    recommender.build_content_based_model(**params)
+    titles = recommender.processed_df['title'][:20].tolist()
+
+    movie_ids, scores = recommender.get_content_based_recommendations_batch(titles, 5)
+    for title, row_ids, row_scores in zip(titles, movie_ids, scores):
+        single = recommender.get_content_based_recommendations(title, 5)
+        assert row_ids.tolist() == [recommendation['movie_id'] for recommendation in single]
+        np.testing.assert_allclose(row_scores, [recommendation['similarity_score'] for recommendation in single],
+                                   rtol=1e-5)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar import ColumnarStore, ColumnarWriter, infer_dtypes
+from ingestion import COLUMN_DTYPES, PROCESSED_COLUMNS
+
+DTYPES = {'movie_id': 'int64', 'score': 'float64', 'title': 'string', 'genres': 'list'}
+
+
+def write(directory, chunks, dtypes=DTYPES):
+    with ColumnarWriter(str(directory), dtypes=dtypes) as writer:
+        for chunk in chunks:
+            writer.append(chunk)
+    return ColumnarStore(str(directory))
+
+
+def test_round_trip_with_missing_values_only_in_later_chunks(tmp_path):
+    first = pd.DataFrame({'movie_id': [1, 2], 'score': [5, 7], 'title': [None, None],
+                          'genres': [[], []]})
+    second = pd.DataFrame({'movie_id': [3, 4], 'score': [np.nan, 2.5], 'title': ['Alien', None],
+                           'genres': [['Horror', 'Science Fiction'], []]})
+    store = write(tmp_path / 'store', [first, second])
+
+    assert {name: entry['kind'] for name, entry in store.columns.items()} == {
+        'movie_id': 'numeric', 'score': 'numeric', 'title': 'string', 'genres': 'list'}
+    df = store.read()
+    assert df['movie_id'].tolist() == [1, 2, 3, 4]
+    np.testing.assert_array_equal(df['score'].to_numpy(), [5, 7, np.nan, 2.5])
+    assert df['title'].isna().tolist() == [True, True, False, True]
+    assert df['title'][2] == 'Alien'
+    assert df['genres'].tolist() == [[], [], ['Horror', 'Science Fiction'], []]
+    rows = store.read(['title', 'genres'], start=2, stop=4)
+    assert rows['genres'].tolist() == [['Horror', 'Science Fiction'], []]
+    assert rows['title'].isna().tolist() == [False, True]
+
+
+def test_lossy_cast_raises(tmp_path):
+    first = pd.DataFrame({'movie_id': [1], 'score': [1.0], 'title': ['A'], 'genres': [[]]})
+    second = pd.DataFrame({'movie_id': [2.5], 'score': [1.0], 'title': ['B'], 'genres': [[]]})
+    with pytest.raises(ValueError, match='movie_id'):
+        write(tmp_path / 'store', [first, second])
+
+
+def test_lists_in_a_string_column_raise(tmp_path):
+    first = pd.DataFrame({'genres': [None]})
+    second = pd.DataFrame({'genres': [['Drama']]})
+    with pytest.raises(ValueError, match='genres'):
+        write(tmp_path / 'store', [first, second], dtypes=None)
+
+
+def test_infer_dtypes_reads_every_row():
+    df = pd.DataFrame({'movie_id': [1, 2], 'title': [None, 'B'], 'genres': [None, ['Drama']]})
+    assert infer_dtypes(df) == {'movie_id': 'int64', 'title': 'string', 'genres': 'list'}
+
+
+def test_ingestion_schema_covers_every_processed_column():
+    assert set(COLUMN_DTYPES) == set(PROCESSED_COLUMNS)
@@ -0,0 +1,106 @@
+import ast
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parsing import parse_metadata_columns, parser_pool
+
+
+# The original row-wise parsers of HybridRecommender, kept as the reference
+def legacy_parse_json_column(text):
+    try:
+        data = ast.literal_eval(text)
+        if isinstance(data, list):
+            return [item.get('name', '') for item in data if item.get('name')]
+        return []
+    except:  # noqa: E722
+        return []
+
+
+def legacy_parse_cast_column(text):
+    try:
+        data = ast.literal_eval(text)
+        if isinstance(data, list):
+            return [item.get('name', '') for item in data[:3] if item.get('name')]
+        return []
+    except:  # noqa: E722
+        return []
+
+
+def legacy_parse_crew_column(text):
+    try:
+        data = ast.literal_eval(text)
+        if isinstance(data, list):
+            directors = [item.get('name', '') for item in data if item.get('job') == 'Director']
+            return directors[:2]
+        return []
+    except:  # noqa: E722
+        return []
+
+
+LEGACY_PARSERS = {
+    'genres': legacy_parse_json_column,
+    'keywords': legacy_parse_json_column,
+    'cast': legacy_parse_cast_column,
+    'crew': legacy_parse_crew_column,
+}
+
+
+def people(names, jobs=None):
+    return json.dumps([dict({'id': i, 'name': name}, **({'job': jobs[i]} if jobs else {}))
+                       for i, name in enumerate(names)])
+
+
+MALFORMED = [
+    np.nan,                                   # missing cell
+    '',
+    '[]',                                     # empty list
+    'not json',
+    '[{"name": "Cut off"',                    # truncated JSON
+    '{"name": "Not a list"}',
+    '42',
+    "[{'name': 'Python literal'}]",           # literal_eval fallback
+    '[{"id": 1}, {"name": ""}, {"name": "Kept"}]',
+    '[' * 5000 + ']' * 5000,                  # nested too deeply
+]
+
+
+@pytest.fixture
+def raw_frame():
+    rng = np.random.default_rng(0)
+    rows = 60
+    frame = pd.DataFrame({
+        'genres': [json.dumps([{'id': int(i), 'name': f'Genre {i}'} for i in rng.integers(0, 20, 3)])
+                   for _ in range(rows)],
+        'keywords': [json.dumps([{'id': int(i), 'name': f'keyword {i}'} for i in rng.integers(0, 99, 5)])
+                     for _ in range(rows)],
+        'cast': [people([f'Actor {i}' for i in rng.integers(0, 500, int(rng.integers(0, 8)))])
+                 for _ in range(rows)],
+        'crew': [people([f'Person {i}' for i in range(4)],
+                        jobs=list(rng.choice(['Director', 'Editor', 'Writer'], 4)))
+                 for _ in range(rows)],
+    })
+    # Missing crew entirely and crews without a director
+    frame.loc[::7, 'crew'] = np.nan
+    frame.loc[3::11, 'crew'] = people(['Editor Only'], jobs=['Editor'])
+    for column in frame.columns:
+        for offset, cell in enumerate(MALFORMED):
+            frame.loc[(offset * 5 + len(column)) % rows, column] = cell
+    return frame
+
+
+def legacy_parse(frame):
+    return {column: frame[column].apply(LEGACY_PARSERS[column]).tolist() for column in frame.columns}
+
+
+def test_parse_metadata_columns_matches_legacy_parsers(raw_frame):
+    assert parse_metadata_columns(raw_frame) == legacy_parse(raw_frame)
+
+
+def test_shared_pool_matches_legacy_parsers(raw_frame):
+    expected = legacy_parse(raw_frame)
+    with parser_pool(2) as executor:
+        for _ in range(2):
+            assert parse_metadata_columns(raw_frame, chunk_size=7, executor=executor) == expected
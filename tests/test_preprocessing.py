@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from _synthetic import make_catalog
+from preprocessing import build_tags
+
+
+def legacy_create_tags(row):
+    """The original per-row tag builder of HybridRecommender, kept as the reference"""
+    tags = []
+    if pd.notna(row['overview']):
+        tags.extend(str(row['overview']).lower().split()[:20])
+    tags.extend([genre.lower().replace(' ', '') for genre in row['genres']])
+    tags.extend([keyword.lower().replace(' ', '') for keyword in row['keywords']])
+    tags.extend([actor.lower().replace(' ', '') for actor in row['cast']])
+    tags.extend([director.lower().replace(' ', '') for director in row['crew']])
+    return ' '.join(tags)
+
+
+def test_build_tags_matches_legacy_row_builder():
+    df = make_catalog(200).drop(columns='tags')
+    crew, genres, cast = df['crew'].tolist(), df['genres'].tolist(), df['cast'].tolist()
+    crew[::9] = [[]] * len(crew[::9])           # movies without a director
+    genres[::13] = [[]] * len(genres[::13])
+    cast[5] = ['Jean-Luc  Picard', 'ÉMILE Zola']
+    df['crew'], df['genres'], df['cast'] = crew, genres, cast
+    df['keywords'] = [[] if position == 6 else keywords for position, keywords in enumerate(df['keywords'])]
+    overviews = df['overview'].tolist()
+    overviews[1], overviews[2] = np.nan, ''
+    overviews[4] = '  Leading  and\ttrailing\nWHITESPACE  ' + ' word' * 30
+    df['overview'] = pd.Series(overviews, dtype=object)
+    df.index = np.arange(len(df)) * 3           # a non-default index is kept
+
+    tags = build_tags(df)
+    pd.testing.assert_series_equal(tags, df.apply(legacy_create_tags, axis=1), check_names=False)
@@ -0,0 +1,15 @@
+import numpy as np
+
+from quantization import to_precision
+
+
+def test_memory_mapped_matrix_is_converted_in_place_blockwise(tmp_path):
+    path = str(tmp_path / 'similarity.npy')
+    values = np.random.default_rng(0).random((50, 50), dtype=np.float32)
+    np.save(path, values)
+
+    converted = to_precision(np.load(path, mmap_mode='r'), 'float16', block_size=7)
+    assert isinstance(converted, np.memmap) and converted.filename == path
+    assert converted.dtype == np.float16
+    np.testing.assert_array_equal(converted, values.astype(np.float16))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['similarity.npy']
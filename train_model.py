@@ -5,16 +5,171 @@ This script builds both content-based and collaborative filtering models
 and saves them for use in the Streamlit application.
 """
 
+import argparse
+import json
 import sys
 import os
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+from artifacts import current_version_dir
+from cache import PREPROCESS_VERSION
+from pipeline import Pipeline, Stage, format_summary
+from quantization import RATING_DTYPES, SIMILARITY_PRECISIONS, format_precision_report, precision_report
 from recommender import HybridRecommender
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Train the Hybrid Movie Recommendation System")
+    parser.add_argument('--parse-workers', type=int, default=1,
+                        help="Number of processes used to parse the JSON-like metadata columns")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream the CSVs in chunks of this many rows into artifacts/preprocessed")
+    parser.add_argument('--users', type=int, default=1000,
+                        help="Number of simulated users in the user-movie matrix")
+    parser.add_argument('--cache-dir', default='artifacts/cache/preprocessed',
+                        help="Preprocessing cache keyed by the input files' fingerprint")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Disable the preprocessing and stage caches")
+    parser.add_argument('--stage-cache-dir', default='artifacts/cache/stages',
+                        help="Cache of content / collaborative stage outputs keyed by their inputs")
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        choices=['content', 'collaborative'],
+                        help="Re-run a stage even if its cached outputs are up to date (repeatable)")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Build the content and collaborative models at the same time in two processes")
+    parser.add_argument('--vectorizer', choices=['tfidf', 'hashing'], default='tfidf',
+                        help="Fitted TF-IDF vocabulary, or hashed terms (keeps new words of movies added later)")
+    parser.add_argument('--tfidf-max-features', type=int, default=5000,
+                        help="TF-IDF vocabulary size")
+    parser.add_argument('--tfidf-ngram-max', type=int, default=2,
+                        help="Longest word n-gram in the TF-IDF vocabulary")
+    parser.add_argument('--tfidf-min-df', type=int, default=2,
+                        help="Minimum number of movies a TF-IDF term must appear in")
+    parser.add_argument('--svd-components', type=int, default=50,
+                        help="Number of latent factors of the collaborative model")
+    parser.add_argument('--svd-seed', type=int, default=42,
+                        help="Random seed of the SVD solver")
+    parser.add_argument('--top-k', type=int, default=None,
+                        help="Keep only the top-K neighbors per movie instead of the dense similarity matrix")
+    parser.add_argument('--block-size', type=int, default=256,
+                        help="Rows scored at once by the blockwise similarity builders")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of similarity blocks computed concurrently")
+    parser.add_argument('--processes', action='store_true',
+                        help="Use a process pool instead of a thread pool for --workers")
+    parser.add_argument('--stream-similarity', action='store_true',
+                        help="Stream the full similarity matrix blockwise to artifacts/similarity_matrix.npy")
+    parser.add_argument('--precision', choices=SIMILARITY_PRECISIONS, default='float64',
+                        help="Storage of the dense similarity matrix (int8 is quantized with a scale per row)")
+    parser.add_argument('--rating-dtype', choices=RATING_DTYPES, default='float32',
+                        help="Storage of the user-movie rating matrix (uint8 is exact for 1-6 ratings)")
+    parser.add_argument('--precision-report', action='store_true',
+                        help="Report top-k agreement and memory of each similarity precision vs float64")
+    parser.add_argument('--lsa-components', type=int, default=None,
+                        help="Measure content similarity between LSA embeddings of this dimension "
+                             "instead of TF-IDF rows (no dense matrix unless --top-k/--stream-similarity)")
+    parser.add_argument('--ann', action='store_true',
+                        help="Build an approximate nearest neighbor index (replaces the dense matrix unless "
+                             "--top-k or --stream-similarity is set)")
+    parser.add_argument('--ann-components', type=int, default=128,
+                        help="Embedding dimension of the ANN index")
+    parser.add_argument('--ann-lists', type=int, default=None,
+                        help="Inverted lists of the ANN index (default: sqrt of the number of movies)")
+    return parser.parse_args(argv)
+
+def build_pipeline(recommender, args):
+    """
+    Express training as stages: preprocess -> content, collaborative -> save
+    
+    Each stage's key covers its own parameters and its upstream keys, so
+    changing only the SVD options re-runs only the collaborative stage and
+    changing only the TF-IDF options re-runs only the content stage.
+    The preprocess key covers only the catalog inputs; the rating options
+    (--users, --rating-dtype) are keyed on the collaborative stage, the only
+    one that reads the ratings. Preprocessing has its own fingerprint cache
+    and saving always runs.
+    """
+    cache_dir = None if args.no_cache else args.cache_dir
+    similarity_path = 'artifacts/similarity_matrix.npy' if args.stream_similarity else None
+    ann = {'n_components': args.ann_components, 'n_lists': args.ann_lists} if args.ann else None
+    
+    def preprocess():
+        print("\n📊 Loading and preprocessing data...")
+        recommender.load_and_preprocess_data(
+            n_workers=args.parse_workers,
+            chunksize=args.chunksize,
+            cache_dir=cache_dir,
+            n_users=args.users,
+            rating_dtype=args.rating_dtype
+        )
+        if recommender.preprocess_cache_hit:
+            return "preprocessing cache hit"
+    
+    def content():
+        print("\n🔍 Building content-based model...")
+        if similarity_path:
+            os.makedirs('artifacts', exist_ok=True)
+        recommender.build_content_based_model(
+            top_k=args.top_k,
+            block_size=args.block_size,
+            n_workers=args.workers,
+            use_processes=args.processes,
+            similarity_path=similarity_path,
+            max_features=args.tfidf_max_features,
+            ngram_range=(1, args.tfidf_ngram_max),
+            min_df=args.tfidf_min_df,
+            vectorizer=args.vectorizer,
+            precision=args.precision,
+            ann=ann,
+            embedding_dim=args.lsa_components
+        )
+    
+    def collaborative():
+        print("\n👥 Building collaborative filtering model...")
+        recommender.build_collaborative_model(
+            n_components=args.svd_components,
+            random_state=args.svd_seed
+        )
+    
+    def save():
+        print("\n💾 Saving models...")
+        recommender.save_models('artifacts')
+    
+    pipeline = Pipeline(recommender, cache_dir=None if args.no_cache else args.stage_cache_dir)
+    pipeline.add(Stage(
+        'preprocess', preprocess,
+        params={'streaming': bool(args.chunksize), 'preprocess_version': PREPROCESS_VERSION},
+        input_files=[recommender.movies_data, recommender.credits_data],
+        cache=False
+    ))
+    pipeline.add(Stage(
+        'content', content,
+        outputs=['tfidf_matrix', 'content_embeddings', 'lsa_components', 'similarity_matrix',
+                 'neighbor_index', 'ann_index', 'tfidf_vectorizer', 'content_params',
+                 'movies_added_since_build'],
+        params={'top_k': args.top_k, 'stream_similarity': args.stream_similarity,
+                'vectorizer': args.vectorizer, 'precision': args.precision,
+                'max_features': args.tfidf_max_features, 'ngram_max': args.tfidf_ngram_max,
+                'min_df': args.tfidf_min_df, 'ann': ann, 'lsa_components': args.lsa_components},
+        depends_on=['preprocess']
+    ))
+    pipeline.add(Stage(
+        'collaborative', collaborative,
+        outputs=['svd_model', 'user_factors', 'item_factors'],
+        params={'n_components': args.svd_components, 'random_state': args.svd_seed,
+                # The synthetic ratings are built during preprocessing but only feed this stage
+                'users': args.users, 'rating_dtype': args.rating_dtype},
+        depends_on=['preprocess']
+    ))
+    pipeline.add(Stage('save', save, depends_on=['content', 'collaborative'], cache=False))
+    return pipeline
+
+def main(argv=None):
     """Main training function"""
+    args = parse_args(argv)
+    
     print("🎬 Training Hybrid Movie Recommendation System")
     print("=" * 50)
     
@@ -24,29 +179,25 @@ def main():
         credits_data='data/tmdb_5000_credits.csv'
     )
     
-    # Load and preprocess data
-    print("\n📊 Step 1: Loading and preprocessing data...")
-    recommender.load_and_preprocess_data()
-    
-    # Build content-based model
-    print("\n🔍 Step 2: Building content-based model...")
-    recommender.build_content_based_model()
-    
-    # Build collaborative filtering model
-    print("\n👥 Step 3: Building collaborative filtering model...")
-    recommender.build_collaborative_model()
-    
-    # Save all models
-    print("\n💾 Step 4: Saving models...")
-    recommender.save_models('artifacts')
+    # Run (or reuse) the training stages
+    pipeline = build_pipeline(recommender, args)
+    results = pipeline.run(force=args.force, parallel=args.parallel)
     
     print("\n✅ Training completed successfully!")
+    print("\n⏱️ Pipeline stages:")
+    print(format_summary(results, pipeline.wall_seconds))
     print("\n📁 Models saved to 'artifacts/' directory:")
-    print("   - processed_movies.pkl")
-    print("   - similarity_matrix.pkl")
-    print("   - tfidf_matrix.pkl")
-    print("   - svd_model.pkl")
-    print("   - user_movie_matrix.pkl")
+    version_dir = current_version_dir('artifacts')
+    print(f"   - CURRENT -> {os.path.relpath(version_dir, 'artifacts')}")
+    print("   - manifest.json (bundle version and checksums)")
+    with open(os.path.join(version_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    for entry in list(manifest['arrays'].values()) + list(manifest['objects'].values()):
+        print(f"   - {entry['file']}")
+    
+    if args.precision_report:
+        print("\n🎯 Similarity precision vs float64:")
+        print(format_precision_report(precision_report(recommender._content_matrix())))
     
     # Test the system
     print("\n🧪 Testing the system...")
@@ -73,7 +224,9 @@ def main():
         n_recommendations=3
     )
     for i, rec in enumerate(hybrid_recs, 1):
-        if 'similarity_score' in rec:
+        if 'combined_score' in rec:
+            print(f"  {i}. {rec['title']} (Hybrid Score: {rec['combined_score']:.3f})")
+        elif 'similarity_score' in rec:
             print(f"  {i}. {rec['title']} (Content Score: {rec['similarity_score']:.3f})")
         elif 'predicted_rating' in rec:
             print(f"  {i}. {rec['title']} (Predicted Rating: {rec['predicted_rating']:.2f})")